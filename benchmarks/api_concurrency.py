@@ -0,0 +1,166 @@
+"""Compare the threaded and async database modes of the API under load.
+
+Starts one uvicorn server per mode against a scratch copy of ``--db`` (a
+server upgrades an outdated schema on startup; the original is never
+written), then drives it with 50-200 concurrent keep-alive clients and
+reports requests/s and latency percentiles. The response cache is disabled
+by default so every request reaches the database.
+
+    uv run python benchmarks/api_concurrency.py --clients 50,100,200 --duration 10
+    uv run python benchmarks/api_concurrency.py --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def request_paths(db_path: Path) -> List[str]:
+    """A read mix over what is actually loaded: ids, names, a list page."""
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT id, name FROM pokemon").fetchall()
+    if not rows:
+        sys.exit(f"{db_path} holds no pokemon; load some with the ETL first")
+    paths = []
+    for pokemon_id, name in rows:
+        paths.append(f"/pokemon/{pokemon_id}")
+        paths.append(f"/pokemon/{name}")
+    paths.append("/pokemon/list?limit=20")
+    return paths
+
+
+def scratch_copy(db_path: Path, directory: Path) -> Path:
+    """A consistent copy of ``db_path`` (including any WAL) for the server to own."""
+    copy = directory / "dex.db"
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    target = sqlite3.connect(copy)
+    source.backup(target)
+    target.close()
+    source.close()
+    return copy
+
+
+def start_server(mode: str, port: int, db_path: Path, cache: bool) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["POKEDEX_DATABASE_URL"] = f"sqlite:///{db_path}"
+    env["POKEDEX_DB_ASYNC"] = "1" if mode == "async" else "0"
+    if not cache:
+        env["POKEDEX_CACHE_SIZE"] = "0"
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+async def drive(base_url: str, paths: List[str], clients: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        stop = time.monotonic() + duration
+
+        async def worker(seed: int):
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.monotonic() < stop:
+                started = time.perf_counter()
+                try:
+                    resp = await client.get(rng.choice(paths))
+                    if resp.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(clients)))
+        elapsed = time.perf_counter() - started
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def bench_mode(mode: str, args, paths: List[str]) -> List[Dict[str, float]]:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(mode, args.port, args.db, args.cache)
+    try:
+        await wait_ready(base_url)
+        await drive(base_url, paths, clients=10, duration=1)  # warm pools and caches
+        results = []
+        for clients in args.clients:
+            result = await drive(base_url, paths, clients, args.duration)
+            result["mode"] = mode
+            results.append(result)
+            print(
+                f"{mode:>6} {clients:>4} clients  {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  errors {result['errors']}"
+            )
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=Path, default=ROOT / "pokedex.db")
+    parser.add_argument("--clients", default="50,100,200", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per client count")
+    parser.add_argument("--modes", default="sync,async")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache", action="store_true", help="Keep the in-process response cache on")
+    parser.add_argument("--json", type=Path, help="Also write results to this file")
+    args = parser.parse_args()
+    args.clients = [int(c) for c in args.clients.split(",")]
+    args.db = args.db.resolve()
+
+    paths = request_paths(args.db)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        args.db = scratch_copy(args.db, Path(tmp))
+        for mode in args.modes.split(","):
+            results.extend(asyncio.run(bench_mode(mode, args, paths)))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
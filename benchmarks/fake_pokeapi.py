@@ -0,0 +1,111 @@
+"""A local stand-in for PokeAPI serving a :class:`SyntheticDex`.
+
+Serves ``/api/v2/pokemon/{id}`` and ``/api/v2/pokemon-species`` with a
+configurable per-request latency (plus jitter) and an optional share of
+``503`` responses, and honors ``If-None-Match`` like the real CDN. Run it on
+its own for manual ETL runs::
+
+    uv run python benchmarks/fake_pokeapi.py --count 10000 --latency 0.05 --port 8766
+
+and point the ETL at it with :class:`RedirectTransport`, or start it inside
+a benchmark with :func:`serve`.
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Header, Response
+
+from synthetic_dex import SyntheticDex
+
+
+def create_app(dex: SyntheticDex, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(dex.seed)
+    app.state.requests = 0
+
+    async def delay():
+        app.state.requests += 1
+        wait = latency + rng.uniform(0, jitter)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @app.get("/api/v2/pokemon-species")
+    async def species(limit: int = 20):
+        await delay()
+        return {"count": dex.count, "results": []}
+
+    @app.get("/api/v2/pokemon/{identifier}")
+    async def pokemon(identifier: int, if_none_match: str = Header(None)):
+        await delay()
+        if error_rate and rng.random() < error_rate:
+            return Response(status_code=503, headers={"Retry-After": "0"})
+        try:
+            body = dex.payload(identifier)
+        except KeyError:
+            return Response(status_code=404)
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    return app
+
+
+class RedirectTransport(httpx.AsyncBaseTransport):
+    """Sends every request to ``base_url``, keeping path and query, so the
+    ETL's absolute PokeAPI URLs reach the local stand-in."""
+
+    def __init__(self, base_url: str, **kwargs):
+        self.base = httpx.URL(base_url)
+        self.transport = httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme=self.base.scheme, host=self.base.host, port=self.base.port)
+        request.headers["host"] = self.base.netloc.decode()
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+@contextmanager
+def serve(app: FastAPI, port: int) -> Iterator[str]:
+    """Run ``app`` on ``port`` in a background thread; yields its base URL."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError(f"fake PokeAPI did not start on port {port}")
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 503 responses")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    app = create_app(SyntheticDex(args.count, args.seed), args.latency, args.jitter, args.error_rate)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Per-request CPU spent encoding API responses, before and after orjson.
+
+Builds a synthetic dex of ``--count`` pokemon, then times, per response:
+
+- ``before``: Pydantic models validated again by FastAPI against the
+  ``response_model`` and rendered by ``JSONResponse`` (``json.dumps``)
+- ``after``: plain dicts in the same shape rendered by ``ORJSONResponse``;
+  for ``pokemon`` and ``batch_50``, the stored documents built with orjson
+  instead of ``model_dump_json``
+- gzip (level 6) and brotli (quality 4, if installed) of the encoded body,
+  with the compression ratio
+
+CPU time (``time.process_time``) is reported, so the numbers are not
+disturbed by other load on the machine::
+
+    uv run python benchmarks/serialization.py --count 2000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from synthetic_dex import SyntheticDex, build_database
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlmodel import Session, col, select
+
+from src.api.analytics import DexColumns
+from src.api.compression import Compressor, brotli
+from src.database import make_engine
+from src.models import Pokemon
+from src.repository import get_many, to_record, to_summaries
+from src.schemas import PokemonListResponse, PokemonResponse, PokemonSummary, StatsSummaryResponse
+from src.serialization import dumps
+
+
+def cpu_time(fn: Callable[[], Any], rounds: int) -> float:
+    """Mean CPU microseconds per call."""
+    fn()  # warm up caches and lazy imports
+    started = time.process_time()
+    for _ in range(rounds):
+        fn()
+    return (time.process_time() - started) / rounds * 1e6
+
+
+def validated(model, content) -> Callable[[], bytes]:
+    """The old path: what FastAPI does with a non-Response return value."""
+    field = create_response_field(name="response", type_=model)
+    loop = asyncio.new_event_loop()
+
+    def encode() -> bytes:
+        body = loop.run_until_complete(serialize_response(field=field, response_content=content(), is_coroutine=True))
+        return JSONResponse(body).body
+
+    return encode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000, help="Synthetic pokemon in the dex")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "dex.db"
+        build_database(db_path, SyntheticDex(args.count, args.seed), 500)
+        engine = make_engine(f"sqlite:///{db_path}")
+        with Session(engine) as db:
+            pages = {
+                n: to_summaries(db, list(db.exec(select(Pokemon).order_by(col(Pokemon.id)).limit(n)).all()))
+                for n in (20, 100)
+            }
+            records = [to_record(p) for p in get_many(db, [str(i) for i in range(1, 51)]) if p is not None]
+            summary = DexColumns.load(db).summary()
+        engine.dispose()
+
+    def list_models(items):
+        return lambda: PokemonListResponse(items=[PokemonSummary(**item) for item in items], next_cursor="x")
+
+    cases: Dict[str, Dict[str, Callable[[], bytes]]] = {
+        "pokemon": {
+            "before": lambda: PokemonResponse(**records[0]).model_dump_json().encode(),
+            "after": lambda: dumps(records[0]),
+        },
+        "stats_summary": {
+            "before": validated(StatsSummaryResponse, lambda: summary),
+            "after": lambda: ORJSONResponse(summary).body,
+        },
+    }
+    for n, items in pages.items():
+        cases[f"list_{n}"] = {
+            "before": validated(PokemonListResponse, list_models(items)),
+            "after": lambda items=items: ORJSONResponse({"items": items, "next_cursor": "x"}).body,
+        }
+    # Batch bodies splice stored documents; what changed is building those documents
+    cases["batch_50"] = {
+        "before": lambda: b"[" + b",".join(PokemonResponse(**r).model_dump_json().encode() for r in records) + b"]",
+        "after": lambda: b"[" + b",".join(dumps(r) for r in records) + b"]",
+    }
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'response':<14} {'bytes':>8} {'before us':>10} {'after us':>9} {'speedup':>8}  compression")
+    for name, paths in cases.items():
+        body = paths["after"]()
+        assert json.loads(body) == json.loads(paths["before"]()), name  # same document either way
+        result = {
+            "bytes": len(body),
+            "before_us": cpu_time(paths["before"], args.rounds),
+            "after_us": cpu_time(paths["after"], args.rounds),
+        }
+        for encoding in ("gzip", "br") if brotli is not None else ("gzip",):
+            compressed = Compressor(encoding).compress(body, final=True)
+            result[f"{encoding}_us"] = cpu_time(lambda e=encoding, b=body: Compressor(e).compress(b, final=True), args.rounds)
+            result[f"{encoding}_ratio"] = len(body) / len(compressed)
+        results[name] = result
+        compression = "  ".join(
+            f"{e} {result[f'{e}_us']:.0f} us x{result[f'{e}_ratio']:.1f}" for e in ("gzip", "br") if f"{e}_us" in result
+        )
+        print(
+            f"{name:<14} {result['bytes']:>8} {result['before_us']:>10.0f} {result['after_us']:>9.0f} "
+            f"{result['before_us'] / result['after_us']:>7.1f}x  {compression}"
+        )
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Database size and sprite query time: one URL per row vs. interned sprites.
+
+Builds a synthetic dex of ``--count`` pokemon three times:
+
+- ``before``: the old ``sprite`` table, a variant name and full URL per row
+  (rebuilt from the interned tables, so the data is identical)
+- ``interned``: variant ids and URL prefix ids plus the file name per row
+- ``allow-list``: interned, keeping only ``--variants``
+
+and reports, after ``VACUUM``, the file size, the pages used by the sprite
+tables and indexes, and the CPU time to read one pokemon's sprites (the
+statement ``get_pokemon`` runs for them), one sprite by variant, and, for
+the interned layouts, the whole ORM ``get_pokemon``::
+
+    uv run python benchmarks/sprite_storage.py --count 2000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from synthetic_dex import SyntheticDex, build_database
+
+from sqlmodel import Session
+
+import src.etl.main as etl_main
+from src.database import make_engine
+from src.repository import get_pokemon
+
+LEGACY = """
+CREATE TABLE legacy (pokemon_id INTEGER NOT NULL, variant VARCHAR NOT NULL, url VARCHAR NOT NULL,
+                     PRIMARY KEY (pokemon_id, variant));
+INSERT INTO legacy SELECT s.pokemon_id, v.name, p.prefix || s.path
+    FROM sprite s JOIN spritevariant v ON v.id = s.variant_id JOIN urlprefix p ON p.id = s.prefix_id;
+DROP TABLE sprite;
+DROP TABLE spritevariant;
+DROP TABLE urlprefix;
+ALTER TABLE legacy RENAME TO sprite;
+"""
+QUERIES = {
+    "before": (
+        "SELECT variant, url FROM sprite WHERE pokemon_id = ?",
+        "SELECT url FROM sprite WHERE pokemon_id = ? AND variant = 'front_shiny'",
+    ),
+    "interned": (
+        "SELECT v.name, p.prefix || s.path FROM sprite s JOIN spritevariant v ON v.id = s.variant_id"
+        " JOIN urlprefix p ON p.id = s.prefix_id WHERE s.pokemon_id = ?",
+        "SELECT p.prefix || s.path FROM sprite s JOIN spritevariant v ON v.id = s.variant_id"
+        " JOIN urlprefix p ON p.id = s.prefix_id WHERE s.pokemon_id = ? AND v.name = 'front_shiny'",
+    ),
+}
+SPRITE_TABLES = ("sprite", "spritevariant", "urlprefix")
+
+
+def mean_us(fn: Callable[[int], Any], ids, rounds: int) -> float:
+    """Best of ``rounds`` mean CPU microseconds per call over ``ids``."""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.process_time()
+        for identifier in ids:
+            fn(identifier)
+        best = min(best, (time.process_time() - started) / len(ids) * 1e6)
+    return best
+
+
+def orm_us(db_path: Path, ids, rounds: int) -> float:
+    """``get_pokemon`` (the ORM path behind a document miss) per call."""
+    engine = make_engine(f"sqlite:///{db_path}")
+    with Session(engine) as db:
+
+        def load(identifier: int):
+            get_pokemon(db, str(identifier))
+            db.expunge_all()
+
+        result = mean_us(load, ids, rounds)
+    engine.dispose()
+    return result
+
+
+def measure(db_path: Path, queries, count: int, rounds: int, orm: bool = True) -> Dict[str, Any]:
+    conn = sqlite3.connect(db_path)
+    conn.execute("VACUUM")
+    pages = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall())
+    sprite_bytes = sum(size for name, size in pages.items() if any(table in name for table in SPRITE_TABLES))
+    rows = conn.execute("SELECT COUNT(*) FROM sprite").fetchone()[0]
+    ids = random.Random(0).sample(range(1, count + 1), min(count, 500))
+    all_sprites, one_sprite = queries
+    result = {
+        "file_bytes": os.path.getsize(db_path),
+        "sprite_bytes": sprite_bytes,
+        "document_bytes": pages.get("pokemondocument", 0),
+        "sprite_rows": rows,
+        "all_sprites_us": mean_us(lambda i: conn.execute(all_sprites, (i,)).fetchall(), ids, rounds),
+        "one_sprite_us": mean_us(lambda i: conn.execute(one_sprite, (i,)).fetchall(), ids, rounds),
+    }
+    conn.close()
+    result["get_pokemon_us"] = orm_us(db_path, ids[:100], rounds) if orm else None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000, help="Synthetic pokemon in the dex")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--variants", default="front_*,back_*,other_*", help="Allow-list for the third build")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    dex = SyntheticDex(args.count, args.seed)
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        interned = Path(tmp) / "interned.db"
+        build_database(interned, dex, 500)
+        before = Path(tmp) / "before.db"
+        shutil.copy(interned, before)
+        with sqlite3.connect(before) as conn:
+            conn.executescript(LEGACY)
+        # The models only read the interned layout
+        results["before"] = measure(before, QUERIES["before"], args.count, args.rounds, orm=False)
+        results["interned"] = measure(interned, QUERIES["interned"], args.count, args.rounds)
+
+        # As if run with POKEDEX_SPRITE_VARIANTS set; build_database normalizes in-process
+        etl_main.SPRITE_VARIANTS = args.variants
+        allowed = Path(tmp) / "allow-list.db"
+        build_database(allowed, dex, 500)
+        results["allow-list"] = measure(allowed, QUERIES["interned"], args.count, args.rounds)
+
+    print(
+        f"{'layout':<11} {'file MB':>8} {'sprite MB':>10} {'docs MB':>8} {'rows':>8} "
+        f"{'all us':>7} {'one us':>7} {'get_pokemon us':>15}"
+    )
+    for name, r in results.items():
+        orm = "-" if r["get_pokemon_us"] is None else f"{r['get_pokemon_us']:.0f}"
+        print(
+            f"{name:<11} {r['file_bytes'] / 1e6:>8.1f} {r['sprite_bytes'] / 1e6:>10.1f} {r['document_bytes'] / 1e6:>8.1f} "
+            f"{r['sprite_rows']:>8} {r['all_sprites_us']:>7.1f} {r['one_sprite_us']:>7.1f} {orm:>15}"
+        )
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""Offline benchmark suite for the ETL and API hot paths.
+
+Synthesizes a dex of ``--count`` pokemon from the ``docs/*.json`` fixtures
+and measures, without touching the network:
+
+- ``normalize``: JSON parsing and ``normalize_data`` throughput
+- ``normalize_pool``: ``normalize_payload`` in-process vs. in the ETL's
+  process pool (``--workers``, default one per core), one record per task
+- ``bulk_load``: building the synthetic dex with set-based batch writes
+- ``insert_idempotent``: the one-record-per-transaction write path
+- ``etl``: ``load_many`` end to end against a local fake PokeAPI with latency
+- ``api``: cold vs. warm ``GET /pokemon/{identifier}`` latency under concurrency
+
+Results go to stdout and, with ``--json``, to a file; ``--compare`` prints
+the change against an earlier results file::
+
+    uv run python benchmarks/suite.py --json before.json
+    uv run python benchmarks/suite.py --json after.json --compare before.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+from sqlmodel import Session, SQLModel
+
+from synthetic_dex import ROOT, SyntheticDex, build_database
+from fake_pokeapi import RedirectTransport, create_app, serve
+from api_concurrency import percentile, start_server, wait_ready
+
+from src.database import make_engine
+from src.etl.main import insert_idempotent, load_many, normalize_data, normalize_payload, normalize_pool
+from src.etl.retry import RetryPolicy
+
+STAGES = ("normalize", "normalize_pool", "bulk_load", "insert_idempotent", "etl", "api")
+
+
+def latency_summary(samples: List[float], elapsed: float) -> Dict[str, float]:
+    return {
+        "requests": len(samples),
+        "rps": len(samples) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def bench_normalize(dex: SyntheticDex, sample: int) -> Dict[str, Any]:
+    raws = [raw for _, raw in dex.payloads(random.Random(dex.seed).sample(dex.ids(), min(sample, dex.count)))]
+    started = time.perf_counter()
+    parsed = [json.loads(raw) for raw in raws]
+    parse_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for data in parsed:
+        normalize_data(data)
+    normalize_time = time.perf_counter() - started
+    megabytes = sum(len(raw) for raw in raws) / 1e6
+    return {
+        "records": len(raws),
+        "megabytes": megabytes,
+        "parse_mb_per_second": megabytes / parse_time,
+        "normalize_records_per_second": len(raws) / normalize_time,
+        "records_per_second": len(raws) / (parse_time + normalize_time),
+    }
+
+
+def bench_normalize_pool(dex: SyntheticDex, sample: int, workers: int) -> Dict[str, Any]:
+    """Records per second through ``normalize_payload`` on the calling thread
+    and through ``normalize_pool``, submitted one at a time as ``load_many``
+    does (raw bytes out, compact dicts back)."""
+    raws = [raw for _, raw in dex.payloads(random.Random(dex.seed).sample(dex.ids(), min(sample, dex.count)))]
+    started = time.perf_counter()
+    for raw in raws:
+        normalize_payload(raw)
+    inline = time.perf_counter() - started
+    pool = normalize_pool(workers)
+    assert pool is not None
+    try:
+        list(pool.map(normalize_payload, raws[: workers * 2]))  # start the workers outside the timing
+        started = time.perf_counter()
+        list(pool.map(normalize_payload, raws))
+        pooled = time.perf_counter() - started
+    finally:
+        pool.shutdown()
+    return {
+        "records": len(raws),
+        "workers": workers,
+        "inline_records_per_second": len(raws) / inline,
+        "pool_records_per_second": len(raws) / pooled,
+        "speedup": inline / pooled,
+    }
+
+
+def bench_insert_idempotent(dex: SyntheticDex, workdir: Path, sample: int) -> Dict[str, Any]:
+    engine = make_engine(f"sqlite:///{workdir / 'insert.db'}")
+    SQLModel.metadata.create_all(engine)
+    records = [normalize_data(json.loads(raw)) for _, raw in dex.payloads(dex.ids()[:sample])]
+    # insert_idempotent reports every record on stdout
+    with Session(engine) as session, contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for norm in records:
+            insert_idempotent(session, norm)
+        elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        for norm in records:  # every one already present
+            insert_idempotent(session, norm)
+        again = time.perf_counter() - started
+    engine.dispose()
+    return {
+        "records": len(records),
+        "records_per_second": len(records) / elapsed,
+        "existing_records_per_second": len(records) / again,
+    }
+
+
+async def bench_etl(dex: SyntheticDex, workdir: Path, args) -> Dict[str, Any]:
+    engine = make_engine(f"sqlite:///{workdir / 'etl.db'}")
+    SQLModel.metadata.create_all(engine)
+    ids = dex.ids()[: args.etl_count]
+    app = create_app(dex, args.latency, args.jitter, args.error_rate)
+    with serve(app, args.pokeapi_port) as base_url:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(transport=RedirectTransport(base_url, limits=limits), timeout=30) as client:
+            stats = await load_many(
+                ids,
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+                client=client,
+                session_factory=lambda: Session(engine),
+                retry=RetryPolicy(base_delay=0.01),
+                workers=args.workers,
+            )
+    engine.dispose()
+    return {
+        "requested": stats.requested,
+        "loaded": stats.loaded,
+        "failed": stats.failed,
+        "retries": stats.retries,
+        "upstream_requests": app.state.requests,
+        "elapsed": stats.elapsed,
+        "records_per_second": stats.rate,
+        "latency_ms": args.latency * 1000,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+    }
+
+
+async def timed_pass(client: httpx.AsyncClient, paths: List[str], concurrency: int) -> Dict[str, float]:
+    """Request every path once, ``concurrency`` at a time."""
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            started = time.perf_counter()
+            resp = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            errors += resp.status_code != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = latency_summary(latencies, time.perf_counter() - started)
+    result["errors"] = errors
+    return result
+
+
+async def bench_api(dex: SyntheticDex, db_path: Path, args) -> Dict[str, Any]:
+    """Cold: first request for each pokemon after a fresh start (response
+    cache empty). Warm: the same requests again, served from the cache."""
+    rng = random.Random(dex.seed)
+    ids = rng.sample(dex.ids(), min(args.api_requests, dex.count))
+    paths = [f"/pokemon/{i}" for i in ids]
+    base_url = f"http://127.0.0.1:{args.api_port}"
+    server = start_server(args.api_mode, args.api_port, db_path, cache=True)
+    try:
+        await wait_ready(base_url)
+        limits = httpx.Limits(max_connections=args.api_clients, max_keepalive_connections=args.api_clients)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            cold = await timed_pass(client, paths, args.api_clients)
+            warm = await timed_pass(client, paths * args.warm_rounds, args.api_clients)
+    finally:
+        server.terminate()
+        server.wait()
+    return {"mode": args.api_mode, "clients": args.api_clients, "cold": cold, "warm": warm}
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline_path: Path):
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\nvs. {baseline_path} ({baseline['meta']['commit']}):")
+    old, new = flatten(baseline["results"]), flatten(current["results"])
+    for name in sorted(old.keys() & new.keys()):
+        if old[name]:
+            print(f"  {name:<45} {old[name]:>12.2f} -> {new[name]:>12.2f}  ({new[name] / old[name] - 1:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000, help="Synthetic pokemon in the dex")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--normalize-sample", type=int, default=1000)
+    parser.add_argument("--insert-sample", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--etl-count", type=int, default=1000, help="Pokemon fetched from the fake PokeAPI")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake PokeAPI latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake PokeAPI 503s")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=0, help="ETL normalize processes (0: event loop; normalize_pool: one per core)")
+    parser.add_argument("--api-mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--api-clients", type=int, default=50)
+    parser.add_argument("--api-requests", type=int, default=2000, help="Distinct pokemon requested")
+    parser.add_argument("--warm-rounds", type=int, default=3)
+    parser.add_argument("--pokeapi-port", type=int, default=8766)
+    parser.add_argument("--api-port", type=int, default=8767)
+    parser.add_argument("--workdir", type=Path, help="Keep databases here (default: a temp dir)")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--compare", type=Path, help="Earlier --json output to compare against")
+    args = parser.parse_args()
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    dex = SyntheticDex(args.count, args.seed)
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or Path(tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        db_path = (workdir / "dex.db").resolve()
+        if "normalize" in stages:
+            results["normalize"] = bench_normalize(dex, args.normalize_sample)
+            print(f"normalize          {results['normalize']['records_per_second']:10.1f} records/s")
+        if "normalize_pool" in stages:
+            r = results["normalize_pool"] = bench_normalize_pool(
+                dex, args.normalize_sample, args.workers or os.cpu_count() or 1
+            )
+            print(
+                f"normalize_pool     {r['pool_records_per_second']:10.1f} records/s  "
+                f"({r['workers']} workers, {r['speedup']:.2f}x in-process)"
+            )
+        if "bulk_load" in stages or "api" in stages:
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+            results["bulk_load"] = build_database(db_path, dex, args.batch_size)
+            print(f"bulk_load          {results['bulk_load']['rows_per_second']:10.1f} rows/s")
+        if "insert_idempotent" in stages:
+            results["insert_idempotent"] = bench_insert_idempotent(dex, workdir, args.insert_sample)
+            print(f"insert_idempotent  {results['insert_idempotent']['records_per_second']:10.1f} records/s")
+        if "etl" in stages:
+            (workdir / "etl.db").unlink(missing_ok=True)
+            results["etl"] = asyncio.run(bench_etl(dex, workdir, args))
+            print(f"etl                {results['etl']['records_per_second']:10.1f} records/s")
+        if "api" in stages:
+            results["api"] = asyncio.run(bench_api(dex, db_path, args))
+            for phase in ("cold", "warm"):
+                r = results["api"][phase]
+                print(
+                    f"api {phase:<14} {r['rps']:10.1f} req/s  p50 {r['p50_ms']:.1f} ms  "
+                    f"p90 {r['p90_ms']:.1f} ms  p99 {r['p99_ms']:.1f} ms  errors {r['errors']}"
+                )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        },
+        "results": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
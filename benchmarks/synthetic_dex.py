@@ -0,0 +1,140 @@
+"""Synthetic PokeAPI payloads scaled up from the ``docs/*.json`` fixtures.
+
+Each synthetic pokemon copies a real payload (moves, game indices and all,
+so payload sizes and parse costs stay realistic) and gets its own id, name,
+stats and sprite URLs. Generation is deterministic for a given seed, so two
+runs of the suite see byte-identical data.
+"""
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import func, select  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
+
+from src.database import make_engine  # noqa: E402
+from src.etl.main import normalize_payload, write_batch  # noqa: E402
+from src.etl.writer import BulkWriter  # noqa: E402
+from src.models import Pokemon, PokemonDocument, PokemonStat, PokemonType, Sprite  # noqa: E402
+from src.schemas import PokemonData  # noqa: E402
+
+CORE_KEYS = ("id", "name", "height", "weight", "types", "stats", "sprites")
+SPRITE_ID = re.compile(r"/\d+\.(png|gif|svg)")
+TYPE_NAMES = (
+    "normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground",
+    "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy",
+)
+
+
+class Template:
+    """A fixture payload split into the core fields we vary per pokemon and
+    the bulk we splice in pre-serialized."""
+
+    def __init__(self, payload: Dict):
+        self.core = {k: payload[k] for k in CORE_KEYS}
+        self.sprites = json.dumps(payload["sprites"])
+        rest = {k: v for k, v in payload.items() if k not in CORE_KEYS}
+        self.rest = json.dumps(rest)[1:-1].encode()  # object body without braces
+
+
+def load_templates(docs: Path = ROOT / "docs") -> List[Template]:
+    paths = sorted(docs.glob("*.json"), key=lambda p: int(p.stem))
+    if not paths:
+        sys.exit(f"No <id>.json fixtures in {docs}")
+    return [Template(json.loads(p.read_text())) for p in paths]
+
+
+class SyntheticDex:
+    """``payload(id)`` is the raw JSON PokeAPI would return for ``id``."""
+
+    def __init__(self, count: int, seed: int = 0, docs: Path = ROOT / "docs"):
+        self.count = count
+        self.seed = seed
+        self.templates = load_templates(docs)
+
+    def ids(self) -> List[int]:
+        return list(range(1, self.count + 1))
+
+    def payload(self, identifier: int) -> bytes:
+        if not 1 <= identifier <= self.count:
+            raise KeyError(identifier)
+        rng = random.Random(self.seed * 1_000_003 + identifier)
+        template = self.templates[identifier % len(self.templates)]
+        core = dict(template.core)
+        core["id"] = identifier
+        core["name"] = f"{template.core['name']}-{identifier}"
+        core["height"] = rng.randint(1, 200)
+        core["weight"] = rng.randint(1, 9999)
+        types = rng.sample(TYPE_NAMES, rng.choice((1, 2)))
+        core["types"] = [{"slot": n + 1, "type": {"name": t, "url": ""}} for n, t in enumerate(types)]
+        core["stats"] = [
+            {"base_stat": rng.randint(5, 255), "effort": 0, "stat": s["stat"]} for s in template.core["stats"]
+        ]
+        sprites = SPRITE_ID.sub(lambda m: f"/{identifier}.{m.group(1)}", template.sprites)
+        core_json = json.dumps({k: v for k, v in core.items() if k != "sprites"})[1:-1]
+        return b"{" + core_json.encode() + b', "sprites": ' + sprites.encode() + b", " + template.rest + b"}"
+
+    def payloads(self, ids=None) -> Iterator[Tuple[int, bytes]]:
+        for identifier in ids or self.ids():
+            yield identifier, self.payload(identifier)
+
+
+def build_database(
+    db_path: Path,
+    dex: SyntheticDex,
+    batch_size: int = 500,
+    progress: Callable[[int], None] = lambda done: None,
+) -> Dict[str, float]:
+    """Normalize every synthetic payload and bulk-write it to ``db_path``.
+
+    Returns normalize and write timings so the build doubles as the bulk
+    load measurement.
+    """
+    engine = make_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    writer = BulkWriter()
+    normalize_time = write_time = 0.0
+    records = 0
+    batch: List[PokemonData] = []
+
+    def flush():
+        nonlocal write_time
+        started = time.perf_counter()
+        write_batch(lambda: Session(engine), batch, writer)
+        write_time += time.perf_counter() - started
+        batch.clear()
+
+    for _, raw in dex.payloads():
+        started = time.perf_counter()
+        batch.append(PokemonData.model_construct(**normalize_payload(raw)))
+        normalize_time += time.perf_counter() - started
+        records += 1
+        if len(batch) >= batch_size:
+            flush()
+            progress(records)
+    if batch:
+        flush()
+    rows = table_rows(engine)
+    engine.dispose()
+    return {
+        "records": records,
+        "rows": rows,
+        "normalize_seconds": normalize_time,
+        "write_seconds": write_time,
+        "rows_per_second": rows / write_time if write_time else 0.0,
+    }
+
+
+def table_rows(engine) -> int:
+    """Rows across the tables the ETL writes per pokemon."""
+    tables = (Pokemon, PokemonType, PokemonStat, Sprite, PokemonDocument)
+    with engine.connect() as conn:
+        return sum(conn.execute(select(func.count()).select_from(t)).scalar_one() for t in tables)
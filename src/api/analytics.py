@@ -0,0 +1,181 @@
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from numpy.typing import ArrayLike
+from sqlmodel import Session, col, select
+from src.api.index import GenerationIndex
+from src.models import Pokemon, PokemonStat, PokemonType, Type
+from src.repository import STAT_ORDER
+
+PERCENTILES = (10, 25, 75, 90)
+HISTOGRAM_BINS = 16
+STAT_MAX = 256  # base stats are 1-255
+RANKING_SIZE = 10
+
+
+def load_stats(db: Session, ids: np.ndarray) -> np.ndarray:
+    """Base stats as a ``len(ids)`` x 6 matrix in ``STAT_ORDER`` (0 if missing).
+
+    ``ids`` must be sorted; rows are matched with a binary search instead
+    of one ORM object per stat row.
+    """
+    stats = np.zeros((len(ids), len(STAT_ORDER)), dtype=np.int64)
+    if not len(ids):
+        return stats
+    columns = {name: n for n, name in enumerate(STAT_ORDER)}
+    found = [
+        (pid, columns[name], value)
+        for pid, name, value in db.exec(select(PokemonStat.pokemon_id, PokemonStat.stat_name, PokemonStat.base_stat))
+        if name in columns
+    ]
+    if found:
+        pokemon_ids, cols, values = (np.array(x) for x in zip(*found))
+        rows = np.searchsorted(ids, pokemon_ids)
+        known = (rows < len(ids)) & (ids[np.minimum(rows, len(ids) - 1)] == pokemon_ids)
+        stats[rows[known], cols[known]] = values[known]
+    return stats
+
+
+def group_percentiles(groups: np.ndarray, values: np.ndarray, ngroups: int, qs: Sequence[float]) -> np.ndarray:
+    """Percentiles ``qs`` of ``values`` within each group, as ngroups x len(qs).
+
+    One lexsort for every group at once, then linear interpolation between
+    closest ranks (NumPy's default method). Empty groups are NaN.
+    """
+    order = np.lexsort((values, groups))
+    ordered = values[order].astype(np.float64)
+    counts = np.bincount(groups, minlength=ngroups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    out = np.full((ngroups, len(qs)), np.nan)
+    present = counts > 0
+    for j, q in enumerate(qs):
+        position = starts[present] + (counts[present] - 1) * (q / 100)
+        lo = np.floor(position).astype(np.int64)
+        hi = np.ceil(position).astype(np.int64)
+        out[present, j] = ordered[lo] + (ordered[hi] - ordered[lo]) * (position - lo)
+    return out
+
+
+def distribution(values: np.ndarray, upper: float) -> Dict[str, Any]:
+    if not len(values):
+        return {
+            "mean": 0.0, "median": 0.0, "std": 0.0, "min": 0, "max": 0,
+            "percentiles": {}, "histogram": {"edges": [], "counts": []},
+        }
+    quantiles = np.percentile(values, (50,) + PERCENTILES)
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS, range=(0, upper))
+    return {
+        "mean": round(float(values.mean()), 2),
+        "median": round(float(quantiles[0]), 2),
+        "std": round(float(values.std()), 2),
+        "min": int(values.min()),
+        "max": int(values.max()),
+        "percentiles": {f"p{q}": round(float(v), 2) for q, v in zip(PERCENTILES, quantiles[1:])},
+        "histogram": {"edges": [round(float(e), 2) for e in edges], "counts": counts.tolist()},
+    }
+
+
+class DexColumns:
+    """Column arrays of the whole dex for vectorized aggregates.
+
+    One row per pokemon (``ids``, ``stats`` in ``STAT_ORDER`` plus the
+    ``total``), and one row per pokemon-type pair (``type_rows`` indexing
+    the pokemon, ``type_codes`` indexing ``type_names``). Per-type
+    aggregates are group-bys over the pair arrays, so a dual-type pokemon
+    counts once for each of its types. Immutable; results are memoized.
+    """
+
+    def __init__(
+        self,
+        ids: ArrayLike,
+        names: Sequence[str],
+        stats: ArrayLike,
+        type_names: Sequence[str],
+        type_rows: ArrayLike,
+        type_codes: ArrayLike,
+    ):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names = list(names)
+        self.stats = np.asarray(stats, dtype=np.int64).reshape(len(self.ids), len(STAT_ORDER))
+        self.total = self.stats.sum(axis=1)
+        self.type_names = list(type_names)
+        self.type_rows = np.asarray(type_rows, dtype=np.int64)
+        self.type_codes = np.asarray(type_codes, dtype=np.int64)
+        # Histogram range for totals: the top total rounded up to a hundred
+        top = int(self.total.max()) if len(self.ids) else 0
+        self.total_upper = max(STAT_MAX, (top // 100 + 1) * 100)
+        self._summary: Optional[Dict[str, Any]] = None
+        self._types: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, db: Session) -> "DexColumns":
+        pokemon = db.exec(select(Pokemon.id, Pokemon.name).order_by(col(Pokemon.id))).all()
+        ids = np.array([p[0] for p in pokemon], dtype=np.int64)
+        types = db.exec(select(Type.id, Type.name).order_by(col(Type.name))).all()
+        codes = {type_id: n for n, (type_id, _) in enumerate(types)}
+        pairs = db.exec(select(PokemonType.pokemon_id, PokemonType.type_id)).all()
+        pair_ids = np.array([p[0] for p in pairs], dtype=np.int64)
+        pair_codes = np.array([codes.get(p[1], -1) for p in pairs], dtype=np.int64)
+        rows = np.searchsorted(ids, pair_ids)
+        known = (pair_codes >= 0) & (rows < len(ids))
+        known[known] &= ids[rows[known]] == pair_ids[known]
+        return cls(
+            ids, [p[1] for p in pokemon], load_stats(db, ids), [t[1] for t in types], rows[known], pair_codes[known]
+        )
+
+    def _columns(self, rows: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        out = {name: distribution(self.stats[rows, j], STAT_MAX) for j, name in enumerate(STAT_ORDER)}
+        out["total"] = distribution(self.total[rows], self.total_upper)
+        return out
+
+    def _ranking(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        top = rows[np.lexsort((self.ids[rows], -self.total[rows]))][:RANKING_SIZE]
+        return [{"id": int(self.ids[n]), "name": self.names[n], "total": int(self.total[n])} for n in top]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._summary is None:
+                self._summary = self._build_summary()
+            return self._summary
+
+    def _build_summary(self) -> Dict[str, Any]:
+        ntypes = len(self.type_names)
+        values = np.column_stack([self.stats, self.total])[self.type_rows]  # one row per pokemon-type pair
+        counts = np.bincount(self.type_codes, minlength=ntypes)
+        columns = range(values.shape[1])
+        sums = np.stack([np.bincount(self.type_codes, weights=values[:, j], minlength=ntypes) for j in columns], axis=1)
+        means = sums / np.maximum(counts, 1)[:, None]
+        medians = np.stack([group_percentiles(self.type_codes, values[:, j], ntypes, (50,))[:, 0] for j in columns], axis=1)
+        names = STAT_ORDER + ["total"]
+        types = {
+            name: {
+                "count": int(counts[n]),
+                "mean": {c: round(float(means[n, j]), 2) for j, c in enumerate(names)},
+                "median": {c: round(float(medians[n, j]), 2) for j, c in enumerate(names)},
+            }
+            for n, name in enumerate(self.type_names)
+            if counts[n]
+        }
+        everyone = np.arange(len(self.ids))
+        return {"count": len(self.ids), "stats": self._columns(everyone), "types": types, "ranking": self._ranking(everyone)}
+
+    def type_stats(self, name: str) -> Optional[Dict[str, Any]]:
+        name = name.lower()
+        if name not in self.type_names:
+            return None
+        with self._lock:
+            if name not in self._types:
+                rows = self.type_rows[self.type_codes == self.type_names.index(name)]
+                self._types[name] = {
+                    "name": name,
+                    "count": len(rows),
+                    "stats": self._columns(rows),
+                    "ranking": self._ranking(rows),
+                }
+            return self._types[name]
+
+
+analytics_index: GenerationIndex[DexColumns] = GenerationIndex(
+    DexColumns.load, lambda: DexColumns([], [], np.zeros((0, len(STAT_ORDER))), [], [], [])
+)
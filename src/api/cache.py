@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+from sqlmodel import Session
+from src.models import current_generation
+
+
+def pokemon_key(identifier: str) -> Tuple[str, object]:
+    """Cache key for /pokemon/{identifier}; names are aliases of the id key."""
+    try:
+        return ("pokemon", int(identifier))
+    except ValueError:
+        return ("pokemon", identifier.lower())
+
+
+class GenerationTracker:
+    """Throttled reader of the ``DataVersion`` stamp written by the ETL.
+
+    In-memory structures derived from the dex call :meth:`changed` on each
+    request; the stamp is re-read at most every ``check_interval`` seconds.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self.generation: Optional[int] = None
+        self._checked = float("-inf")
+
+    def changed(self, db: Session) -> bool:
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        # Stamped after the read: the query may yield to other requests (async
+        # mode), which must not take a generation that is still unknown as checked
+        generation = current_generation(db)
+        self._checked = now
+        if generation == self.generation:
+            return False
+        self.generation = generation
+        return True
+
+    def peek(self) -> Optional[int]:
+        """The generation if it was checked within the interval, without a query."""
+        if time.monotonic() - self._checked < self.check_interval:
+            return self.generation
+        return None
+
+    def reset(self):
+        self.generation = None
+        self._checked = float("-inf")
+
+
+class ResponseCache:
+    """Bounded LRU/TTL cache of serialized response bodies.
+
+    Entries are tied to the ``DataVersion`` generation written by the ETL:
+    :meth:`sync` re-reads it at most every ``check_interval`` seconds and
+    drops everything when it changed, so workers pick up new data without a
+    restart. Alias keys (e.g. a pokemon's name) share the canonical entry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, check_interval: float = 1.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.tracker = GenerationTracker(check_interval)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes, Tuple[Hashable, ...]]]" = OrderedDict()
+        self._aliases: Dict[Hashable, Hashable] = {}
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def sync(self, db: Session):
+        """Invalidate the cache if the dex generation moved on."""
+        previous = self.tracker.generation
+        if self.tracker.changed(db):
+            with self._lock:
+                if previous is not None:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._aliases.clear()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            key = self._aliases.get(key, key)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, body: bytes, aliases: Iterable[Hashable] = ()):
+        aliases = tuple(a for a in aliases if a != key)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, body, aliases)
+            for alias in aliases:
+                self._aliases[alias] = key
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        _, _, aliases = self._entries.pop(key)
+        for alias in aliases:
+            if self._aliases.get(alias) == key:
+                del self._aliases[alias]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "generation": self.tracker.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def reset(self):
+        """Drop all entries and counters (tests, admin)."""
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+            self.tracker.reset()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get("POKEDEX_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("POKEDEX_CACHE_TTL", "300")),
+    check_interval=float(os.environ.get("POKEDEX_CACHE_CHECK_INTERVAL", "1")),
+)
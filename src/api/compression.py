@@ -0,0 +1,169 @@
+import os
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:  # optional: pip install 'pokedex-mvp[compression]'
+    import brotli  # type: ignore [import-untyped, import-not-found]
+except ImportError:  # pragma: no cover - gzip is always available
+    brotli = None
+
+# Bodies smaller than about one TCP segment gain nothing from compression
+MIN_SIZE = int(os.environ.get("POKEDEX_COMPRESS_MIN_SIZE", "1400"))
+GZIP_LEVEL = int(os.environ.get("POKEDEX_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("POKEDEX_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE = ("application/json", "application/x-ndjson", "text/")
+# Server preference when the client accepts several equally
+ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+SKIP_STATUSES = {204, 206, 304}
+
+
+def negotiate(accept_encoding: Optional[str], available: Sequence[str] = ENCODINGS) -> Optional[str]:
+    """The coding to use for ``Accept-Encoding``, or None for identity.
+
+    Honours q-values (``q=0`` refuses a coding) and ``*``; ties go to the
+    first of ``available``.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.strip()] = q
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class Compressor:
+    """Incremental gzip or brotli, flushed per chunk so streams keep flowing."""
+
+    def __init__(self, encoding: str, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        elif encoding == "gzip":
+            self._br = None
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+        else:
+            raise ValueError(f"Unknown encoding: {encoding}")
+
+    def compress(self, data: bytes, final: bool = False) -> bytes:
+        if self._br is not None:
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._gzip.compress(data)
+        return out + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _compressible(headers: List[Tuple[bytes, bytes]], minimum_size: int, body: bytes, more_body: bool) -> bool:
+    values = {name.lower(): value for name, value in headers}
+    content_type = values.get(b"content-type", b"").decode("latin-1")
+    if b"content-encoding" in values or b"no-transform" in values.get(b"cache-control", b""):
+        return False
+    if not content_type.startswith(COMPRESSIBLE):
+        return False  # images, application/gzip exports and other opaque bodies
+    length = values.get(b"content-length")
+    if length is not None and length.isdigit():
+        return int(length) >= minimum_size
+    return more_body or len(body) >= minimum_size
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large text and JSON responses.
+
+    Picks brotli (if installed) or gzip from ``Accept-Encoding``. Bodies
+    under ``minimum_size`` are sent as they are; streamed bodies such as
+    the export are compressed chunk by chunk. Compressed responses get
+    ``Vary: Accept-Encoding`` and a weak ETag, since their bytes differ
+    from the identity body the strong tag was computed for.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = MIN_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept = next((value for name, value in scope["headers"] if name == b"accept-encoding"), b"")
+        encoding = negotiate(accept.decode("latin-1"))
+        start: Optional[dict] = None
+        compressor: Optional[Compressor] = None
+
+        async def send_wrapper(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                if message["status"] in SKIP_STATUSES or message["status"] < 200:
+                    await send(message)
+                else:
+                    start = message  # held until the first body chunk shows the size
+                return
+            if message["type"] != "http.response.body" or start is None:
+                if start is not None:
+                    # e.g. zerocopysend: the body bypasses us, so the start goes out unchanged first
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = list(start.get("headers", []))
+                if not _compressible(headers, self.minimum_size, body, more_body):
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                headers = self._vary(headers)
+                if encoding is None:
+                    await send({**start, "headers": headers})
+                    start = None
+                    await send(message)
+                    return
+                compressor = Compressor(encoding, self.gzip_level, self.brotli_quality)
+                data = compressor.compress(body, final=not more_body)
+                headers = [
+                    (name, b"W/" + value if name.lower() == b"etag" and not value.startswith(b"W/") else value)
+                    for name, value in headers
+                    if name.lower() != b"content-length"
+                ]
+                headers.append((b"content-encoding", encoding.encode()))
+                if not more_body:
+                    headers.append((b"content-length", str(len(data)).encode()))
+                await send({**start, "headers": headers})
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+            data = compressor.compress(body, final=not more_body)
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+        for n, (name, value) in enumerate(headers):
+            if name.lower() == b"vary":
+                if b"accept-encoding" not in value.lower():
+                    headers[n] = (name, value + b", Accept-Encoding")
+                return headers
+        return headers + [(b"vary", b"Accept-Encoding")]
@@ -0,0 +1,48 @@
+import hashlib
+import os
+from typing import Dict, Hashable, Optional
+from fastapi import Response
+
+# Browsers and CDNs may reuse a response this long, then serve it stale
+# while revalidating with If-None-Match in the background.
+MAX_AGE = int(os.environ.get("POKEDEX_HTTP_MAX_AGE", "60"))
+STALE_WHILE_REVALIDATE = int(os.environ.get("POKEDEX_HTTP_STALE_WHILE_REVALIDATE", "300"))
+CACHE_CONTROL = f"public, max-age={MAX_AGE}, stale-while-revalidate={STALE_WHILE_REVALIDATE}"
+# Locally stored sprite images never change behind their ETag (a digest)
+IMMUTABLE_MAX_AGE = int(os.environ.get("POKEDEX_HTTP_IMMUTABLE_MAX_AGE", str(365 * 24 * 3600)))
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+
+
+def make_etag(generation: Optional[int], key: Hashable) -> Optional[str]:
+    """Strong ETag for the representation of ``key`` at a data generation.
+
+    Every ETL write bumps the generation, so the tag changes whenever the
+    body could have; it needs no database access or serialization to compute.
+    """
+    if generation is None:
+        return None
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+    return f'"{generation}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str, exists: bool = True) -> bool:
+    """``If-None-Match`` uses weak comparison: ``W/`` prefixes are ignored.
+
+    ``*`` matches any existing representation; pass ``exists=False`` while
+    that is not known yet.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return exists
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: Optional[str]) -> Dict[str, str]:
+    if etag is None:
+        return {}
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
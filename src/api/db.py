@@ -0,0 +1,91 @@
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterator, Optional, Protocol, TypeVar
+from fastapi import Depends
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from src import models
+from src.database import env_flag, make_async_engine, make_engine
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+T = TypeVar("T")
+
+# Serve requests through an async engine/session instead of the threadpool
+ASYNC_DB = env_flag("POKEDEX_DB_ASYNC")
+# Open the database read-only, leaving the ETL as the only writer. IMMUTABLE
+# also skips file locking; only for a database nothing writes to.
+IMMUTABLE = env_flag("POKEDEX_DB_IMMUTABLE")
+READONLY = IMMUTABLE or env_flag("POKEDEX_DB_READONLY")
+
+engine = make_engine(readonly=True, immutable=IMMUTABLE) if READONLY else models.engine
+
+_async_engine: Optional["AsyncEngine"] = None
+
+
+def get_async_engine() -> "AsyncEngine":
+    """Created on first use, so sync-only processes never import the async driver."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = make_async_engine(readonly=READONLY, immutable=IMMUTABLE)
+    return _async_engine
+
+
+async def dispose_async_engine():
+    """Close pooled async connections; aiosqlite's worker threads keep the process alive otherwise."""
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+
+class Database(Protocol):
+    """Runs a sync ``fn(session, *args)`` for an async handler.
+
+    Repository code stays plain sync SQLModel; only how it is driven changes
+    between the threaded and the async mode.
+    """
+
+    async def run(self, fn: Callable[..., T], *args) -> T: ...
+
+
+class ThreadedDatabase:
+    """Blocking ``Session``: each call is one hop onto Starlette's threadpool."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        return await run_in_threadpool(fn, self.session, *args)
+
+
+class AsyncDatabase:
+    """``AsyncSession`` over an async driver: ``fn`` runs on the event loop
+    and yields to it at every database round trip, so no threads are used."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        return await self.session.run_sync(fn, *args)
+
+
+def get_db() -> Iterator[Session]:
+    db = Session(engine)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_threaded_database(db: Session = Depends(get_db)) -> ThreadedDatabase:
+    return ThreadedDatabase(db)
+
+
+async def get_async_database() -> AsyncIterator[AsyncDatabase]:
+    async with AsyncSession(get_async_engine()) as session:
+        yield AsyncDatabase(session)
+
+
+# Chosen once at import from POKEDEX_DB_ASYNC; tests override either by identity
+get_database = get_async_database if ASYNC_DB else get_threaded_database
@@ -0,0 +1,99 @@
+import os
+import re
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+import anyio
+from starlette.responses import Response
+
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """The inclusive ``(start, end)`` a ``Range`` header asks for, or None.
+
+    Only single ranges are served; anything else (multiple ranges, other
+    units, a last byte before the first) is ignored and gets the full body,
+    as RFC 9110 allows. A range starting past the end is unsatisfiable.
+    """
+    match = RANGE.match(header.strip()) if header else None
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":  # suffix: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None  # invalid, not unsatisfiable: ignored (RFC 9110 14.1.1)
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class RangeFileResponse(Response):
+    """A file, or one byte range of it, sent straight from disk.
+
+    Uses the ASGI ``http.response.zerocopysend`` extension (``sendfile``)
+    when the server offers it, and otherwise streams the file in chunks;
+    the body is never read into memory whole.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        media_type: str,
+        headers: Optional[Mapping[str, str]] = None,
+        range_header: Optional[str] = None,
+    ):
+        self.path = path
+        self.media_type = media_type
+        self.background = None
+        self.status_code = 200
+        size = os.stat(path).st_size
+        self.init_headers(headers)
+        self.headers["accept-ranges"] = "bytes"
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            self.status_code = 416
+            self.offset = self.count = 0
+            self.headers["content-range"] = f"bytes */{size}"
+            self.headers["content-length"] = "0"
+            return
+        if byte_range is None:
+            self.offset, self.count = 0, size
+        else:
+            self.status_code = 206
+            self.offset, self.count = byte_range[0], byte_range[1] - byte_range[0] + 1
+            self.headers["content-range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{size}"
+        self.headers["content-length"] = str(self.count)
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.count or scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as fh:
+                await send(
+                    {"type": "http.response.zerocopysend", "file": fh.fileno(), "offset": self.offset, "count": self.count}
+                )
+            return
+        async with await anyio.open_file(self.path, "rb") as fh:
+            await fh.seek(self.offset)
+            remaining = self.count
+            while remaining:
+                chunk = await fh.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break  # file shrank underneath us; the length header is already out
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining:
+                await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,68 @@
+import threading
+from typing import Callable, Dict, Generic, Optional, Sequence, Tuple, TypeVar
+import numpy as np
+from numpy.typing import ArrayLike
+from sqlmodel import Session
+from src.api.cache import GenerationTracker
+
+T = TypeVar("T")
+
+
+class DexRows:
+    """Row lookup by pokemon id or (case-insensitive) name for dex-ordered arrays."""
+
+    ids: np.ndarray
+    names: Sequence[str]
+
+    def _index_rows(self, ids: ArrayLike, names: Sequence[str]):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names = list(names)
+        self.rows: Dict[int, int] = {int(i): n for n, i in enumerate(self.ids)}
+        self.rows_by_name: Dict[str, int] = {name.lower(): n for n, name in enumerate(self.names)}
+
+    def row(self, identifier: str) -> Optional[int]:
+        try:
+            return self.rows.get(int(identifier))
+        except ValueError:
+            return self.rows_by_name.get(identifier.lower())
+
+
+class GenerationIndex(Generic[T]):
+    """Holds an in-memory structure built from the dex, rebuilt when the ETL writes.
+
+    ``sync`` may run on the event loop (``AsyncSession.run_sync`` in async
+    mode), where every query yields to other requests. So no lock is held
+    across the generation check or the build: a request that finds the
+    structure missing or stale builds its own and swaps it in, and requests
+    racing on a cold start or a new generation each build once rather than
+    queueing behind the first. A build is only swapped in if the generation
+    it was made for is still the current one.
+    """
+
+    def __init__(self, load: Callable[[Session], T], empty: Callable[[], T], check_interval: float = 1.0):
+        self.load = load
+        self.empty = empty
+        self.tracker = GenerationTracker(check_interval)
+        self._built: Tuple[Optional[int], T] = (None, empty())
+        self._swap = threading.Lock()  # never held across I/O
+
+    @property
+    def current(self) -> T:
+        return self._built[1]
+
+    def sync(self, db: Session) -> T:
+        self.tracker.changed(db)
+        generation = self.tracker.generation
+        built = self._built
+        if generation is None or built[0] == generation:
+            return built[1]
+        value = self.load(db)
+        with self._swap:
+            if self.tracker.generation == generation:  # not overtaken by a newer one meanwhile
+                self._built = (generation, value)
+        return value
+
+    def reset(self):
+        with self._swap:
+            self.tracker.reset()
+            self._built = (None, self.empty())
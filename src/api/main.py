@@ -1,34 +1,74 @@
-from fastapi import FastAPI, Depends, HTTPException, Form
+import base64
+import binascii
+import json
+import math
+import re
+from typing import List, Optional
+from fastapi import FastAPI, Depends, HTTPException, Form, Header, Query, Response
+from fastapi.responses import ORJSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from src.models import Pokemon, Type, PokemonType, PokemonStat, Sprite, engine, create_db_and_tables
-from src.schemas import PokemonResponse, SpriteResponse, TypeInfo, Stat
-from sqlmodel import Session, select
-
-def extract_model(result):
-    """Extract SQLModel object from SQLAlchemy Row if needed"""
-    if result is None:
-        return None
-    # If it's already a SQLModel object (has expected attributes), return it
-    if hasattr(result, 'id') or hasattr(result, 'name'):
-        return result
-    # Otherwise try to extract from Row
-    try:
-        return result[0] if len(result) > 0 else result
-    except (TypeError, IndexError):
-        return result
+from src import export as dex_export, repository
+from src.api.cache import pokemon_key, response_cache
+from src.api.compression import CompressionMiddleware
+from src.api.metrics import MetricsMiddleware, metrics
+from src.api.conditional import IMMUTABLE_CACHE_CONTROL, cache_headers, etag_matches, make_etag, not_modified
+from src.api.files import RangeFileResponse
+from src.api.db import READONLY, Database, dispose_async_engine, engine, get_database, get_db  # noqa: F401 - get_db is the sync override point
+from src.api.analytics import analytics_index
+from src.api.search import search_index
+from src.api.similar import METRICS, similarity_index
+from src.api.teams import MAX_TEAM_SIZE, resolve_team, team_index
+from src.api.warmup import warm_up
+from src.etl.sprites import SpriteStore
+from src.models import Sprite, SpriteVariant, create_db_and_tables, schema_is_current
+from src.schemas import BatchRequest, BatchResponse, NameSearchResponse, PokemonListResponse, PokemonResponse, SimilarResponse, SpriteResponse, StatsSummaryResponse, TeamAnalysisResponse, TeamRequest, TypeStatsResponse
+from src.serialization import dumps
+from sqlmodel import Session
 
-def get_db():
-    db = Session(engine)
-    try:
-        yield db
-    finally:
-        db.close()
+MAX_BATCH_SIZE = 50
+STAT_FILTER = re.compile(r"^([a-z-]+)(>=|<=|>|<|=)(\d+)$")
+
+# Handlers build plain dicts in the response_model shape and return them as
+# ORJSONResponse: the models still document the API, but FastAPI skips
+# validating and re-encoding what was already built to that shape.
+app = FastAPI(title="Pokedex API", description="Pokedex MVP API", default_response_class=ORJSONResponse)
+app.add_middleware(CompressionMiddleware)
+# Outermost (added last): timings include compression and sizes are as sent
+app.add_middleware(MetricsMiddleware)
+
+_prepared = False
+
+class SchemaError(RuntimeError):
+    """The database schema is missing or outdated and this API may not upgrade it."""
+
+def prepare():
+    """Check the schema and warm up, once per process.
 
-app = FastAPI(title="Pokedex API", description="Pokedex MVP API")
+    ``src.api.serve`` calls this before forking workers, so they start
+    warm and share the loaded data copy-on-write.
+    """
+    global _prepared
+    if _prepared:
+        return
+    # One primary-key read; create_all would introspect every table and index
+    if not schema_is_current(engine):
+        if READONLY:  # the ETL owns the schema of a read-only API; warming up would only crash later
+            raise SchemaError(
+                "Database schema is missing or outdated and POKEDEX_DB_READONLY is set; "
+                "run `python src/etl/main.py rebuild-documents` (or any load) to upgrade it"
+            )
+        create_db_and_tables()
+    with Session(engine) as db:
+        warm_up(db)
+    _prepared = True
 
 @app.on_event("startup")
 def startup_event():
-    create_db_and_tables()
+    prepare()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await dispose_async_engine()
 
 # Mount UI
 app.mount("/ui", StaticFiles(directory="public/ui"), name="ui")
@@ -37,125 +77,305 @@ app.mount("/ui", StaticFiles(directory="public/ui"), name="ui")
 def read_root():
     return {"message": "Pokedex API ready. Load Pokemon via /pokemon/{id}"}
 
-@app.get("/pokemon/{identifier}", response_model=PokemonResponse)
-def get_pokemon(identifier: str, db: Session = Depends(get_db)):
+def encode_cursor(sort: str, descending: bool, key) -> str:
+    raw = json.dumps([sort, descending, *key]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def decode_cursor(cursor: str, sort: str, descending: bool):
     try:
-        id_int = int(identifier)
-        query = select(Pokemon).where(Pokemon.id == id_int)
-    except ValueError:
-        query = select(Pokemon).where(Pokemon.name == identifier.lower())
-    
-    result = db.exec(query).first()
-    
-    if not result:
-        raise HTTPException(status_code=404, detail="Pokemon not found")
-    
-    # Extract Pokemon object from Row
-    pokemon = extract_model(result)
-    
-    # Build types by querying separately
-    pokemon_types_result = db.exec(select(PokemonType).where(PokemonType.pokemon_id == pokemon.id)).all()
-    types_list = []
-    for pt_row in pokemon_types_result:
-        pt = extract_model(pt_row)
-        type_result = db.exec(select(Type).where(Type.id == pt.type_id)).first()
-        if type_result:
-            type_obj = extract_model(type_result)
-            types_list.append(TypeInfo(name=type_obj.name, slot=pt.slot))
-    
-    # Build stats
-    stats_list = []
-    pokemon_stats_result = db.exec(select(PokemonStat).where(PokemonStat.pokemon_id == pokemon.id)).all()
-    for ps_row in pokemon_stats_result:
-        ps = extract_model(ps_row)
-        stats_list.append(Stat(name=ps.stat_name, base_stat=ps.base_stat))
-    
-    # Build sprites dict, add None for missing
-    sprites_result = db.exec(select(Sprite).where(Sprite.pokemon_id == pokemon.id)).all()
-    sprites_dict = {}
-    for s_row in sprites_result:
-        s = extract_model(s_row)
-        sprites_dict[s.variant] = s.url
-    
-    expected_variants = ["front_default", "front_shiny", "back_default", "front_female"]
-    for variant in expected_variants:
-        if variant not in sprites_dict:
-            sprites_dict[variant] = None
-    
-    response = PokemonResponse(
-        id=pokemon.id,
-        name=pokemon.name,
-        height_m=pokemon.height / 10.0,
-        weight_kg=pokemon.weight / 10.0,
-        types=types_list,
-        stats=stats_list,
-        sprites=sprites_dict
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_desc, value, last_id = json.loads(raw)
+    except (binascii.Error, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (cursor_sort, cursor_desc) != (sort, descending):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    # Only names sort by a string; every other sort key is an integer column
+    value_ok = isinstance(value, str) if sort == "name" else is_int(value)
+    if not (value_ok and is_int(last_id)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, last_id
+
+def load_list_page(db: Session, query: repository.ListQuery):
+    page, next_key = repository.list_pokemon(db, query)
+    return repository.to_summaries(db, page), next_key
+
+@app.get("/pokemon/list", response_model=PokemonListResponse)
+async def list_pokemon(
+    type: Optional[str] = Query(None, description="Comma-separated type names; all must match"),
+    stat: List[str] = Query([], description="Stat thresholds, e.g. speed>=100 (repeatable)"),
+    min_height: Optional[float] = Query(None, ge=0, description="Meters"),
+    max_height: Optional[float] = Query(None, ge=0, description="Meters"),
+    min_weight: Optional[float] = Query(None, ge=0, description="Kilograms"),
+    max_weight: Optional[float] = Query(None, ge=0, description="Kilograms"),
+    sort: str = Query("id", description="id, name, height, weight or a stat name"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    database: Database = Depends(get_database),
+):
+    stat_filters = []
+    for expression in stat:
+        match = STAT_FILTER.match(expression.replace(" ", "").lower())
+        if not match or match.group(1) not in repository.STAT_ORDER:
+            raise HTTPException(status_code=400, detail=f"Invalid stat filter: {expression}")
+        stat_filters.append((match.group(1), match.group(2), int(match.group(3))))
+    if sort not in repository.SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort field: {sort}")
+    descending = order == "desc"
+
+    # Stored in whole decimetres/hectograms: round lower bounds up and upper
+    # bounds down, so no row outside the requested range matches
+    def lower_bound(value: Optional[float]) -> Optional[int]:
+        return None if value is None else math.ceil(value * 10 - 1e-9)
+
+    def upper_bound(value: Optional[float]) -> Optional[int]:
+        return None if value is None else math.floor(value * 10 + 1e-9)
+
+    query = repository.ListQuery(
+        types=[t.strip() for t in type.split(",") if t.strip()] if type else [],
+        stat_filters=stat_filters,
+        min_height=lower_bound(min_height),
+        max_height=upper_bound(max_height),
+        min_weight=lower_bound(min_weight),
+        max_weight=upper_bound(max_weight),
+        sort=sort,
+        descending=descending,
+        limit=limit,
+        after=decode_cursor(cursor, sort, descending) if cursor else None,
     )
-    return response
+    items, next_key = await database.run(load_list_page, query)
+    return ORJSONResponse({
+        "items": items,
+        "next_cursor": encode_cursor(sort, descending, next_key) if next_key else None,
+    })
+
+@app.get("/pokemon/search", response_model=NameSearchResponse)
+async def search_names(
+    q: str = Query(..., min_length=1, max_length=50, description="Partial or misspelled name"),
+    limit: int = Query(10, ge=1, le=50),
+    database: Database = Depends(get_database),
+):
+    index = await database.run(search_index.sync)
+    return ORJSONResponse({"query": q, "results": index.search(q, limit)})
+
+def load_batch(db: Session, identifiers: List[str]) -> List[Optional[bytes]]:
+    bodies = repository.get_documents(db, identifiers)
+    unresolved = [i for i, body in zip(identifiers, bodies) if body is None]
+    if unresolved:
+        # Pokemon loaded before documents existed, or genuinely unknown
+        fallback = dict(zip(unresolved, repository.get_many(db, unresolved)))
+        for n, identifier in enumerate(identifiers):
+            pokemon = fallback.get(identifier)
+            if bodies[n] is None and pokemon is not None:
+                bodies[n] = dumps(repository.to_record(pokemon))
+    return bodies
+
+async def lookup_batch(identifiers: List[str], database: Database) -> Response:
+    identifiers = [i.strip() for i in identifiers if i.strip()]
+    if not identifiers:
+        raise HTTPException(status_code=400, detail="No identifiers given")
+    if len(identifiers) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} identifiers per batch")
+    bodies = await database.run(load_batch, identifiers)
+    # Documents are already response JSON: splice them in rather than re-validating
+    items = []
+    missing = []
+    for identifier, body in zip(identifiers, bodies):
+        key = dumps(identifier)
+        if body is None:
+            missing.append(identifier)
+            items.append(b'{"identifier":' + key + b',"pokemon":null,"error":"Pokemon not found"}')
+        else:
+            items.append(b'{"identifier":' + key + b',"pokemon":' + body + b',"error":null}')
+    content = b'{"results":[' + b",".join(items) + b'],"missing":' + dumps(missing) + b"}"
+    return Response(content=content, media_type="application/json")
+
+@app.get("/pokemon", response_model=BatchResponse)
+async def get_pokemon_batch(
+    ids: str = Query(..., description="Comma-separated ids and/or names"),
+    database: Database = Depends(get_database),
+):
+    return await lookup_batch(ids.split(","), database)
+
+@app.post("/pokemon/batch", response_model=BatchResponse)
+async def post_pokemon_batch(request: BatchRequest, database: Database = Depends(get_database)):
+    return await lookup_batch([str(i) for i in request.ids], database)
+
+def load_pokemon(db: Session, identifier: str) -> bytes:
+    response_cache.sync(db)
+    body = response_cache.get(pokemon_key(identifier))
+    if body is None:
+        document = repository.get_document(db, identifier)
+        if document is None:
+            # Database loaded before documents existed: assemble from the normalized tables
+            pokemon = repository.get_pokemon(db, identifier)
+            if not pokemon:
+                raise HTTPException(status_code=404, detail="Pokemon not found")
+            document = repository.document_for(repository.to_record(pokemon))
+        body = document.body
+        response_cache.put(("pokemon", document.id), body, aliases=[("pokemon", document.name)])
+    return body
+
+async def conditional_response(key, if_none_match: Optional[str], database: Database, load, *args) -> Response:
+    """Serve ``load(db, *args)`` with an ETag, or 304 if the client has it.
+
+    While the data generation is fresh in memory the ETag is known up
+    front, so a revalidation is answered without touching the database.
+    Otherwise a revalidation re-reads only the generation stamp before
+    comparing; the body is loaded only when the client's tag is stale.
+    """
+    generation = response_cache.tracker.peek()
+    if generation is None and if_none_match:
+        await database.run(response_cache.sync)
+        generation = response_cache.tracker.generation
+    etag = make_etag(generation, key)
+    if etag is not None and etag_matches(if_none_match, etag, exists=False):
+        return not_modified(etag)
+    body = await database.run(load, *args)
+    etag = make_etag(response_cache.tracker.generation, key)
+    if etag is not None and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
+
+@app.get("/pokemon/{identifier}", response_model=PokemonResponse)
+async def get_pokemon(
+    identifier: str,
+    if_none_match: Optional[str] = Header(None),
+    database: Database = Depends(get_database),
+):
+    return await conditional_response(pokemon_key(identifier), if_none_match, database, load_pokemon, identifier)
+
+def load_sprite(db: Session, id: int, variant: str) -> bytes:
+    response_cache.sync(db)
+    key = ("sprite", id, variant)
+    body = response_cache.get(key)
+    if body is None:
+        row = db.exec(repository.sprite_query(Sprite.pokemon_id == id, SpriteVariant.name == variant)).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Sprite not found")
+        body = dumps({"url": row.url, "available": bool(row.url)})
+        response_cache.put(key, body)
+    return body
+
+@app.get("/pokemon/{identifier}/similar", response_model=SimilarResponse)
+async def similar_pokemon(
+    identifier: str,
+    k: int = Query(10, ge=1, le=100),
+    metric: str = Query("cosine", description="cosine or euclidean, over base stats and height/weight"),
+    database: Database = Depends(get_database),
+):
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric: {metric}")
+    matrix = await database.run(similarity_index.sync)
+    row = matrix.row(identifier)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Pokemon not found")
+    results = [{"id": i, "name": name, "score": score} for i, name, score in matrix.similar(row, k, metric)]
+    return ORJSONResponse({"id": int(matrix.ids[row]), "name": matrix.names[row], "metric": metric, "results": results})
 
 @app.get("/pokemon/{id}/sprites/{variant}", response_model=SpriteResponse)
-def get_sprite(id: int, variant: str, db: Session = Depends(get_db)):
-    result = db.exec(select(Sprite).where(Sprite.pokemon_id == id, Sprite.variant == variant)).first()  # type: ignore [attr-defined]
-    if not result:
+async def get_sprite(
+    id: int,
+    variant: str,
+    if_none_match: Optional[str] = Header(None),
+    database: Database = Depends(get_database),
+):
+    return await conditional_response(("sprite", id, variant), if_none_match, database, load_sprite, id, variant)
+
+sprite_store = SpriteStore()
+
+def resolve_sprite_image(db: Session, id: int, variant: str):
+    """The stored image for a sprite, else its upstream URL."""
+    row = db.exec(repository.sprite_query(Sprite.pokemon_id == id, SpriteVariant.name == variant)).first()
+    if not row or not row.url:
         raise HTTPException(status_code=404, detail="Sprite not found")
-    sprite = extract_model(result)
-    return SpriteResponse(url=sprite.url, available=bool(sprite.url))
+    url = row.url
+    entry = sprite_store.lookup(url)
+    return url, entry
 
-@app.post("/pokemon")
-def search_pokemon(identifier: str = Form(...), db: Session = Depends(get_db)):
-    # Reuse get_pokemon logic, return JSON
-    try:
-        id_int = int(identifier)
-        query = select(Pokemon).where(Pokemon.id == id_int)
-    except ValueError:
-        query = select(Pokemon).where(Pokemon.name == identifier.lower())
-    
-    result = db.exec(query).first()
-    
-    if not result:
-        raise HTTPException(status_code=404, detail="Pokemon not found")
-    
-    # Extract Pokemon object from Row
-    pokemon = extract_model(result)
-    
-    # Build types by querying separately
-    pokemon_types_result = db.exec(select(PokemonType).where(PokemonType.pokemon_id == pokemon.id)).all()
-    types_list = []
-    for pt_row in pokemon_types_result:
-        pt = extract_model(pt_row)
-        type_result = db.exec(select(Type).where(Type.id == pt.type_id)).first()
-        if type_result:
-            type_obj = extract_model(type_result)
-            types_list.append({"name": type_obj.name, "slot": pt.slot})
-    
-    # Build stats
-    stats_list = []
-    pokemon_stats_result = db.exec(select(PokemonStat).where(PokemonStat.pokemon_id == pokemon.id)).all()
-    for ps_row in pokemon_stats_result:
-        ps = extract_model(ps_row)
-        stats_list.append({"name": ps.stat_name, "base_stat": ps.base_stat})
-    
-    # Build sprites dict, add None for missing
-    sprites_result = db.exec(select(Sprite).where(Sprite.pokemon_id == pokemon.id)).all()
-    sprites_dict = {}
-    for s_row in sprites_result:
-        s = extract_model(s_row)
-        sprites_dict[s.variant] = s.url
-    
-    for v in ["front_default", "front_shiny", "back_default", "front_female"]:
-        if v not in sprites_dict:
-            sprites_dict[v] = None
-    
-    return {
-        "id": pokemon.id,
-        "name": pokemon.name,
-        "height_m": pokemon.height / 10.0,
-        "weight_kg": pokemon.weight / 10.0,
-        "types": types_list,
-        "stats": stats_list,
-        "sprites": sprites_dict
-    }
+@app.get("/pokemon/{id}/sprites/{variant}/image", response_class=Response)
+async def get_sprite_image(
+    id: int,
+    variant: str,
+    if_none_match: Optional[str] = Header(None),
+    byte_range: Optional[str] = Header(None, alias="range"),
+    if_range: Optional[str] = Header(None),
+    database: Database = Depends(get_database),
+):
+    url, entry = await database.run(resolve_sprite_image, id, variant)
+    if entry is None:
+        # Not downloaded (yet): let the browser fetch it upstream, and ask again next time
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-cache"})
+    etag = f'"{entry.digest[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if if_range is not None and if_range.strip() != etag:
+        byte_range = None  # the client's partial copy is of something else
+    return RangeFileResponse(sprite_store.object_path(entry), entry.content_type, headers, byte_range)
+
+@app.post("/pokemon", response_model=PokemonResponse)
+async def search_pokemon(identifier: str = Form(...), database: Database = Depends(get_database)):
+    # Same lookup and ETag as GET /pokemon/{identifier}, for the HTMX form post.
+    # Preconditions only apply to GET, so the body is always sent.
+    return await conditional_response(pokemon_key(identifier), None, database, load_pokemon, identifier)
+
+@app.get("/stats/summary", response_model=StatsSummaryResponse)
+async def stats_summary(database: Database = Depends(get_database)):
+    columns = await database.run(analytics_index.sync)
+    return ORJSONResponse(columns.summary())
+
+@app.get("/types/{name}/stats", response_model=TypeStatsResponse)
+async def type_stats(name: str, database: Database = Depends(get_database)):
+    columns = await database.run(analytics_index.sync)
+    stats = columns.type_stats(name)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Type not found")
+    return ORJSONResponse(stats)
+
+@app.post("/teams/analyze", response_model=TeamAnalysisResponse)
+async def analyze_team(request: TeamRequest, database: Database = Depends(get_database)):
+    identifiers = [str(i).strip() for i in request.ids if str(i).strip()]
+    if not identifiers:
+        raise HTTPException(status_code=400, detail="No pokemon given")
+    if len(identifiers) > MAX_TEAM_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TEAM_SIZE} pokemon per team")
+    chart = await database.run(team_index.sync)
+    if not chart:
+        raise HTTPException(status_code=503, detail="Type chart not loaded; run the ETL type-chart command")
+    rows, missing = resolve_team(chart, identifiers)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Pokemon not found: {', '.join(missing)}")
+    return ORJSONResponse(chart.analyze(rows))
+
+@app.get("/export")
+def export_dex(
+    format: str = Query("ndjson", description="ndjson, csv or columnar (one column-wise record batch per line)"),
+    gzip: bool = Query(False, description="Gzip the stream"),
+    db: Session = Depends(get_db),
+):
+    # Streams from a sync generator, which Starlette iterates in the threadpool
+    if format not in dex_export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format: {format}")
+    filename = f"pokedex.{dex_export.EXTENSIONS[format]}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        dex_export.export(db, format, gzip),
+        media_type="application/gzip" if gzip else dex_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/cache/stats")
+def cache_stats():
+    return response_cache.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Multi-worker, warmed before forking; see src/api/serve.py
+    from src.api.serve import cli
+    cli()
\ No newline at end of file
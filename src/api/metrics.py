@@ -0,0 +1,201 @@
+import logging
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("pokedex.metrics")
+
+# Log requests running more than this many SQL statements (0 = off)
+QUERY_LOG_THRESHOLD = int(os.environ.get("POKEDEX_LOG_QUERIES_OVER", "0"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+@dataclass
+class RequestStats:
+    """SQL work done on behalf of the current request."""
+
+    statements: List[str] = field(default_factory=list)
+    db_time: float = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("pokedex_request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("pokedex_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("pokedex_query_start")
+    if stats is None or not starts:
+        return
+    stats.db_time += time.perf_counter() - starts.pop()
+    stats.statements.append(statement)
+
+
+@dataclass
+class RouteMetrics:
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    size: Histogram = field(default_factory=lambda: Histogram(SIZE_BUCKETS))
+    statements: Histogram = field(default_factory=lambda: Histogram(STATEMENT_BUCKETS))
+    db_time: float = 0.0
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+
+class Metrics:
+    """Per-route request metrics, rendered in Prometheus text format.
+
+    Only ever updated from the event loop, so no locking is needed. Each
+    worker process keeps its own registry.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def record(self, method: str, route: str, status: int, elapsed: float, size: int, stats: RequestStats):
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(elapsed)
+        metrics.size.observe(size)
+        metrics.statements.observe(len(stats.statements))
+        metrics.db_time += stats.db_time
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def render(self) -> str:
+        sections: Dict[str, List[str]] = {
+            "pokedex_http_requests_total counter": [],
+            "pokedex_http_request_duration_seconds histogram": [],
+            "pokedex_http_response_size_bytes histogram": [],
+            "pokedex_db_statements_per_request histogram": [],
+            "pokedex_db_time_seconds_total counter": [],
+        }
+        for (method, route), m in sorted(self.routes.items()):
+            labels = f'method="{method}",route="{route}"'
+            for status, count in sorted(m.statuses.items()):
+                sections["pokedex_http_requests_total counter"].append(
+                    f'pokedex_http_requests_total{{{labels},status="{status}"}} {count}'
+                )
+            sections["pokedex_http_request_duration_seconds histogram"] += m.latency.render(
+                "pokedex_http_request_duration_seconds", labels
+            )
+            sections["pokedex_http_response_size_bytes histogram"] += m.size.render(
+                "pokedex_http_response_size_bytes", labels
+            )
+            sections["pokedex_db_statements_per_request histogram"] += m.statements.render(
+                "pokedex_db_statements_per_request", labels
+            )
+            sections["pokedex_db_time_seconds_total counter"].append(
+                f"pokedex_db_time_seconds_total{{{labels}}} {m.db_time:.6f}"
+            )
+        lines = []
+        for header, samples in sections.items():
+            name, kind = header.split()
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        self.routes.clear()
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request and accounting its SQL.
+
+    Adds a ``Server-Timing`` header (``db`` and ``app`` durations) to every
+    response and records latency, response size and statement count per
+    route template. Requests running more than ``QUERY_LOG_THRESHOLD``
+    statements are logged with their SQL to catch N+1 regressions.
+    """
+
+    def __init__(self, app, registry: Metrics = metrics, query_log_threshold: Optional[int] = None):
+        self.app = app
+        self.registry = registry
+        self.query_log_threshold = QUERY_LOG_THRESHOLD if query_log_threshold is None else query_log_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _current.get() is not None:
+            # Nested instance: the outer one already measures this request
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={stats.db_time * 1000:.2f};desc="{len(stats.statements)} queries", '
+                    f"app;dur={elapsed_ms:.2f}"
+                )
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            self.registry.record(scope["method"], template, status, elapsed, size, stats)
+            if self.query_log_threshold and len(stats.statements) > self.query_log_threshold:
+                logger.warning(
+                    "%s %s ran %d SQL statements (%.1f ms in db):\n%s",
+                    scope["method"],
+                    scope["path"],
+                    len(stats.statements),
+                    stats.db_time * 1000,
+                    "\n".join(stats.statements),
+                )
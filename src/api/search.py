@@ -0,0 +1,155 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlmodel import Session, select
+from src.api.index import GenerationIndex
+from src.models import Pokemon
+
+Entry = Tuple[int, str]  # (pokemon id, name)
+
+
+class _Node:
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entry: Optional[Entry] = None
+
+
+def max_distance(query: str) -> int:
+    """Typos tolerated for a query: none for 1-2 chars, then 1, then 2."""
+    if len(query) <= 2:
+        return 0
+    return 1 if len(query) <= 5 else 2
+
+
+class NameIndex:
+    """Immutable trie over pokemon names for autocomplete.
+
+    Prefix lookups walk ``len(query)`` nodes and then enumerate completions
+    in name order. Fuzzy lookups run a Levenshtein row per trie node and
+    prune subtrees whose best possible distance already exceeds the budget,
+    so only a small fraction of the trie is visited. A name matches fuzzily
+    when some *prefix* of it is within the budget, so partial input with a
+    typo ("bulbsa") still completes; the first letter must match.
+    """
+
+    def __init__(self, entries: Iterable[Entry]):
+        self.root = _Node()
+        self.size = 0
+        for pokemon_id, name in entries:
+            node = self.root
+            for char in name.lower():
+                node = node.children.setdefault(char, _Node())
+            node.entry = (pokemon_id, name)
+            self.size += 1
+        self._search = lru_cache(maxsize=4096)(self._search)  # type: ignore [method-assign]
+
+    @classmethod
+    def load(cls, db: Session) -> "NameIndex":
+        return cls(db.exec(select(Pokemon.id, Pokemon.name)).all())
+
+    def _walk(self, node: _Node, limit: int, out: List[Entry]):
+        if node.entry is not None:
+            out.append(node.entry)
+        for char in sorted(node.children):
+            if len(out) >= limit:
+                return
+            self._walk(node.children[char], limit, out)
+
+    def prefix(self, query: str, limit: int = 10) -> List[Entry]:
+        node = self.root
+        for char in query.lower():
+            child = node.children.get(char)
+            if child is None:
+                return []
+            node = child
+        out: List[Entry] = []
+        self._walk(node, limit, out)
+        return out[:limit]
+
+    def fuzzy(self, query: str, budget: int, limit: int = 10) -> List[Tuple[Entry, int]]:
+        """The ``limit`` closest names having a prefix within ``budget`` edits.
+
+        Tries a budget of one edit before two, since the narrower search
+        prunes far more of the trie and usually fills ``limit`` on its own.
+        """
+        query = query.lower()
+        # Like most spellers, trust the first letter: it keeps the search to
+        # one root subtree, which is what makes per-keystroke lookups cheap.
+        start = self.root.children.get(query[:1])
+        if start is None:
+            return []
+        found: Dict[Entry, int] = {}
+        for allowed in range(1, budget + 1):
+            found = self._fuzzy(start, query, allowed, limit)
+            if len(found) >= limit:
+                break
+        return sorted(found.items(), key=lambda item: (item[1], item[0][1]))[:limit]
+
+    def _fuzzy(self, start: _Node, query: str, budget: int, limit: int) -> Dict[Entry, int]:
+        m = len(query)
+        big = budget + 1  # every value above the budget is equally useless
+        found: Dict[Entry, int] = {}
+        # Levenshtein row for the first letter, which is known to match
+        first = [1] + [min(i - 1, big) for i in range(1, m + 1)]
+        stack = [(start, first, 1, first[m])]
+        while stack:
+            node, row, depth, best = stack.pop()
+            floor = min(row)
+            if best <= budget and floor >= best:
+                # Nothing below can get closer: the whole subtree scores
+                # ``best``, so its first ``limit`` names are all we need.
+                entries: List[Entry] = []
+                self._walk(node, limit, entries)
+                for entry in entries[:limit]:
+                    found[entry] = best
+                continue
+            if node.entry is not None and best <= budget:
+                found[node.entry] = best
+            if best > budget and floor > budget:
+                continue  # no extension of this prefix can come back in budget
+            depth += 1
+            # Only cells within ``budget`` of the diagonal can stay in budget
+            lo = max(1, depth - budget)
+            hi = min(m, depth + budget)
+            for char, child in node.children.items():
+                new = [big] * (m + 1)
+                new[0] = depth if depth < big else big
+                for i in range(lo, hi + 1):
+                    value = row[i - 1] if query[i - 1] == char else row[i - 1] + 1
+                    if row[i] + 1 < value:
+                        value = row[i] + 1
+                    if new[i - 1] + 1 < value:
+                        value = new[i - 1] + 1
+                    new[i] = value if value < big else big
+                stack.append((child, new, depth, min(best, new[m])))
+        return found
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Prefix matches first, then fuzzy matches by edit distance.
+
+        The index never changes once built, so results are memoized: the
+        same keystroke sequence typed again is a dict lookup.
+        """
+        return [dict(r) for r in self._search(query.strip().lower(), limit)]
+
+    def _search(self, query: str, limit: int) -> List[dict]:
+        if not query:
+            return []
+        results = [
+            {"id": pokemon_id, "name": name, "match": "prefix", "distance": 0}
+            for pokemon_id, name in self.prefix(query, limit)
+        ]
+        budget = max_distance(query)
+        if len(results) < limit and budget:
+            seen = {r["id"] for r in results}
+            for (pokemon_id, name), distance in self.fuzzy(query, budget, limit + len(results)):
+                if pokemon_id in seen:
+                    continue
+                results.append({"id": pokemon_id, "name": name, "match": "fuzzy", "distance": distance})
+                if len(results) >= limit:
+                    break
+        return results
+
+
+search_index: GenerationIndex[NameIndex] = GenerationIndex(NameIndex.load, lambda: NameIndex([]))
@@ -0,0 +1,163 @@
+"""Pre-fork multi-worker server for the API.
+
+The parent process checks the schema and warms every in-memory structure
+(stat matrix, analytics columns, name trie, hot documents) once, binds the
+listening socket, then forks the workers. Each worker starts warm, and the
+loaded arrays and bodies stay shared copy-on-write instead of being built
+once per worker. Workers that die are replaced, after a delay that doubles
+with each crash in a row; a worker that keeps crashing shortly after start
+stops the server with a non-zero exit::
+
+    uv run python -m src.api.serve --workers 4
+
+``uvicorn --workers`` spawns fresh interpreters instead, so every worker
+would import and warm up on its own. Forking needs a POSIX system.
+"""
+import logging
+import os
+import signal
+import sys
+import time
+from typing import Dict
+
+import typer
+import uvicorn
+
+from src import models
+from src.api import db as api_db
+from src.api.main import SchemaError, app, prepare
+
+logger = logging.getLogger("pokedex.serve")
+
+RESTART_DELAY = 0.5  # seconds before replacing a crashed worker, doubled per crash in a row
+MAX_RESTART_DELAY = 30.0
+MAX_CRASHES = 5  # crashes in a row of one worker before the server gives up
+STABLE_AFTER = 60.0  # seconds a worker must run before its crash count resets
+
+
+def run_worker(config: uvicorn.Config, sock) -> bool:
+    """Serve until told to stop; False if the app failed to start."""
+    # Children must not share the parent's signal handling or pooled connections
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    return server.started
+
+
+def fork_worker(config: uvicorn.Config, sock) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            code = 0 if run_worker(config, sock) else 3  # 3: uvicorn's startup failure status
+        except BaseException:
+            logger.exception("Worker (pid %d) crashed", os.getpid())
+        finally:
+            os._exit(code)
+    return pid
+
+
+def restart_delay(crashes: int) -> float:
+    """Seconds to wait before replacing a worker that crashed ``crashes`` times in a row."""
+    return min(RESTART_DELAY * 2 ** (crashes - 1), MAX_RESTART_DELAY) if crashes else 0.0
+
+
+def serve(host: str, port: int, workers: int, log_level: str = "info") -> None:
+    config = uvicorn.Config(app, host=host, port=port, log_level=log_level)
+    try:
+        prepare()
+    except SchemaError as exc:
+        typer.echo(str(exc), err=True)
+        raise typer.Exit(code=1)
+    if workers <= 1:
+        uvicorn.Server(config).run()
+        return
+    # Connections opened while warming up must not be inherited by the workers
+    api_db.engine.dispose()
+    models.engine.dispose()
+    sock = config.bind_socket()
+    children: Dict[int, int] = {}  # pid -> worker number
+    started: Dict[int, float] = {}  # worker number -> when it was last forked
+    crashes: Dict[int, int] = {}  # worker number -> crashes in a row
+    restarts: Dict[int, float] = {}  # worker number -> when to fork its replacement
+    stopping = failed = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        restarts.clear()
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def start(n: int):
+        pid = fork_worker(config, sock)
+        children[pid] = n
+        started[n] = time.monotonic()
+        if stopping:  # stop() ran while we forked
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for n in range(workers):
+        start(n)
+    while children or restarts:
+        now = time.monotonic()
+        for n, at in list(restarts.items()):
+            if at <= now and restarts.pop(n, None) is not None:
+                start(n)
+        try:
+            # Block for the next exit, unless a replacement is due first
+            pid, status = os.waitpid(-1, os.WNOHANG if restarts else 0)
+        except ChildProcessError:
+            pid = 0
+        except InterruptedError:
+            continue
+        if pid == 0:
+            if restarts:
+                time.sleep(max(0.0, min(min(restarts.values()) - time.monotonic(), 0.1)))
+                continue
+            break
+        n = children.pop(pid, -1)
+        if n < 0 or stopping:
+            continue
+        uptime = time.monotonic() - started[n]
+        crashes[n] = 0 if uptime >= STABLE_AFTER else crashes.get(n, 0) + 1
+        if crashes[n] >= MAX_CRASHES:
+            typer.echo(
+                f"Worker {n} (pid {pid}) exited with status {status}, {crashes[n]} times in a row "
+                f"within {STABLE_AFTER:.0f}s of starting; stopping",
+                err=True,
+            )
+            failed = True
+            stop(None, None)
+            continue
+        delay = restart_delay(crashes[n])
+        typer.echo(f"Worker {n} (pid {pid}) exited with status {status}; restarting in {delay:.1f}s", err=True)
+        restarts[n] = time.monotonic() + delay
+    sock.close()
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def main(
+    host: str = typer.Option("0.0.0.0", "--host"),
+    port: int = typer.Option(8000, "--port"),
+    workers: int = typer.Option(
+        int(os.environ.get("WEB_CONCURRENCY", "1")), "--workers", "-w", min=1, help="Worker processes (WEB_CONCURRENCY)"
+    ),
+    log_level: str = typer.Option("info", "--log-level"),
+):
+    """Serve the API from pre-warmed, forked worker processes."""
+    serve(host, port, workers, log_level)
+
+
+def cli():
+    typer.run(main)
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,77 @@
+from typing import List, Sequence, Tuple
+import numpy as np
+from numpy.typing import ArrayLike
+from sqlmodel import Session, col, select
+from src.api.analytics import load_stats
+from src.api.index import DexRows, GenerationIndex
+from src.models import Pokemon
+from src.repository import STAT_ORDER
+
+FEATURES = STAT_ORDER + ["height", "weight"]
+METRICS = ("cosine", "euclidean")
+
+
+class StatMatrix(DexRows):
+    """Immutable pokemon x feature matrix for nearest-neighbour queries.
+
+    Columns are the six base stats plus log height and log weight (both
+    span several orders of magnitude), each standardized to zero mean and
+    unit variance so no single feature dominates. Rows are stored
+    contiguous and pre-normalized for cosine, with squared norms cached for
+    euclidean, so a query is one matrix-vector product plus a partial sort.
+    """
+
+    def __init__(self, ids: ArrayLike, names: Sequence[str], raw: ArrayLike):
+        self._index_rows(ids, names)
+        features = np.array(raw, dtype=np.float64, copy=True).reshape(len(self.ids), len(FEATURES))
+        features[:, -2:] = np.log1p(features[:, -2:])
+        if len(features):
+            std = features.std(axis=0)
+            std[std == 0] = 1.0
+            features = (features - features.mean(axis=0)) / std
+        self.matrix = np.ascontiguousarray(features, dtype=np.float32)
+        norms = np.linalg.norm(self.matrix, axis=1)
+        norms[norms == 0] = 1.0
+        self.unit = np.ascontiguousarray(self.matrix / norms[:, None])
+        self.squared = np.einsum("ij,ij->i", self.matrix, self.matrix)
+
+    @classmethod
+    def load(cls, db: Session) -> "StatMatrix":
+        pokemon = db.exec(select(Pokemon.id, Pokemon.name, Pokemon.height, Pokemon.weight).order_by(col(Pokemon.id))).all()
+        ids = np.array([p[0] for p in pokemon], dtype=np.int64)
+        raw = np.zeros((len(ids), len(FEATURES)), dtype=np.float64)
+        raw[:, : len(STAT_ORDER)] = load_stats(db, ids)
+        raw[:, -2] = [p[2] for p in pokemon]
+        raw[:, -1] = [p[3] for p in pokemon]
+        return cls(ids, [p[1] for p in pokemon], raw)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def similar(self, row: int, k: int = 10, metric: str = "cosine") -> List[Tuple[int, str, float]]:
+        """The ``k`` rows closest to ``row`` as (id, name, score), best first.
+
+        Cosine scores are similarities (higher is closer); euclidean scores
+        are distances in standardized units (lower is closer).
+        """
+        if metric == "cosine":
+            scores = self.unit @ self.unit[row]
+            order = -scores
+        elif metric == "euclidean":
+            squared = self.squared - 2 * (self.matrix @ self.matrix[row]) + self.squared[row]
+            scores = np.sqrt(np.maximum(squared, 0))
+            order = scores.copy()
+        else:
+            raise ValueError(f"Unknown metric: {metric}")
+        order[row] = np.inf  # never the query itself
+        k = min(k, len(order) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(order, k - 1)[:k]
+        top = top[np.argsort(order[top], kind="stable")]
+        return [(int(self.ids[n]), self.names[n], round(float(scores[n]), 4)) for n in top]
+
+
+similarity_index: GenerationIndex[StatMatrix] = GenerationIndex(
+    StatMatrix.load, lambda: StatMatrix([], [], np.zeros((0, len(FEATURES))))
+)
@@ -0,0 +1,115 @@
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+from numpy.typing import ArrayLike
+from sqlmodel import Session, col, select
+from src.api.index import DexRows, GenerationIndex
+from src.models import Pokemon, PokemonType, Type, TypeEffectiveness
+
+MAX_TEAM_SIZE = 6
+
+
+class TypeChart(DexRows):
+    """Precomputed matchups for every type combination in the dex.
+
+    Each pokemon's types are a bitmask over ``types``. ``attack`` is the
+    attacking x defending factor matrix, and ``defense`` holds one row per
+    distinct mask in the dex: the factor every attacking type deals to that
+    combination (the product over its types). Analyzing a team is a few
+    array operations on at most six rows, with no database access.
+    """
+
+    def __init__(
+        self,
+        types: Sequence[str],
+        attack: ArrayLike,
+        ids: ArrayLike,
+        names: Sequence[str],
+        masks: ArrayLike,
+    ):
+        self.types = list(types)
+        if len(self.types) > 63:
+            raise ValueError("Type bitmasks need at most 63 types")
+        self.attack = np.asarray(attack, dtype=np.float64).reshape(len(self.types), len(self.types))
+        self._index_rows(ids, names)
+        self.masks = np.asarray(masks, dtype=np.int64)
+        combos, self.combo = np.unique(self.masks, return_inverse=True)
+        self.defense = np.ones((len(combos), len(self.types)))
+        for bit in range(len(self.types)):
+            has = (combos >> bit) & 1 == 1
+            self.defense[has] *= self.attack[:, bit]
+        # Only rows for the 18 battle types count; others (e.g. "unknown") have no chart
+        self.charted = np.flatnonzero((self.attack != 1).any(axis=0) | (self.attack != 1).any(axis=1))
+
+    @classmethod
+    def load(cls, db: Session) -> "TypeChart":
+        types = db.exec(select(Type.id, Type.name).order_by(col(Type.id))).all()
+        bits = {type_id: n for n, (type_id, _) in enumerate(types)}
+        attack = np.ones((len(types), len(types)))
+        for attacking, defending, factor in db.exec(
+            select(TypeEffectiveness.attacking_type_id, TypeEffectiveness.defending_type_id, TypeEffectiveness.factor)
+        ):
+            attack[bits[attacking], bits[defending]] = factor
+        pokemon = db.exec(select(Pokemon.id, Pokemon.name).order_by(col(Pokemon.id))).all()
+        rows = {p[0]: n for n, p in enumerate(pokemon)}
+        masks = np.zeros(len(pokemon), dtype=np.int64)
+        for pokemon_id, type_id in db.exec(select(PokemonType.pokemon_id, PokemonType.type_id)):
+            if pokemon_id in rows and type_id in bits:
+                masks[rows[pokemon_id]] |= 1 << bits[type_id]
+        return cls([t[1] for t in types], attack, [p[0] for p in pokemon], [p[1] for p in pokemon], masks)
+
+    def __bool__(self) -> bool:
+        return len(self.charted) > 0
+
+    def type_names(self, mask: int) -> List[str]:
+        return [name for bit, name in enumerate(self.types) if mask >> bit & 1]
+
+    def analyze(self, rows: Sequence[int]) -> Dict[str, Any]:
+        """Defensive matchups and offensive coverage of a team of dex rows.
+
+        Defense counts, per attacking type, the members it hits for more
+        than 1x (weak) and less (resist, including immune). Offense takes
+        each member's own types as its attacks (STAB) and reports the
+        defending types none of them hits super effectively.
+        """
+        members = np.asarray(rows, dtype=np.int64)
+        charted = self.charted
+        factors = self.defense[self.combo[members]][:, charted]  # members x attacking types
+        weak = (factors > 1).sum(axis=0)
+        resist = (factors < 1).sum(axis=0)
+        immune = (factors == 0).sum(axis=0)
+        net = weak - resist
+        team_mask = int(np.bitwise_or.reduce(self.masks[members])) if len(members) else 0
+        attacking = [bit for bit in charted if team_mask >> int(bit) & 1]
+        best = self.attack[attacking][:, charted].max(axis=0) if attacking else np.ones(len(charted))
+        names = [self.types[bit] for bit in charted]
+        defense = [
+            {"type": name, "weak": w, "resist": r, "immune": i, "factors": f}
+            for name, w, r, i, f in zip(names, weak.tolist(), resist.tolist(), immune.tolist(), factors.T.tolist())
+        ]
+        return {
+            "members": [
+                {"id": int(self.ids[r]), "name": self.names[r], "types": self.type_names(int(self.masks[r]))}
+                for r in members
+            ],
+            "defense": defense,
+            # Most exposed (then most members weak) first; lexsort is stable, so ties keep type order
+            "weaknesses": [names[n] for n in np.lexsort((-weak, -net)) if net[n] > 0],
+            "resistances": [names[n] for n in np.lexsort((-resist, net)) if net[n] < 0],
+            "coverage": dict(zip(names, best.tolist())),
+            "uncovered": [name for n, name in enumerate(names) if best[n] <= 1],
+        }
+
+
+def resolve_team(chart: TypeChart, identifiers: Sequence[str]) -> Tuple[List[int], List[str]]:
+    """Dex rows for ``identifiers`` in order, and the identifiers not found."""
+    rows, missing = [], []
+    for identifier in identifiers:
+        row = chart.row(identifier)
+        if row is None:
+            missing.append(identifier)
+        else:
+            rows.append(row)
+    return rows, missing
+
+
+team_index: GenerationIndex[TypeChart] = GenerationIndex(TypeChart.load, lambda: TypeChart([], [], [], [], []))
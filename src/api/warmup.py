@@ -0,0 +1,51 @@
+import logging
+import os
+import time
+from typing import Dict
+from sqlmodel import Session, col, select
+from src.api.analytics import analytics_index
+from src.api.cache import response_cache
+from src.api.search import search_index
+from src.api.similar import similarity_index
+from src.api.teams import team_index
+from src.models import PokemonDocument
+
+logger = logging.getLogger("pokedex.warmup")
+
+# Documents preloaded into the response cache, lowest ids first (0 = none)
+WARM_DOCUMENTS = int(os.environ.get("POKEDEX_WARM_DOCUMENTS", "151"))
+
+
+def preload_documents(db: Session, limit: int) -> int:
+    """Put the first ``limit`` documents in the response cache; one query."""
+    response_cache.sync(db)
+    limit = min(limit, response_cache.maxsize)
+    if limit <= 0:
+        return 0
+    documents = db.exec(select(PokemonDocument).order_by(col(PokemonDocument.id)).limit(limit)).all()
+    for document in documents:
+        response_cache.put(("pokemon", document.id), document.body, aliases=[("pokemon", document.name)])
+    return len(documents)
+
+
+def warm_up(db: Session, documents: int = WARM_DOCUMENTS) -> Dict[str, float]:
+    """Build every in-memory structure the API derives from the dex.
+
+    Run at startup, so the first requests after a deploy find the stat
+    matrix, analytics columns, name trie, type chart and hot documents
+    ready instead of paying for them. Returns seconds spent per step.
+    """
+    steps = {
+        "similarity": lambda: similarity_index.sync(db),
+        "analytics": lambda: analytics_index.sync(db).summary(),
+        "search": lambda: search_index.sync(db),
+        "teams": lambda: team_index.sync(db),
+        "documents": lambda: preload_documents(db, documents),
+    }
+    timings = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    logger.info("Warm-up: %s", ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings.items()))
+    return timings
@@ -0,0 +1,149 @@
+"""Engine factory shared by the API and the ETL.
+
+Everything is configured from the environment so both processes open the
+same database with the same tuning:
+
+- ``POKEDEX_DATABASE_URL`` (``sqlite:///pokedex.db``)
+- ``POKEDEX_DB_POOL_SIZE`` / ``POKEDEX_DB_MAX_OVERFLOW`` / ``POKEDEX_DB_POOL_TIMEOUT``
+- ``POKEDEX_SQLITE_*``: per-connection pragmas, see :data:`SQLITE_PRAGMAS`
+
+How the API opens it (``POKEDEX_DB_ASYNC``, ``POKEDEX_DB_READONLY``,
+``POKEDEX_DB_IMMUTABLE``) is decided in :mod:`src.api.db`.
+"""
+import os
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import create_engine
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+def env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+DATABASE_URL = os.environ.get("POKEDEX_DATABASE_URL", "sqlite:///pokedex.db")
+POOL_SIZE = int(os.environ.get("POKEDEX_DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.environ.get("POKEDEX_DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.environ.get("POKEDEX_DB_POOL_TIMEOUT", "30"))
+
+# Applied on every new SQLite connection, in this order.
+SQLITE_PRAGMAS: Dict[str, str] = {
+    # Readers never block the ETL writer and vice versa; persisted in the file
+    "journal_mode": os.environ.get("POKEDEX_SQLITE_JOURNAL_MODE", "WAL"),
+    # Durable at checkpoints only, which is safe in WAL mode
+    "synchronous": os.environ.get("POKEDEX_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": os.environ.get("POKEDEX_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    # Negative values are KiB
+    "cache_size": os.environ.get("POKEDEX_SQLITE_CACHE_SIZE", str(-64 * 1024)),
+    "temp_store": os.environ.get("POKEDEX_SQLITE_TEMP_STORE", "MEMORY"),
+    # Wait for the write lock instead of failing with "database is locked"
+    "busy_timeout": os.environ.get("POKEDEX_SQLITE_BUSY_TIMEOUT", "5000"),
+}
+# Prepared statements kept per connection by the sqlite3 module
+STATEMENT_CACHE = int(os.environ.get("POKEDEX_SQLITE_STATEMENT_CACHE", "256"))
+
+# Async drivers for the sync URLs we accept
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_memory_url(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or database.startswith("file::memory:")
+
+
+def pool_options(url: str, is_async: bool = False) -> dict:
+    """Explicit pool sizing; in-memory SQLite keeps the dialect's own pool."""
+    if is_sqlite(url) and is_memory_url(url):
+        return {}
+    return {
+        "poolclass": AsyncAdaptedQueuePool if is_async else QueuePool,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+    }
+
+
+def async_url(url: str) -> str:
+    """``sqlite:///x.db`` -> ``sqlite+aiosqlite:///x.db``; explicit drivers are kept."""
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        raise ValueError(f"No async driver known for {parsed.drivername}")
+    return parsed.set(drivername=f"{parsed.drivername}+{driver}").render_as_string(hide_password=False)
+
+
+def sqlite_open_url(url: str, readonly: bool = False, immutable: bool = False) -> str:
+    """Rewrite a SQLite file URL to a ``file:`` URI opened read-only.
+
+    ``immutable`` additionally tells SQLite the file cannot change, which
+    skips locking entirely; only use it for a database nobody writes to.
+    """
+    if not (readonly or immutable) or is_memory_url(url):
+        return url
+    parsed = make_url(url)
+    query = dict(parsed.query)
+    query.update({"mode": "ro", "uri": "true"})
+    if immutable:
+        query["immutable"] = "1"
+    return parsed.set(database=f"file:{parsed.database}", query=query).render_as_string(hide_password=False)
+
+
+def sqlite_pragmas(url: str, readonly: bool = False) -> Dict[str, str]:
+    pragmas = dict(SQLITE_PRAGMAS)
+    if readonly or is_memory_url(url):
+        # The journal mode lives in the file: only a writer can change it
+        pragmas.pop("journal_mode", None)
+    return pragmas
+
+
+def _install_pragmas(engine: Engine, pragmas: Dict[str, str]):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _engine_args(url: str, readonly: bool, immutable: bool, is_async: bool) -> Tuple[str, dict]:
+    kwargs: dict = {"echo": False, **pool_options(url, is_async)}
+    if is_sqlite(url):
+        url = sqlite_open_url(url, readonly, immutable)
+        kwargs["connect_args"] = {"cached_statements": STATEMENT_CACHE}
+    return url, kwargs
+
+
+def make_engine(url: Optional[str] = None, readonly: bool = False, immutable: bool = False) -> Engine:
+    """A sync engine for ``url`` (default ``POKEDEX_DATABASE_URL``) with pool
+    sizing and, for SQLite, the tuning pragmas applied to each connection."""
+    url = url or DATABASE_URL
+    open_url, kwargs = _engine_args(url, readonly, immutable, is_async=False)
+    engine = create_engine(open_url, **kwargs)
+    if is_sqlite(url):
+        _install_pragmas(engine, sqlite_pragmas(url, readonly or immutable))
+    return engine
+
+
+def make_async_engine(url: Optional[str] = None, readonly: bool = False, immutable: bool = False) -> "AsyncEngine":
+    """Async counterpart of :func:`make_engine`; imports the async driver lazily."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_url(url or DATABASE_URL)
+    open_url, kwargs = _engine_args(url, readonly, immutable, is_async=True)
+    engine = create_async_engine(open_url, **kwargs)
+    if is_sqlite(url):
+        _install_pragmas(engine.sync_engine, sqlite_pragmas(url, readonly or immutable))
+    return engine
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Generic, Optional, Type, TypeVar, Union
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Readers (or a concurrent loader) never see a half-written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@dataclass
+class ContentEntry:
+    """A URL and the stored object its body resolved to."""
+
+    url: str
+    digest: str  # sha256 of the body; names the object file
+
+
+E = TypeVar("E", bound=ContentEntry)
+
+
+class ContentStore(ABC, Generic[E]):
+    """Objects named by the sha256 of their content, found through per-URL entries.
+
+    Layout under ``root``::
+
+        objects/ab/abcdef....<ext>   object, named by its sha256
+        urls/12/123456....json       entry for the URL with that sha256
+
+    Subclasses set ``entry_type`` and name the object file of an entry.
+    """
+
+    entry_type: Type[E]
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    @staticmethod
+    def _sharded(base: Path, key: str, suffix: str) -> Path:
+        return base / key[:2] / f"{key}{suffix}"
+
+    def _entry_path(self, url: str) -> Path:
+        return self._sharded(self.root / "urls", hashlib.sha256(url.encode()).hexdigest(), ".json")
+
+    def _digest_path(self, digest: str, suffix: str) -> Path:
+        return self._sharded(self.root / "objects", digest, suffix)
+
+    @abstractmethod
+    def object_path(self, entry: E) -> Path:
+        """Where the object for ``entry`` is stored."""
+
+    def lookup(self, url: str) -> Optional[E]:
+        """The entry for ``url``, if its object is still on disk."""
+        try:
+            entry = self.entry_type(**json.loads(self._entry_path(url).read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry if self.object_path(entry).exists() else None
+
+    def _save(self, entry: E):
+        _atomic_write(self._entry_path(entry.url), json.dumps(asdict(entry)).encode())
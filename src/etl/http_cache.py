@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from src.etl.content_store import ContentEntry, ContentStore, _atomic_write
+
+
+@dataclass
+class CacheEntry(ContentEntry):
+    """What we know about the last successful response for a URL."""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache(ContentStore[CacheEntry]):
+    """Persistent, content-addressed cache of HTTP response bodies.
+
+    Layout under ``root``::
+
+        objects/ab/abcdef....gz   gzip body, named by sha256 of the raw body
+        urls/12/123456....json    CacheEntry for the URL with that sha256
+
+    Identical bodies are stored once. Only the small per-URL entry changes
+    when a revalidation comes back ``304 Not Modified``.
+    """
+
+    entry_type = CacheEntry
+
+    def __init__(self, root: Union[str, Path], compresslevel: int = 6):
+        super().__init__(root)
+        self.compresslevel = compresslevel
+
+    def object_path(self, entry: CacheEntry) -> Path:
+        return self._digest_path(entry.digest, ".gz")
+
+    def body(self, entry: CacheEntry) -> bytes:
+        return gzip.decompress(self.object_path(entry).read_bytes())
+
+    def store(
+        self,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CacheEntry:
+        entry = CacheEntry(url, hashlib.sha256(body).hexdigest(), etag, last_modified, time.time())
+        path = self.object_path(entry)
+        if not path.exists():
+            _atomic_write(path, gzip.compress(body, self.compresslevel))
+        self._save(entry)
+        return entry
+
+    def touch(self, entry: CacheEntry):
+        """Record a successful revalidation."""
+        entry.fetched_at = time.time()
+        self._save(entry)
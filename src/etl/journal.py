@@ -0,0 +1,81 @@
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+PENDING = "pending"
+FETCHED = "fetched"
+LOADED = "loaded"
+FAILED = "failed"
+
+
+@dataclass
+class JournalEntry:
+    id: int
+    state: str = PENDING
+    attempts: int = 0
+    last_error: Optional[str] = None
+    updated_at: float = 0.0
+
+
+class Journal:
+    """Append-only JSON-lines record of per-id load progress.
+
+    Each state change is one line, so recording is a cheap append from the
+    event loop and a crash loses at most the line being written. Replaying
+    the file yields the latest state per id, which is what ``--resume``
+    uses to skip ids already loaded. Ids are only marked ``loaded`` after
+    their batch committed.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.entries: Dict[int, JournalEntry] = {}
+        if self.path.exists():
+            self._replay()
+
+    def _replay(self):
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = JournalEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # torn last line from a crash
+                self.entries[entry.id] = entry
+
+    def reset(self):
+        """Forget previous runs."""
+        self.entries.clear()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("")
+
+    def remaining(self, ids: Iterable[int]) -> List[int]:
+        """``ids`` not yet loaded, in order."""
+        return [i for i in ids if self.state(i) != LOADED]
+
+    def state(self, identifier: int) -> Optional[str]:
+        entry = self.entries.get(identifier)
+        return entry.state if entry else None
+
+    def record(self, ids: Iterable[int], state: str, error: Optional[str] = None, attempts: int = 0):
+        lines = []
+        now = time.time()
+        for identifier in ids:
+            entry = self.entries.setdefault(identifier, JournalEntry(identifier))
+            entry.state = state
+            entry.updated_at = now
+            entry.attempts += attempts
+            if error is not None or state == LOADED:
+                entry.last_error = error
+            lines.append(json.dumps(asdict(entry)))
+        if lines:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write("\n".join(lines) + "\n")
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for entry in self.entries.values():
+            counts[entry.state] = counts.get(entry.state, 0) + 1
+        return counts
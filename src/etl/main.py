@@ -1,17 +1,36 @@
 import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 import typer
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set
 import httpx
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session
 from src.models import (
-    Pokemon,
-    Type,
-    PokemonType,
-    PokemonStat,
-    Sprite,
+    bump_generation,
     create_db_and_tables,
+    engine,
 )
 from src.schemas import PokemonData
+from src import export
+from src.repository import rebuild_documents
+from src.etl.http_cache import HttpCache
+from src.etl.sources import (
+    CachingHttpSource,
+    FixtureSource,
+    HttpSource,
+    PokemonSource,
+    SourceError,
+)
+from src.etl.journal import FAILED, FETCHED, LOADED, PENDING, Journal
+from src.etl.retry import RateLimiter, RetryPolicy, fetch_with_retry
+from src.etl.sprites import SPRITE_STORE, SPRITE_VARIANTS, SpriteStats, SpriteStore, fetch_sprites, sprite_urls, variant_matcher
+from src.etl.type_chart import Chart, fetch_chart, load_bundled, write_chart
+from src.etl.writer import BulkWriter, WriteResult
 
 # Create typer app
 app = typer.Typer(help="Pokedex ETL CLI")
@@ -41,28 +60,46 @@ SAMPLE_BULBASAUR = {
     },
 }
 
-engine = create_engine("sqlite:///pokedex.db")
-
+POKEAPI_SPECIES_URL = "https://pokeapi.co/api/v2/pokemon-species?limit=1"
 
 def get_session():
     return Session(engine)
 
 
-async def fetch_pokemon(identifier: int) -> Dict[str, Any]:
-    """Async fetch Pokemon data from PokeAPI with timeout and fallback."""
-    url = f"https://pokeapi.co/api/v2/pokemon/{identifier}"
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            return resp.json()
-    except Exception as e:
-        typer.echo(f"Fetch failed: {e}; using sample data.")
-        return SAMPLE_BULBASAUR
+def make_client(concurrency: int = 10, timeout: float = 10.0) -> httpx.AsyncClient:
+    """Shared keep-alive client sized to the fetch concurrency."""
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    return httpx.AsyncClient(timeout=timeout, limits=limits)
+
+
+async def fetch_pokemon(
+    identifier: int,
+    client: Optional[httpx.AsyncClient] = None,
+    source: Optional[PokemonSource] = None,
+) -> Dict[str, Any]:
+    """Async fetch Pokemon data from PokeAPI (or ``source``).
+
+    Transient errors are retried with backoff; anything else raises rather
+    than substituting other data for the requested id.
+    """
+    policy, limiter = RetryPolicy(), RateLimiter()
+    if source is not None:
+        return await fetch_with_retry(source.fetch, identifier, policy, limiter)
+    if client is None:
+        async with httpx.AsyncClient(timeout=5.0) as own_client:
+            return await fetch_with_retry(HttpSource(own_client).fetch, identifier, policy, limiter)
+    return await fetch_with_retry(HttpSource(client).fetch, identifier, policy, limiter)
 
 
-def normalize_data(data: Dict[str, Any]) -> PokemonData:
-    """Normalize fetched data: extract core fields, validate stats, skip null sprites."""
+def normalize_data(data: Dict[str, Any], variants: Optional[str] = None) -> PokemonData:
+    """Normalize fetched data: extract core fields, validate stats, skip null sprites.
+
+    Only sprite variants matching ``variants`` (default ``POKEDEX_SPRITE_VARIANTS``)
+    are kept; see :func:`src.etl.sprites.variant_matcher`.
+    """
+    keep = variant_matcher(SPRITE_VARIANTS if variants is None else variants)
 
     def flatten_sprites(
         sprites_dict: Dict[str, Any], prefix: str = ""
@@ -73,7 +110,7 @@ def normalize_data(data: Dict[str, Any]) -> PokemonData:
             key = f"{prefix}_{k}" if prefix else k
             if isinstance(v, dict):
                 flat.update(flatten_sprites(v, key))
-            elif isinstance(v, str):
+            elif isinstance(v, str) and keep(key):
                 flat[key] = v
         return flat
 
@@ -101,52 +138,137 @@ def normalize_data(data: Dict[str, Any]) -> PokemonData:
     return PokemonData(**normalized)
 
 
-def insert_idempotent(session: Session, norm_data: PokemonData):
-    """Idempotent insert: Check existence, upsert related entities."""
-    existing = session.exec(select(Pokemon).where(Pokemon.id == norm_data.id)).first()
-    if existing:
+class NormalizeError(Exception):
+    """A fetched payload could not be normalized."""
+
+
+def normalize_payload(raw: bytes) -> Dict[str, Any]:
+    """Process-pool entry point: raw PokeAPI JSON to a picklable record.
+
+    Returns the validated record as a plain dict, which pickles far smaller
+    and faster than the model or the raw payload.
+    """
+    return normalize_data(json.loads(raw)).model_dump()
+
+
+def normalize_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """Processes running ``normalize_payload``, or None to stay on the event loop.
+
+    The executor starts its processes lazily, once the writer and cache
+    threads are running, and forking a threaded process can deadlock; so
+    they come from a forkserver (spawn where there is none), not ``fork``.
+    """
+    if workers <= 0:
+        return None
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def insert_idempotent(
+    session: Session,
+    norm_data: PokemonData,
+    commit: bool = True,
+    writer: Optional[BulkWriter] = None,
+):
+    """Idempotent insert: skip if the Pokemon exists, else write all its rows.
+
+    Pass ``commit=False`` to leave the transaction open so callers can
+    batch several inserts into one commit; bulk loads use
+    :class:`BulkWriter` directly.
+    """
+    result = (writer or BulkWriter()).write(session, [norm_data])
+    if not result.inserted:
         typer.echo(
             f"Pokemon {norm_data.id} ({norm_data.name}) already exists; skipping."
         )
         return
+    if commit:
+        session.commit()
+    else:
+        session.flush()
+    typer.echo(f"Inserted {norm_data.name} (ID: {norm_data.id}) successfully.")
 
-    p = Pokemon(
-        id=norm_data.id,
-        name=norm_data.name,
-        height=norm_data.height,
-        weight=norm_data.weight,
-    )
-    session.add(p)
-    session.flush()
-
-    for t in norm_data.types:
-        type_obj = session.exec(select(Type).where(Type.name == t["type_name"])).first()
-        if not type_obj:
-            type_obj = Type(name=t["type_name"])
-            session.add(type_obj)
-            session.flush()
-
-        # type_obj should be a Type object here, no extraction needed
-        if type_obj.id is None:
-            raise ValueError(
-                f"Type {t['type_name']} was not properly saved to database"
-            )
 
-        pt = PokemonType(pokemon_id=p.id, type_id=type_obj.id, slot=t["slot"])
-        session.add(pt)
+FIXTURES_OPTION = typer.Option(
+    None,
+    "--fixtures",
+    help="Directory, tar or zip of raw PokeAPI <id>.json dumps to load offline",
+)
 
-    for s in norm_data.stats:
-        ps = PokemonStat(
-            pokemon_id=p.id, stat_name=s["stat_name"], base_stat=s["base_stat"]
-        )  # type: ignore [arg-type]
-        session.add(ps)
 
-    for variant, url in norm_data.sprites.items():
-        sp = Sprite(pokemon_id=p.id, variant=variant, url=url)  # type: ignore [arg-type]
-        session.add(sp)
+HTTP_CACHE_OPTION = typer.Option(
+    os.environ.get("POKEDEX_HTTP_CACHE", ".cache/pokeapi"),
+    "--http-cache",
+    help="Directory for cached PokeAPI responses (revalidated with ETags); '' disables",
+)
+REFRESH_OPTION = typer.Option(
+    False,
+    "--refresh",
+    help="Rewrite Pokemon whose upstream payload changed instead of skipping existing ones",
+)
 
-    session.commit()
-    typer.echo(f"Inserted {norm_data.name} (ID: {norm_data.id}) successfully.")
+
+JOURNAL_OPTION = typer.Option(
+    os.environ.get("POKEDEX_ETL_JOURNAL", ".cache/etl-journal.jsonl"),
+    "--journal",
+    help="Per-id progress log (pending/fetched/loaded/failed)",
+)
+RESUME_OPTION = typer.Option(
+    False, "--resume", help="Skip ids the journal already has as loaded instead of starting over"
+)
+RATE_OPTION = typer.Option(0.0, "--rate", min=0.0, help="Max requests per second (0 = unlimited)")
+RETRIES_OPTION = typer.Option(5, "--retries", min=1, help="Attempts per id for transient errors")
+SPRITES_OPTION = typer.Option(
+    False, "--sprites", help="Then download sprite images into the local store the API serves them from"
+)
+WORKERS_OPTION = typer.Option(
+    None,
+    "--workers",
+    "-w",
+    min=0,
+    help="Processes parsing and normalizing payloads (0 = on the event loop; default: one per core, 0 with --fixtures or a single core)",
+    show_default=False,
+)
+QUEUE_DEPTH_OPTION = typer.Option(
+    None, "--queue-depth", min=1, help="Normalized records buffered for the writer (default: 2 batches)"
+)
+
+
+def default_workers(workers: Optional[int], source: Optional[FixtureSource]) -> int:
+    """``--workers``, else 0 for fixtures and one per core otherwise.
+
+    The pool is handed whole raw payloads, while fixtures read on the event
+    loop go through the streaming field extraction, whose memory per record
+    stays bounded however large the dumps are. On a single core a pool only
+    adds the pickling round trip (see ``benchmarks/suite.py --stages
+    normalize_pool``), so that gets 0 too.
+    """
+    if workers is not None:
+        return workers
+    cores = os.cpu_count() or 1
+    return 0 if source is not None or cores == 1 else cores
+
+
+def open_journal(path: str, resume: bool) -> Journal:
+    journal = Journal(path)
+    if resume:
+        typer.echo(f"Resuming from {path}: {journal.summary() or 'empty'}")
+    else:
+        journal.reset()
+    return journal
+
+
+def open_http_cache(path: str) -> Optional[HttpCache]:
+    return HttpCache(path) if path else None
+
+
+def open_fixtures(path: Optional[str]) -> Optional[FixtureSource]:
+    if path is None:
+        return None
+    try:
+        return FixtureSource(path)
+    except (OSError, SourceError) as e:
+        raise typer.BadParameter(str(e))
 
 
 @app.command()
@@ -155,18 +277,427 @@ def load(
     sample: bool = typer.Option(
         False, "--sample", help="Use sample data instead of API"
     ),
+    fixtures: Optional[str] = FIXTURES_OPTION,
 ):
     """Load and insert Pokemon data by ID (use --sample for fallback)."""
     create_db_and_tables()
     if sample:
         data = SAMPLE_BULBASAUR
     else:
-        data = asyncio.run(fetch_pokemon(identifier))
+        source = open_fixtures(fixtures)
+        try:
+            data = asyncio.run(fetch_pokemon(identifier, source=source))
+        except (httpx.HTTPError, SourceError) as e:
+            typer.echo(f"Fetch failed for {identifier}: {e} (use --sample for offline sample data)", err=True)
+            raise typer.Exit(code=1)
     norm = normalize_data(data)
     with get_session() as session:
         insert_idempotent(session, norm)
     typer.echo("ETL process completed.")
 
 
+@app.command("rebuild-documents")
+def rebuild_documents_command():
+    """Regenerate the precomputed pokemon documents from the normalized tables."""
+    create_db_and_tables()
+    with get_session() as session:
+        count = rebuild_documents(session)
+        bump_generation(session)
+        session.commit()
+    typer.echo(f"Rebuilt {count} pokemon documents.")
+
+
+@dataclass
+class LoadStats:
+    """Outcome of a bulk load."""
+
+    requested: int = 0
+    loaded: int = 0
+    updated: int = 0  # --refresh: upstream payload changed
+    skipped: int = 0  # already in the database (and unchanged)
+    resumed: int = 0  # loaded by an earlier run, per the journal
+    failed: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.loaded / self.elapsed if self.elapsed else 0.0
+
+
+def parse_ids(spec: str) -> List[int]:
+    """Parse an id spec such as ``1-151`` or ``1,4,7,10-12`` into sorted ids."""
+    ids: Set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+            if start > end:
+                raise ValueError(f"Invalid range: {part}")
+            ids.update(range(start, end + 1))
+        else:
+            ids.add(int(part))
+    if not ids or min(ids) < 1:
+        raise ValueError(f"Invalid id spec: {spec!r}")
+    return sorted(ids)
+
+
+def write_batch(
+    session_factory: Callable[[], Session],
+    batch: List[PokemonData],
+    writer: Optional[BulkWriter] = None,
+    refresh: bool = False,
+) -> WriteResult:
+    """Write a batch of normalized records in a single transaction."""
+    writer = writer or BulkWriter()
+    with session_factory() as session:
+        try:
+            result = writer.write(session, batch, refresh)
+            session.commit()
+        except Exception:
+            writer.reset()  # cached type ids may belong to the rolled back transaction
+            raise
+    return result
+
+
+async def load_many(
+    ids: Iterable[int],
+    concurrency: int = 10,
+    batch_size: int = 50,
+    client: Optional[httpx.AsyncClient] = None,
+    session_factory: Callable[[], Session] = get_session,
+    source: Optional[PokemonSource] = None,
+    http_cache: Optional[HttpCache] = None,
+    refresh: bool = False,
+    journal: Optional[Journal] = None,
+    retry: Optional[RetryPolicy] = None,
+    rate: float = 0.0,
+    workers: int = 0,
+    queue_depth: Optional[int] = None,
+) -> LoadStats:
+    """Fetch, normalize and insert many Pokemon through one pooled client.
+
+    ``source`` replaces the PokeAPI client, e.g. with a ``FixtureSource`` for
+    network-free loads. Fetches run concurrently (bounded by ``concurrency``) and are normalized
+    as soon as they arrive; a single writer drains the results and commits
+    every ``batch_size`` records in a worker thread, so the event loop keeps
+    fetching while SQLite writes. Each batch is one set-based
+    :class:`BulkWriter` write sharing a type-id cache across batches.
+
+    With ``http_cache`` PokeAPI responses are revalidated against an on-disk
+    cache instead of downloaded again. ``refresh`` rewrites pokemon whose
+    payload changed instead of skipping every pokemon already loaded.
+
+    Transient fetch errors (timeouts, 429, 5xx) are retried per ``retry``
+    with jittered exponential backoff, honoring ``Retry-After``; ``rate``
+    caps requests per second across all workers. With a ``journal``, each
+    id's state is recorded as it goes and ids it already has as loaded are
+    skipped, so an interrupted load resumes where it stopped.
+
+    With ``workers`` > 0, raw payload bytes are parsed and normalized in a
+    process pool of that size instead of on the event loop, and the writer
+    receives plain dicts. A fetched payload waits for a free worker while
+    still holding its fetch slot, so buffered raw payloads stay bounded.
+    ``queue_depth`` bounds normalized records waiting for the writer
+    (default: two batches).
+    """
+    ids = list(ids)
+    stats = LoadStats(requested=len(ids))
+    if journal is not None:
+        remaining = journal.remaining(ids)
+        stats.resumed = len(ids) - len(remaining)
+        ids = remaining
+        journal.record(ids, PENDING)
+    retry = retry or RetryPolicy()
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    queue: asyncio.Queue[Optional[PokemonData]] = asyncio.Queue(maxsize=queue_depth or batch_size * 2)
+    own_client: Optional[httpx.AsyncClient] = None
+    if source is None:
+        if client is None:
+            client = own_client = make_client(concurrency)
+        source = CachingHttpSource(client, http_cache) if http_cache else HttpSource(client)
+    bulk_writer = BulkWriter()
+    pool = normalize_pool(workers)
+    # One payload queued per worker keeps them busy without buffering more
+    pool_slots = asyncio.Semaphore(workers * 2 or 1)
+    loop = asyncio.get_running_loop()
+
+    async def fetch_and_normalize(identifier: int, on_retry) -> PokemonData:
+        """Raises the fetch error, or the normalize error wrapped as ``NormalizeError``."""
+        if pool is None:
+            data = await fetch_with_retry(source.fetch, identifier, retry, limiter, on_retry)
+            try:
+                return normalize_data(data)
+            except (KeyError, ValueError) as e:
+                raise NormalizeError(str(e)) from e
+        raw = await fetch_with_retry(source.fetch_raw, identifier, retry, limiter, on_retry)
+        async with pool_slots:
+            try:
+                compact = await loop.run_in_executor(pool, normalize_payload, raw)
+            except (KeyError, ValueError) as e:
+                raise NormalizeError(str(e)) from e
+        # Validated in the worker; skip re-validating in the parent
+        return PokemonData.model_construct(**compact)
+
+    def fail(identifier: int, message: str, attempts: int):
+        typer.echo(f"{message} for {identifier}")
+        stats.failed += 1
+        if journal is not None:
+            journal.record([identifier], FAILED, error=message, attempts=attempts)
+
+    async def fetch_one(identifier: int):
+        attempts = 1
+
+        def on_retry(attempt: int, error: BaseException, delay: float):
+            nonlocal attempts
+            attempts += 1
+            stats.retries += 1
+            typer.echo(f"Retrying {identifier} in {delay:.1f}s ({error})")
+
+        async with semaphore:
+            try:
+                norm = await fetch_and_normalize(identifier, on_retry)
+            except (httpx.HTTPError, SourceError) as e:
+                fail(identifier, f"Fetch failed: {e}", attempts)
+                return
+            except NormalizeError as e:
+                fail(identifier, f"Normalize failed: {e}", attempts)
+                return
+        if journal is not None:
+            journal.record([identifier], FETCHED, attempts=attempts)
+        await queue.put(norm)
+
+    async def writer():
+        batch: List[PokemonData] = []
+        while True:
+            norm = await queue.get()
+            if norm is not None:
+                batch.append(norm)
+            if batch and (norm is None or len(batch) >= batch_size):
+                result = await asyncio.to_thread(write_batch, session_factory, batch, bulk_writer, refresh)
+                stats.loaded += len(result.inserted)
+                stats.updated += len(result.updated)
+                stats.skipped += len(result.skipped)
+                if journal is not None:
+                    journal.record([n.id for n in batch], LOADED)
+                batch = []
+            if norm is None:
+                return
+
+    start = time.perf_counter()
+    writer_task = asyncio.create_task(writer())
+    fetches = asyncio.gather(*(fetch_one(i) for i in ids))
+    try:
+        await asyncio.wait(
+            {fetches, writer_task}, return_when=asyncio.FIRST_COMPLETED
+        )
+        if writer_task.done():
+            writer_task.result()  # surface writer errors instead of hanging
+        await fetches
+        await queue.put(None)
+        await writer_task
+    finally:
+        fetches.cancel()
+        writer_task.cancel()
+        if own_client is not None:
+            await own_client.aclose()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+async def fetch_species_count(client: Optional[httpx.AsyncClient] = None) -> int:
+    """Number of species PokeAPI currently knows about."""
+    if client is None:
+        async with make_client(1) as own_client:
+            resp = await own_client.get(POKEAPI_SPECIES_URL)
+    else:
+        resp = await client.get(POKEAPI_SPECIES_URL)
+    resp.raise_for_status()
+    return int(resp.json()["count"])
+
+
+def report(stats: LoadStats):
+    typer.echo(
+        f"Loaded {stats.loaded}/{stats.requested} Pokemon "
+        f"({stats.updated} updated, {stats.skipped} unchanged, {stats.resumed} resumed, "
+        f"{stats.failed} failed, {stats.retries} retries) in {stats.elapsed:.2f}s "
+        f"({stats.rate:.1f} pokemon/s)."
+    )
+
+
+def report_sprites(stats: SpriteStats):
+    typer.echo(
+        f"Sprites: {stats.downloaded} downloaded ({stats.bytes / 1e6:.1f} MB), "
+        f"{stats.deduplicated} duplicates of stored images, {stats.present} already stored, "
+        f"{stats.failed} failed, of {stats.requested} in {stats.elapsed:.2f}s."
+    )
+
+
+def download_sprites(store: str, concurrency: int, rate: float, retries: int, refresh: bool = False) -> SpriteStats:
+    with get_session() as session:
+        urls = sprite_urls(session)
+
+    async def run() -> SpriteStats:
+        async with make_client(concurrency, timeout=30.0) as client:
+            return await fetch_sprites(
+                urls, SpriteStore(store), client, concurrency, RetryPolicy(max_attempts=retries), rate, refresh
+            )
+
+    return asyncio.run(run())
+
+
+@app.command("sprites")
+def sprites_command(
+    store: str = typer.Option(SPRITE_STORE, "--store", help="Sprite store directory (POKEDEX_SPRITE_STORE)"),
+    concurrency: int = typer.Option(10, "--concurrency", "-c", min=1),
+    rate: float = RATE_OPTION,
+    retries: int = RETRIES_OPTION,
+    refresh: bool = typer.Option(False, "--refresh", help="Download again even if stored"),
+):
+    """Download every sprite image into the local content-addressed store."""
+    create_db_and_tables()
+    report_sprites(download_sprites(store, concurrency, rate, retries, refresh))
+
+
+@app.command("type-chart")
+def type_chart_command(
+    bundled: bool = typer.Option(False, "--bundled", help="Use the bundled chart instead of PokeAPI"),
+    rate: float = RATE_OPTION,
+    retries: int = RETRIES_OPTION,
+):
+    """Load the type-effectiveness chart (falls back to the bundled one offline)."""
+    create_db_and_tables()
+    chart: Optional[Chart] = None
+    if not bundled:
+        async def run() -> Chart:
+            async with make_client() as client:
+                return await fetch_chart(client, RetryPolicy(max_attempts=retries), rate)
+
+        try:
+            chart = asyncio.run(run())
+        except httpx.HTTPError as e:
+            typer.echo(f"PokeAPI unavailable ({e}); using the bundled chart", err=True)
+    source = "PokeAPI" if chart is not None else "bundled"
+    if chart is None:
+        chart = load_bundled()
+    with get_session() as session:
+        rows = write_chart(session, chart)
+        session.commit()
+    typer.echo(f"Loaded {len(chart)}x{len(chart)} type chart from {source} ({rows} non-neutral matchups).")
+
+
+@app.command("export")
+def export_command(
+    output: str = typer.Option("-", "--output", "-o", help="File to write ('-' for stdout); a .gz name implies --gzip"),
+    format: str = typer.Option("ndjson", "--format", "-f", help="ndjson, csv or columnar"),
+    gzip: bool = typer.Option(False, "--gzip", help="Gzip the output"),
+    chunk_size: int = typer.Option(export.CHUNK_SIZE, "--chunk-size", min=1, help="Pokemon read per query round"),
+):
+    """Stream the whole dex to a file or stdout at constant memory."""
+    if format not in export.FORMATS:
+        raise typer.BadParameter(f"Unknown export format: {format}", param_hint="--format")
+    gzip = gzip or output.endswith(".gz")
+    create_db_and_tables()
+    written = 0
+    with get_session() as session:
+        stream = export.export(session, format, gzip, chunk_size)
+        if output == "-":
+            for piece in stream:
+                sys.stdout.buffer.write(piece)
+                written += len(piece)
+            sys.stdout.buffer.flush()
+        else:
+            with open(output, "wb") as fh:
+                for piece in stream:
+                    fh.write(piece)
+                    written += len(piece)
+            typer.echo(f"Exported to {output} ({written} bytes).", err=True)
+
+
+@app.command("load-range")
+def load_range(
+    spec: str = typer.Argument(help="Ids to load, e.g. 1-151 or 1,4,7,10-12"),
+    concurrency: int = typer.Option(10, "--concurrency", "-c", min=1),
+    batch_size: int = typer.Option(50, "--batch-size", "-b", min=1),
+    fixtures: Optional[str] = FIXTURES_OPTION,
+    http_cache: str = HTTP_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    journal: str = JOURNAL_OPTION,
+    resume: bool = RESUME_OPTION,
+    rate: float = RATE_OPTION,
+    retries: int = RETRIES_OPTION,
+    workers: Optional[int] = WORKERS_OPTION,
+    queue_depth: Optional[int] = QUEUE_DEPTH_OPTION,
+    sprites: bool = SPRITES_OPTION,
+):
+    """Bulk load a range or list of Pokemon ids concurrently."""
+    try:
+        ids = parse_ids(spec)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    source = open_fixtures(fixtures)
+    create_db_and_tables()
+    report(asyncio.run(load_many(
+        ids,
+        concurrency,
+        batch_size,
+        source=source,
+        http_cache=open_http_cache(http_cache),
+        refresh=refresh,
+        journal=open_journal(journal, resume),
+        retry=RetryPolicy(max_attempts=retries),
+        rate=rate,
+        workers=default_workers(workers, source),
+        queue_depth=queue_depth,
+    )))
+    if sprites:
+        report_sprites(download_sprites(SPRITE_STORE, concurrency, rate, retries))
+
+
+@app.command("load-all")
+def load_all(
+    concurrency: int = typer.Option(10, "--concurrency", "-c", min=1),
+    batch_size: int = typer.Option(50, "--batch-size", "-b", min=1),
+    fixtures: Optional[str] = FIXTURES_OPTION,
+    http_cache: str = HTTP_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    journal: str = JOURNAL_OPTION,
+    resume: bool = RESUME_OPTION,
+    rate: float = RATE_OPTION,
+    retries: int = RETRIES_OPTION,
+    workers: Optional[int] = WORKERS_OPTION,
+    queue_depth: Optional[int] = QUEUE_DEPTH_OPTION,
+    sprites: bool = SPRITES_OPTION,
+):
+    """Bulk load every species in the national dex (or every fixture)."""
+    source = open_fixtures(fixtures)
+    create_db_and_tables()
+    if source is not None:
+        ids = source.ids()
+    else:
+        ids = list(range(1, asyncio.run(fetch_species_count()) + 1))
+    typer.echo(f"Loading {len(ids)} species...")
+    report(asyncio.run(load_many(
+        ids,
+        concurrency,
+        batch_size,
+        source=source,
+        http_cache=open_http_cache(http_cache),
+        refresh=refresh,
+        journal=open_journal(journal, resume),
+        retry=RetryPolicy(max_attempts=retries),
+        rate=rate,
+        workers=default_workers(workers, source),
+        queue_depth=queue_depth,
+    )))
+    if sprites:
+        report_sprites(download_sprites(SPRITE_STORE, concurrency, rate, retries))
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,102 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+# Worth another attempt: throttling and server-side trouble
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta or HTTP date)."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient(error: BaseException) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRY_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient fetch errors."""
+
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class RateLimiter:
+    """Spaces request starts at least ``1 / rate`` seconds apart, shared by
+    every worker. :meth:`pause` holds everyone back, e.g. after a 429."""
+
+    def __init__(self, rate: float = 0.0):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self._next = max(self._next, time.monotonic() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def fetch_with_retry(
+    fetch: Callable[[K], Awaitable[T]],
+    identifier: K,
+    policy: RetryPolicy,
+    limiter: RateLimiter,
+    on_retry: Optional[Callable[[int, BaseException, float], None]] = None,
+) -> T:
+    """Call ``fetch(identifier)``, retrying transient errors per ``policy``.
+
+    A 429 ``Retry-After`` overrides the backoff and pauses the shared
+    limiter, so all workers slow down rather than each hitting the limit.
+    Non-transient errors and the last transient one propagate.
+    """
+    attempt = 1
+    while True:
+        await limiter.acquire()
+        try:
+            return await fetch(identifier)
+        except httpx.HTTPError as error:
+            if attempt >= policy.max_attempts or not is_transient(error):
+                raise
+            delay = policy.backoff(attempt)
+            if isinstance(error, httpx.HTTPStatusError):
+                wait = retry_after(error.response)
+                if wait is not None:
+                    delay = wait
+                    limiter.pause(wait)
+            if on_retry is not None:
+                on_retry(attempt, error, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,363 @@
+import asyncio
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Protocol, TextIO, Tuple, Union
+
+import httpx
+
+from src.etl.http_cache import HttpCache
+
+POKEAPI_URL = "https://pokeapi.co/api/v2/pokemon/{identifier}"
+
+# Top-level keys of a PokeAPI payload that normalize_data actually reads.
+CORE_FIELDS = frozenset(
+    {"id", "name", "height", "weight", "types", "stats", "sprites"}
+)
+
+_WS = re.compile(r"\s*")
+# Runs of non-bracket text and complete strings, consumed in one C-level match.
+_SKIP = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(r"[^\s,\]}]+")
+
+
+class SourceError(Exception):
+    """Raised when a source cannot provide a payload."""
+
+
+class _FieldScanner:
+    """Incremental scanner over the top-level object of a JSON document.
+
+    Values of unwanted keys are skipped by tracking bracket depth, so large
+    arrays such as ``moves`` are never decoded or held in memory; only the
+    text of wanted values (and of the string currently being scanned) is
+    buffered.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.mark: Optional[int] = None
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[keep:] + chunk
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()  # type: ignore [union-attr]
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise SourceError("Unexpected end of JSON document")
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise SourceError(f"Expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def _scan_string(self):
+        outer = self.mark
+        if outer is None:
+            self.mark = self.pos
+        while True:
+            m = _STRING_TAIL.match(self.buf, self.pos + 1)
+            if m:
+                self.pos = m.end()
+                break
+            if not self._fill():
+                raise SourceError("Unterminated string")
+        if outer is None:
+            self.mark = None
+
+    def _scan_value(self):
+        char = self._peek()
+        if char == '"':
+            self._scan_string()
+        elif char in "[{":
+            depth = 0
+            while True:
+                self.pos = _SKIP.match(self.buf, self.pos).end()
+                if self.pos == len(self.buf):
+                    if not self._fill():
+                        raise SourceError("Unterminated container")
+                    continue
+                token = self.buf[self.pos]
+                if token == '"':
+                    # String split across chunks: buffer just that string.
+                    self._scan_string()
+                    continue
+                self.pos += 1
+                depth += 1 if token in "[{" else -1
+                if depth == 0:
+                    return
+        else:
+            while True:
+                m = _SCALAR.match(self.buf, self.pos)
+                if m and (m.end() < len(self.buf) or self.eof):
+                    self.pos = m.end()
+                    return
+                outer = self.mark
+                if outer is None:
+                    self.mark = self.pos
+                filled = self._fill()
+                if outer is None:
+                    self.mark = None
+                if not filled and not m:
+                    raise SourceError("Truncated scalar")
+
+    def _read_value(self) -> Any:
+        self._peek()
+        self.mark = self.pos
+        self._scan_value()
+        text = self.buf[self.mark:self.pos]
+        self.mark = None
+        return json.loads(text)
+
+    def fields(self, wanted: frozenset) -> Dict[str, Any]:
+        found: Dict[str, Any] = {}
+        self._expect("{")
+        if self._peek() == "}":
+            return found
+        while len(found) < len(wanted):
+            if self._peek() != '"':
+                raise SourceError(f"Expected key at offset {self.pos}")
+            key = self._read_value()
+            self._expect(":")
+            if key in wanted:
+                found[key] = self._read_value()
+            else:
+                self._scan_value()
+            if self._peek() == "}":
+                break
+            self._expect(",")
+        return found
+
+
+def extract_fields(
+    stream: TextIO, wanted: frozenset = CORE_FIELDS, chunk_size: int = 64 * 1024
+) -> Dict[str, Any]:
+    """Pull only the ``wanted`` top-level keys out of a JSON object stream.
+
+    Stops reading as soon as every wanted key has been seen.
+    """
+    return _FieldScanner(stream, chunk_size).fields(wanted)
+
+
+class PokemonSource(Protocol):
+    """Anything that can produce a raw PokeAPI pokemon payload by id.
+
+    ``fetch`` returns the parsed payload; ``fetch_raw`` the undecoded JSON
+    bytes, for pipelines that parse elsewhere (e.g. in worker processes).
+    """
+
+    async def fetch(self, identifier: int) -> Dict[str, Any]: ...
+
+    async def fetch_raw(self, identifier: int) -> bytes: ...
+
+
+class HttpSource:
+    """Live PokeAPI over a shared ``httpx.AsyncClient``."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+
+    async def fetch(self, identifier: int) -> Dict[str, Any]:
+        return json.loads(await self.fetch_raw(identifier))
+
+    async def fetch_raw(self, identifier: int) -> bytes:
+        resp = await self.client.get(POKEAPI_URL.format(identifier=identifier))
+        resp.raise_for_status()
+        return resp.content
+
+
+class CachingHttpSource(HttpSource):
+    """:class:`HttpSource` backed by an on-disk :class:`HttpCache`.
+
+    Every fetch revalidates with ``If-None-Match``/``If-Modified-Since``;
+    on ``304 Not Modified`` the body is read from disk instead of
+    downloaded again. ``hits``/``downloads`` count the two outcomes.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, cache: HttpCache):
+        super().__init__(client)
+        self.cache = cache
+        self.hits = 0
+        self.downloads = 0
+
+    async def fetch_raw(self, identifier: int) -> bytes:
+        url = POKEAPI_URL.format(identifier=identifier)
+        entry = self.cache.lookup(url)
+        headers = entry.conditional_headers() if entry else {}
+        resp = await self.client.get(url, headers=headers)
+        if resp.status_code == 304 and entry is not None:
+            self.hits += 1
+            await asyncio.to_thread(self.cache.touch, entry)
+            body = await asyncio.to_thread(self.cache.body, entry)
+        else:
+            resp.raise_for_status()
+            self.downloads += 1
+            body = resp.content
+            await asyncio.to_thread(
+                self.cache.store,
+                url,
+                body,
+                resp.headers.get("etag"),
+                resp.headers.get("last-modified"),
+            )
+        return body
+
+
+# Compressions tarfile reads, by magic number
+TAR_COMPRESSION: Dict[bytes, Callable[[Path], Any]] = {
+    b"\x1f\x8b": gzip.open,
+    b"BZh": bz2.open,
+    b"\xfd7zXZ\x00": lzma.open,
+}
+
+
+class _MemberReader(io.RawIOBase):
+    """One archive member read with ``pread`` at its offset: no shared file
+    position, so concurrent readers (``asyncio.to_thread``) don't interfere."""
+
+    def __init__(self, fd: int, offset: int, size: int):
+        self.fd = fd
+        self.offset = offset
+        self.end = offset + size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.end - self.offset)
+        if size <= 0:
+            return 0
+        data = os.pread(self.fd, size, self.offset)
+        buffer[: len(data)] = data
+        self.offset += len(data)
+        return len(data)
+
+
+class FixtureSource:
+    """Raw PokeAPI dumps on disk named ``<id>.json``.
+
+    ``path`` may be a directory, a tar archive (optionally compressed) or a
+    zip archive. Payloads are streamed through :func:`extract_fields`, so
+    memory per record stays bounded regardless of dump size.
+
+    Archives are indexed once. Tar members are then read straight from
+    their data offsets; a compressed tar is first decompressed to a
+    temporary file, since its members cannot be reached without
+    decompressing everything before them. Either way a load is one pass
+    over the archive, not one per record.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[IO[bytes]] = None
+        self._offsets: Dict[str, Tuple[int, int]] = {}  # tar member -> (data offset, size)
+        if self.path.is_dir():
+            self.kind = "dir"
+        elif zipfile.is_zipfile(self.path):
+            self.kind = "zip"
+        elif tarfile.is_tarfile(self.path):
+            self.kind = "tar"
+        else:
+            raise SourceError(f"Not a directory, tar or zip archive: {self.path}")
+        self._members = self._index()
+
+    def _index(self) -> Dict[int, str]:
+        if self.kind == "dir":
+            names = [p.name for p in self.path.iterdir() if p.is_file()]
+        elif self.kind == "zip":
+            self._zip = zipfile.ZipFile(self.path)
+            names = self._zip.namelist()
+        else:
+            self._tar = self._uncompressed_tar()
+            with tarfile.open(fileobj=self._tar, mode="r:") as tf:
+                self._offsets = {m.name: (m.offset_data, m.size) for m in tf.getmembers() if m.isfile()}
+            names = list(self._offsets)
+        members = {}
+        for name in names:
+            member = Path(name)
+            if member.suffix == ".json" and member.stem.isdigit():
+                members[int(member.stem)] = name
+        return members
+
+    def _uncompressed_tar(self) -> IO[bytes]:
+        with open(self.path, "rb") as fh:
+            magic = fh.read(6)
+        for prefix, decompress in TAR_COMPRESSION.items():
+            if magic.startswith(prefix):
+                spool = tempfile.TemporaryFile()
+                with decompress(self.path) as stream:
+                    shutil.copyfileobj(stream, spool)
+                spool.seek(0)
+                return spool
+        return open(self.path, "rb")
+
+    def close(self):
+        for handle in (self._zip, self._tar):
+            if handle is not None:
+                handle.close()
+        self._zip = self._tar = None
+
+    def ids(self) -> List[int]:
+        return sorted(self._members)
+
+    @contextmanager
+    def open(self, identifier: int) -> Iterator[TextIO]:
+        name = self._members.get(identifier)
+        if name is None:
+            raise SourceError(f"No fixture for pokemon {identifier} in {self.path}")
+        if self.kind == "dir":
+            with open(self.path / name, encoding="utf-8") as fh:
+                yield fh
+        elif self.kind == "zip":
+            assert self._zip is not None
+            with self._zip.open(name) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8")
+        else:
+            assert self._tar is not None
+            offset, size = self._offsets[name]
+            with io.BufferedReader(_MemberReader(self._tar.fileno(), offset, size)) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8")
+
+    def read(self, identifier: int) -> Dict[str, Any]:
+        with self.open(identifier) as fh:
+            return extract_fields(fh)
+
+    def read_raw(self, identifier: int) -> bytes:
+        with self.open(identifier) as fh:
+            return fh.read().encode("utf-8")
+
+    async def fetch(self, identifier: int) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.read, identifier)
+
+    async def fetch_raw(self, identifier: int) -> bytes:
+        return await asyncio.to_thread(self.read_raw, identifier)
@@ -0,0 +1,154 @@
+import asyncio
+import fnmatch
+import functools
+import hashlib
+import mimetypes
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Union
+
+from sqlmodel import Session, col, select
+
+from src.etl.content_store import ContentEntry, ContentStore, _atomic_write
+from src.models import Sprite, UrlPrefix
+
+if TYPE_CHECKING:  # the API imports SpriteStore; only the ETL downloads
+    import httpx
+    from src.etl.retry import RetryPolicy
+
+# Shared by the ETL (writer) and the API (reader)
+SPRITE_STORE = os.environ.get("POKEDEX_SPRITE_STORE", ".cache/sprites")
+# Sprite variants the ETL keeps; see variant_matcher. Game-version sets
+# (versions_generation-*) are most of the rows, so e.g. "front_*,back_*" drops them
+SPRITE_VARIANTS = os.environ.get("POKEDEX_SPRITE_VARIANTS", "*")
+
+
+@dataclass
+class SpriteEntry(ContentEntry):
+    """A sprite URL and the stored image it resolved to."""
+
+    content_type: str
+    size: int
+    fetched_at: float = 0.0
+
+
+class SpriteStore(ContentStore[SpriteEntry]):
+    """Content-addressed store of sprite images.
+
+    Layout under ``root``::
+
+        objects/ab/abcdef....png   image bytes, named by their sha256
+        urls/12/123456....json     SpriteEntry for the URL with that sha256
+
+    Objects are stored uncompressed (PNGs gain nothing from gzip) so the
+    API can send them straight from disk. Identical images behind different
+    URLs, common across game-version sprite sets, are stored once.
+    """
+
+    entry_type = SpriteEntry
+
+    def __init__(self, root: Union[str, Path] = SPRITE_STORE):
+        super().__init__(root)
+
+    def object_path(self, entry: SpriteEntry) -> Path:
+        return self._digest_path(entry.digest, mimetypes.guess_extension(entry.content_type) or "")
+
+    def store(self, url: str, body: bytes, content_type: Optional[str] = None) -> bool:
+        """Store ``body`` for ``url``; False if an identical image was already stored."""
+        if not content_type or not content_type.startswith("image/"):
+            content_type = mimetypes.guess_type(url)[0] or "application/octet-stream"
+        entry = SpriteEntry(url, hashlib.sha256(body).hexdigest(), content_type, len(body), time.time())
+        path = self.object_path(entry)
+        new = not path.exists()
+        if new:
+            _atomic_write(path, body)
+        self._save(entry)
+        return new
+
+
+@dataclass
+class SpriteStats:
+    """Outcome of a sprite download run."""
+
+    requested: int = 0  # distinct URLs
+    present: int = 0  # already in the store
+    downloaded: int = 0
+    deduplicated: int = 0  # downloaded, but an identical image was stored
+    failed: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+
+def sprite_urls(session: Session) -> List[str]:
+    """Every distinct sprite URL in the database."""
+    url = col(UrlPrefix.prefix) + col(Sprite.path)
+    query = select(url).select_from(Sprite).join(UrlPrefix, col(UrlPrefix.id) == Sprite.prefix_id)
+    rows = session.exec(query.where(url != "").distinct().order_by(url))
+    return [url for url in rows.all() if url.startswith(("http://", "https://"))]
+
+
+@functools.lru_cache(maxsize=8)
+def variant_matcher(patterns: str) -> Callable[[str], bool]:
+    """Predicate for the flattened variant names a comma-separated list of
+    ``fnmatch`` patterns keeps (``front_*,other_official-artwork_*``)."""
+    wanted = [p.strip() for p in patterns.split(",") if p.strip()]
+    if "*" in wanted:
+        return lambda name: True
+    regex = re.compile("|".join(fnmatch.translate(p) for p in wanted) or "(?!)")
+    return lambda name: regex.match(name) is not None
+
+
+async def fetch_sprites(
+    urls: Iterable[str],
+    store: SpriteStore,
+    client: "httpx.AsyncClient",
+    concurrency: int = 10,
+    retry: Optional["RetryPolicy"] = None,
+    rate: float = 0.0,
+    refresh: bool = False,
+) -> SpriteStats:
+    """Download sprite images into ``store``, skipping URLs it already has.
+
+    Fetches run concurrently through the shared client with the same retry
+    and rate limiting as the pokemon loads. A failed image is counted and
+    left for the API's upstream fallback.
+    """
+    import httpx
+    from src.etl.retry import RateLimiter, RetryPolicy, fetch_with_retry
+
+    urls = list(dict.fromkeys(urls))
+    stats = SpriteStats(requested=len(urls))
+    started = time.perf_counter()
+    if not refresh:
+        missing = [url for url in urls if store.lookup(url) is None]
+        stats.present = len(urls) - len(missing)
+        urls = missing
+    retry = retry or RetryPolicy()
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get(url: str) -> httpx.Response:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response
+
+    async def fetch_one(url: str):
+        async with semaphore:
+            try:
+                response = await fetch_with_retry(get, url, retry, limiter)
+            except httpx.HTTPError:
+                stats.failed += 1
+                return
+        body = response.content
+        if store.store(url, body, response.headers.get("content-type")):
+            stats.downloaded += 1
+            stats.bytes += len(body)
+        else:
+            stats.deduplicated += 1
+
+    await asyncio.gather(*(fetch_one(url) for url in urls))
+    stats.elapsed = time.perf_counter() - started
+    return stats
@@ -0,0 +1,81 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import httpx
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from src.etl.retry import RateLimiter, RetryPolicy, fetch_with_retry
+from src.etl.writer import BulkWriter, _executemany
+from src.models import TypeEffectiveness, bump_generation
+
+POKEAPI_TYPE_URL = "https://pokeapi.co/api/v2/type/{name}"
+# Offline copy of the current (generation 6+) chart, in the same shape
+BUNDLED_CHART = Path(__file__).with_name("type_chart.json")
+
+# The battle types, in PokeAPI id order; "unknown", "shadow" and "stellar" have no chart
+TYPE_NAMES = [
+    "normal", "fighting", "flying", "poison", "ground", "rock", "bug", "ghost", "steel",
+    "fire", "water", "grass", "electric", "psychic", "ice", "dragon", "dark", "fairy",
+]
+FACTORS = {"double_damage_to": 2.0, "half_damage_to": 0.5, "no_damage_to": 0.0}
+
+# attacking type -> defending type -> factor, listing only pairs that are not 1x
+Chart = Dict[str, Dict[str, float]]
+
+
+def parse_relations(relations: Dict[str, Any]) -> Dict[str, float]:
+    """Factors against each defending type from PokeAPI ``damage_relations``.
+
+    Entries may be PokeAPI's ``{"name": ..., "url": ...}`` references or
+    plain names (the bundled chart).
+    """
+    factors = {}
+    for relation, factor in FACTORS.items():
+        for entry in relations.get(relation, []):
+            factors[entry["name"] if isinstance(entry, dict) else entry] = factor
+    return factors
+
+
+def load_bundled(path: Union[str, Path] = BUNDLED_CHART) -> Chart:
+    return {name: parse_relations(relations) for name, relations in json.loads(Path(path).read_text()).items()}
+
+
+async def fetch_chart(
+    client: httpx.AsyncClient,
+    retry: Optional[RetryPolicy] = None,
+    rate: float = 0.0,
+) -> Chart:
+    """The chart from PokeAPI's ``type`` endpoints, one request per type."""
+    retry = retry or RetryPolicy()
+    limiter = RateLimiter(rate)
+
+    async def get(name: str) -> Dict[str, float]:
+        response = await client.get(POKEAPI_TYPE_URL.format(name=name))
+        response.raise_for_status()
+        return parse_relations(response.json()["damage_relations"])
+
+    relations = await asyncio.gather(*(fetch_with_retry(get, name, retry, limiter) for name in TYPE_NAMES))
+    return dict(zip(TYPE_NAMES, relations))
+
+
+def write_chart(session: Session, chart: Chart) -> int:
+    """Replace the stored chart with ``chart``; returns the rows written.
+
+    Types are matched by name, creating any the dex has not seen yet. Bumps
+    the data generation so API workers rebuild their matrices.
+    """
+    names = set(chart) | {defending for factors in chart.values() for defending in factors}
+    type_ids = BulkWriter().resolve_types(session, names)
+    rows = [
+        {"attacking_type_id": type_ids[attacking], "defending_type_id": type_ids[defending], "factor": factor}
+        for attacking, factors in chart.items()
+        for defending, factor in factors.items()
+        if factor != 1.0
+    ]
+    session.execute(delete(TypeEffectiveness))
+    _executemany(session, TypeEffectiveness.__table__, rows)  # type: ignore [attr-defined]
+    bump_generation(session)
+    return len(rows)
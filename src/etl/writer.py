@@ -0,0 +1,181 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Sequence, Set
+from sqlalchemy import Table, delete
+from sqlmodel import Session, col, select
+from src.models import (
+    Pokemon,
+    PokemonDocument,
+    PokemonStat,
+    PokemonType,
+    Sprite,
+    SpriteVariant,
+    Type,
+    UrlPrefix,
+    bump_generation,
+    split_url,
+)
+from src.repository import build_record, document_for
+from src.schemas import PokemonData
+
+
+def insert_ignore(session: Session, table: Table):
+    """``INSERT ... ON CONFLICT DO NOTHING`` for the session's dialect."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert(table).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert(table).on_conflict_do_nothing()
+    if dialect in ("mysql", "mariadb"):
+        return table.insert().prefix_with("IGNORE")
+    raise NotImplementedError(f"No conflict-ignoring insert for {dialect}")
+
+
+def _executemany(session: Session, table: Table, rows: List[Dict[str, Any]]):
+    if rows:
+        session.execute(insert_ignore(session, table), rows)
+
+
+@dataclass
+class WriteResult:
+    inserted: List[PokemonData] = field(default_factory=list)
+    updated: List[PokemonData] = field(default_factory=list)  # refresh only
+    skipped: List[PokemonData] = field(default_factory=list)
+
+
+class BulkWriter:
+    """Set-based writer for batches of normalized pokemon.
+
+    A batch costs a fixed handful of statements whatever its size: one
+    ``SELECT`` for ids already loaded, one executemany ``INSERT ... ON
+    CONFLICT DO NOTHING`` per table, and one generation bump. Type, sprite
+    variant and URL prefix ids are remembered across batches, so those
+    dictionaries are only queried the first time a value is seen.
+
+    By default semantics match the original per-row ``insert_idempotent``:
+    a pokemon that already exists is skipped entirely, never updated.
+    """
+
+    def __init__(self):
+        self.type_ids: Dict[str, int] = {}
+        self.variant_ids: Dict[str, int] = {}
+        self.prefix_ids: Dict[str, int] = {}
+
+    def resolve_types(self, session: Session, names: Iterable[str]) -> Dict[str, int]:
+        return self._intern(session, Type, col(Type.name), self.type_ids, names)
+
+    def resolve_variants(self, session: Session, names: Iterable[str]) -> Dict[str, int]:
+        return self._intern(session, SpriteVariant, col(SpriteVariant.name), self.variant_ids, names)
+
+    def resolve_prefixes(self, session: Session, prefixes: Iterable[str]) -> Dict[str, int]:
+        return self._intern(session, UrlPrefix, col(UrlPrefix.prefix), self.prefix_ids, prefixes)
+
+    @staticmethod
+    def _intern(session: Session, model, column, ids: Dict[str, int], values: Iterable[str]) -> Dict[str, int]:
+        """Ids for ``values`` in a dictionary table, inserting the unseen ones into it and ``ids``."""
+        missing = {v for v in values if v not in ids}
+        if not missing:
+            return ids
+
+        def load(wanted: Set[str]):
+            rows = session.exec(select(model.id, column).where(column.in_(list(wanted)))).all()
+            ids.update((value, row_id) for row_id, value in rows if row_id is not None)
+
+        load(missing)
+        unknown = missing - ids.keys()
+        if unknown:
+            _executemany(session, model.__table__, [{column.key: v} for v in sorted(unknown)])
+            load(unknown)
+        return ids
+
+    def write(self, session: Session, batch: Sequence[PokemonData], refresh: bool = False) -> WriteResult:
+        """Write ``batch`` in the session's transaction; the caller commits.
+
+        Existing pokemon are skipped unless ``refresh`` is set, in which case
+        those whose response document differs from the stored one have all
+        their rows replaced. If the caller rolls back instead of committing,
+        call :meth:`reset`: dictionary ids minted in that transaction are gone.
+        """
+        ids = [norm.id for norm in batch]
+        existing = set(session.exec(select(Pokemon.id).where(col(Pokemon.id).in_(ids))).all())
+        stored: Dict[int, bytes] = {}
+        if refresh and existing:
+            rows = session.exec(
+                select(PokemonDocument.id, PokemonDocument.body).where(col(PokemonDocument.id).in_(existing))
+            ).all()
+            stored = {doc_id: body for doc_id, body in rows}
+        result = WriteResult()
+        documents: Dict[int, PokemonDocument] = {}
+        seen: Set[int] = set()
+        for norm in batch:
+            if norm.id in seen or (norm.id in existing and not refresh):
+                result.skipped.append(norm)  # a repeated id within the batch is skipped too
+                continue
+            seen.add(norm.id)
+            document = document_for(self.record(norm))
+            if norm.id not in existing:
+                result.inserted.append(norm)
+            elif stored.get(norm.id) == document.body:
+                result.skipped.append(norm)
+                continue
+            else:
+                result.updated.append(norm)
+            documents[norm.id] = document
+        if not documents:
+            return result
+
+        if result.updated:
+            # Replace rather than diff: the row sets (e.g. sprites) may have changed shape
+            changed = [norm.id for norm in result.updated]
+            for model in (PokemonType, PokemonStat, Sprite):
+                session.execute(delete(model).where(col(model.pokemon_id).in_(changed)))
+            session.execute(delete(PokemonDocument).where(col(PokemonDocument.id).in_(changed)))
+            session.execute(delete(Pokemon).where(col(Pokemon.id).in_(changed)))
+        written = result.inserted + result.updated
+        type_ids = self.resolve_types(session, {t["type_name"] for norm in written for t in norm.types})
+        _executemany(session, Pokemon.__table__, [  # type: ignore [attr-defined]
+            {"id": n.id, "name": n.name, "height": n.height, "weight": n.weight} for n in written
+        ])
+        _executemany(session, PokemonType.__table__, [  # type: ignore [attr-defined]
+            {"pokemon_id": n.id, "type_id": type_ids[t["type_name"]], "slot": t["slot"]}
+            for n in written for t in n.types
+        ])
+        _executemany(session, PokemonStat.__table__, [  # type: ignore [attr-defined]
+            {"pokemon_id": n.id, "stat_name": s["stat_name"], "base_stat": s["base_stat"]}
+            for n in written for s in n.stats
+        ])
+        # Sprites store dictionary ids and the URL's file name; see SpriteVariant and UrlPrefix
+        sprites = [(n.id, variant, *split_url(url)) for n in written for variant, url in n.sprites.items()]
+        variant_ids = self.resolve_variants(session, {s[1] for s in sprites})
+        prefix_ids = self.resolve_prefixes(session, {s[2] for s in sprites})
+        _executemany(session, Sprite.__table__, [  # type: ignore [attr-defined]
+            {"pokemon_id": pokemon_id, "variant_id": variant_ids[variant], "prefix_id": prefix_ids[prefix], "path": path}
+            for pokemon_id, variant, prefix, path in sprites
+        ])
+        # Precomputed read model served by the API
+        _executemany(session, PokemonDocument.__table__, [  # type: ignore [attr-defined]
+            {"id": d.id, "name": d.name, "body": d.body} for d in documents.values()
+        ])
+        # Lets API workers notice the write and drop cached responses
+        bump_generation(session)
+        return result
+
+    @staticmethod
+    def record(norm: PokemonData):
+        return build_record(
+            norm.id,
+            norm.name,
+            norm.height,
+            norm.weight,
+            [(t["type_name"], t["slot"]) for t in norm.types],
+            [(s["stat_name"], s["base_stat"]) for s in norm.stats],
+            norm.sprites,
+        )
+
+    def reset(self):
+        self.type_ids.clear()
+        self.variant_ids.clear()
+        self.prefix_ids.clear()
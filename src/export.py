@@ -0,0 +1,161 @@
+import csv
+import io
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+from sqlmodel import Session, col, select
+from src.models import Pokemon, PokemonStat, PokemonType, Sprite, SpriteVariant, Type
+from src.repository import EXPECTED_SPRITES, STAT_ORDER, sprite_query, stat_sort_key
+from src.serialization import Record, dumps
+
+FORMATS = ("ndjson", "csv", "columnar")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv", "columnar": "application/x-ndjson"}
+EXTENSIONS = {"ndjson": "ndjson", "csv": "csv", "columnar": "columnar.ndjson"}
+CHUNK_SIZE = 500
+
+CSV_COLUMNS = (
+    ["id", "name", "height_m", "weight_kg", "type_1", "type_2"]
+    + STAT_ORDER
+    + [f"sprite_{variant}" for variant in EXPECTED_SPRITES]
+)
+
+
+def iter_chunks(db: Session, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Record]]:
+    """The whole dex as ``PokemonResponse``-shaped dicts, ``chunk_size`` at a time.
+
+    Pages through pokemon by id (keyset, so each page is an index range
+    scan) and fetches the page's types, stats and sprites with one set
+    query each. Only plain rows are read, never ORM objects, and only one
+    chunk is held in memory.
+    """
+    last_id = 0
+    while True:
+        page = db.exec(
+            select(Pokemon.id, Pokemon.name, Pokemon.height, Pokemon.weight)
+            .where(col(Pokemon.id) > last_id)
+            .order_by(col(Pokemon.id))
+            .limit(chunk_size)
+        ).all()
+        if not page:
+            return
+        first, last_id = page[0][0], page[-1][0]
+        records: Dict[int, Record] = {}
+        for pokemon_id, name, height, weight in page:
+            records[pokemon_id] = {
+                "id": pokemon_id,
+                "name": name,
+                "height_m": height / 10.0,
+                "weight_kg": weight / 10.0,
+                "types": [],
+                "stats": [],
+                "sprites": {},
+            }
+        in_page = (first, last_id)
+        for pokemon_id, slot, type_name in db.exec(
+            select(PokemonType.pokemon_id, PokemonType.slot, Type.name)
+            .join(Type)
+            .where(col(PokemonType.pokemon_id).between(*in_page))
+            .order_by(col(PokemonType.pokemon_id), col(PokemonType.slot))
+        ):
+            records[pokemon_id]["types"].append({"name": type_name, "slot": slot})
+        for pokemon_id, stat_name, base_stat in db.exec(
+            select(PokemonStat.pokemon_id, PokemonStat.stat_name, PokemonStat.base_stat).where(
+                col(PokemonStat.pokemon_id).between(*in_page)
+            )
+        ):
+            records[pokemon_id]["stats"].append({"name": stat_name, "base_stat": base_stat})
+        for pokemon_id, variant, url in db.exec(
+            sprite_query(col(Sprite.pokemon_id).between(*in_page))
+            .order_by(col(Sprite.pokemon_id), col(SpriteVariant.name))
+        ):
+            records[pokemon_id]["sprites"][variant] = url
+        for record in records.values():
+            record["stats"].sort(key=lambda s: stat_sort_key(s["name"]))
+            for variant in EXPECTED_SPRITES:
+                record["sprites"].setdefault(variant, None)
+        yield list(records.values())
+
+
+def encode_ndjson(chunk: List[Record]) -> bytes:
+    return b"".join(dumps(r) + b"\n" for r in chunk)
+
+
+def csv_row(record: Record) -> List[Any]:
+    types = [t["name"] for t in record["types"]] + ["", ""]
+    stats = {s["name"]: s["base_stat"] for s in record["stats"]}
+    return (
+        [record["id"], record["name"], record["height_m"], record["weight_kg"], types[0], types[1]]
+        + [stats.get(name, "") for name in STAT_ORDER]
+        + [record["sprites"].get(variant) or "" for variant in EXPECTED_SPRITES]
+    )
+
+
+def encode_columnar(chunk: List[Record]) -> bytes:
+    """One record batch per line, stored column by column.
+
+    Like a Parquet row group: each column is one homogeneous array, so
+    readers can load single columns straight into NumPy or pandas. Types
+    are split into ``type_1``/``type_2`` and stats get a column each;
+    sprites stay a column of objects.
+    """
+    stats = [{s["name"]: s["base_stat"] for s in r["stats"]} for r in chunk]
+    types = [[t["name"] for t in r["types"]] + [None, None] for r in chunk]
+    columns: Dict[str, List[Any]] = {
+        "id": [r["id"] for r in chunk],
+        "name": [r["name"] for r in chunk],
+        "height_m": [r["height_m"] for r in chunk],
+        "weight_kg": [r["weight_kg"] for r in chunk],
+        "type_1": [t[0] for t in types],
+        "type_2": [t[1] for t in types],
+    }
+    for name in STAT_ORDER:
+        columns[name] = [s.get(name) for s in stats]
+    columns["sprites"] = [r["sprites"] for r in chunk]
+    return dumps({"rows": len(chunk), "columns": columns}) + b"\n"
+
+
+def _encoder(format: str) -> Callable[[List[Record]], bytes]:
+    if format == "ndjson":
+        return encode_ndjson
+    if format == "columnar":
+        return encode_columnar
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+
+        def encode_csv(chunk: List[Record]) -> bytes:
+            writer.writerows(csv_row(r) for r in chunk)
+            data = buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            return data
+
+        return encode_csv
+    raise ValueError(f"Unknown export format: {format}")
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into one gzip member, chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(db: Session, format: str = "ndjson", gzip: bool = False, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Stream the dex encoded as ``format``, optionally gzipped.
+
+    A generator: nothing is read until it is iterated, and each yielded
+    piece covers one chunk of pokemon, so memory stays flat however large
+    the dex is.
+    """
+    encode = _encoder(format)
+
+    def encoded() -> Iterator[bytes]:
+        if format == "csv":
+            yield (",".join(CSV_COLUMNS) + "\n").encode()
+        for chunk in iter_chunks(db, chunk_size):
+            yield encode(chunk)
+
+    return gzip_stream(encoded()) if gzip else encoded()
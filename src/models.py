@@ -1,8 +1,19 @@
-from typing import Optional, List
-from sqlmodel import SQLModel, Field, Relationship, create_engine
-from sqlalchemy import Column, Integer
+import hashlib
+from typing import TYPE_CHECKING, Optional, List, Tuple
+from sqlmodel import SQLModel, Field, Relationship, Session, col, select
+from sqlalchemy import Column, Index, Integer, LargeBinary, insert, inspect, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import column_property
+from src.database import make_engine
 
 class Pokemon(SQLModel, table=True):
+    __table_args__ = (
+        # Keyset pagination when sorting by size
+        Index("ix_pokemon_height_id", "height", "id"),
+        Index("ix_pokemon_weight_id", "weight", "id"),
+    )
+
     id: int = Field(sa_column=Column(Integer, primary_key=True, autoincrement=False))
     name: str = Field(index=True)
     height: int  # decimeters
@@ -21,6 +32,11 @@ class Type(SQLModel, table=True):
     pokemon_types: List["PokemonType"] = Relationship(back_populates="type")
 
 class PokemonType(SQLModel, table=True):
+    __table_args__ = (
+        # "All pokemon of type X" filters
+        Index("ix_pokemontype_type_id_pokemon_id", "type_id", "pokemon_id"),
+    )
+
     pokemon_id: int = Field(foreign_key="pokemon.id", primary_key=True)
     type_id: int = Field(foreign_key="type.id", primary_key=True)
     slot: int
@@ -29,7 +45,18 @@ class PokemonType(SQLModel, table=True):
     pokemon: Pokemon = Relationship(back_populates="types")
     type: Type = Relationship(back_populates="pokemon_types")
 
+class TypeEffectiveness(SQLModel, table=True):
+    """Damage factor of an attacking type against a defending type; pairs not listed are 1x."""
+    attacking_type_id: int = Field(foreign_key="type.id", primary_key=True)
+    defending_type_id: int = Field(foreign_key="type.id", primary_key=True)
+    factor: float  # 0, 0.5 or 2
+
 class PokemonStat(SQLModel, table=True):
+    __table_args__ = (
+        # Stat threshold filters and sort-by-stat keyset pages (covering)
+        Index("ix_pokemonstat_stat_name_base_stat", "stat_name", "base_stat", "pokemon_id"),
+    )
+
     pokemon_id: int = Field(foreign_key="pokemon.id", primary_key=True)
     stat_name: str = Field(primary_key=True)
     base_stat: int
@@ -37,16 +64,132 @@ class PokemonStat(SQLModel, table=True):
     # Relationship
     pokemon: Pokemon = Relationship(back_populates="stats")
 
+class SpriteVariant(SQLModel, table=True):
+    """Dictionary of sprite variant names (``front_default``, ``versions_generation-i_...``)."""
+    id: Optional[int] = Field(default=None, sa_column=Column(Integer, primary_key=True, autoincrement=True))
+    name: str = Field(index=True, unique=True)
+
+class UrlPrefix(SQLModel, table=True):
+    """Interned sprite URL directories; a sprite row keeps only the file name after it."""
+    id: Optional[int] = Field(default=None, sa_column=Column(Integer, primary_key=True, autoincrement=True))
+    prefix: str = Field(index=True, unique=True)
+
+def split_url(url: str) -> Tuple[str, str]:
+    """``(prefix, path)`` of a sprite URL: up to and including the last ``/``, then the rest."""
+    prefix, slash, path = url.rpartition("/")
+    return prefix + slash, path
+
 class Sprite(SQLModel, table=True):
+    # Rows live in primary key order, so one pokemon's sprites are a single range scan
+    __table_args__ = {"sqlite_with_rowid": False}
+
     pokemon_id: int = Field(foreign_key="pokemon.id", primary_key=True)
-    variant: str = Field(primary_key=True)
-    url: str
+    variant_id: int = Field(foreign_key="spritevariant.id", primary_key=True)
+    prefix_id: int = Field(foreign_key="urlprefix.id")
+    path: str
     
     # Relationship
     pokemon: Pokemon = Relationship(back_populates="sprites")
 
-# Database setup
-engine = create_engine("sqlite:///pokedex.db", echo=False)
+    if TYPE_CHECKING:  # mapped below, not model fields
+        variant: str
+        url: str
+
+# Read-only ``variant`` and ``url``, selected with every Sprite as plain columns
+# (scalar subqueries on the dictionaries) rather than as joined objects
+Sprite.__mapper__.add_property("variant", column_property(  # type: ignore [attr-defined]
+    select(SpriteVariant.name).where(SpriteVariant.id == Sprite.variant_id).scalar_subquery()
+))
+Sprite.__mapper__.add_property("url", column_property(  # type: ignore [attr-defined]
+    select(col(UrlPrefix.prefix) + Sprite.path).where(UrlPrefix.id == Sprite.prefix_id).scalar_subquery()
+))
+
+class PokemonDocument(SQLModel, table=True):
+    """Read model: the final GET /pokemon/{identifier} JSON, maintained by the ETL."""
+    id: int = Field(sa_column=Column(Integer, primary_key=True, autoincrement=False))
+    name: str = Field(index=True, unique=True)
+    body: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+class DataVersion(SQLModel, table=True):
+    """Single-row generation stamp, bumped whenever the ETL writes dex data."""
+    id: int = Field(default=1, primary_key=True)
+    generation: int = 0
+
+def bump_generation(session: Session):
+    """Increment the data generation inside the caller's transaction."""
+    result = session.execute(
+        update(DataVersion).where(col(DataVersion.id) == 1).values(generation=col(DataVersion.generation) + 1)
+    )
+    if result.rowcount == 0:  # type: ignore [attr-defined]
+        session.add(DataVersion(id=1, generation=1))
+
+def current_generation(session: Session) -> int:
+    generation = session.exec(select(DataVersion.generation).where(DataVersion.id == 1)).first()
+    return generation or 0
+
+class SchemaVersion(SQLModel, table=True):
+    """Single-row fingerprint of the models the tables were last created from."""
+    id: int = Field(default=1, primary_key=True)
+    version: str
+
+def schema_fingerprint() -> str:
+    """Digest of every table, column and index; changes whenever the models do."""
+    parts = []
+    for table in SQLModel.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f"{c.name}:{c.type}:{c.primary_key}:{c.nullable}" for c in table.columns)
+        parts.extend(sorted(f"{i.name}:{','.join(c.name for c in i.columns)}" for i in table.indexes))
+    return hashlib.blake2b("\n".join(parts).encode(), digest_size=8).hexdigest()
+
+SCHEMA_VERSION = schema_fingerprint()
+
+def schema_version(bind: Engine) -> Optional[str]:
+    """The fingerprint stored in the database, or None before the first ``create_db_and_tables``."""
+    try:
+        with Session(bind) as session:
+            return session.exec(select(SchemaVersion.version).where(SchemaVersion.id == 1)).first()
+    except DatabaseError:  # no schemaversion table yet
+        return None
+
+# Database setup: the writable engine (ETL, schema creation)
+engine = make_engine()
+
+def migrate_sprites(bind: Engine) -> int:
+    """Convert a ``sprite`` table from before interning (a variant name and full
+    URL per row) to the dictionary layout; returns the rows converted.
+
+    Run before ``create_all``, which would otherwise keep the old table.
+    """
+    inspector = inspect(bind)
+    if not inspector.has_table("sprite") or "url" not in {c["name"] for c in inspector.get_columns("sprite")}:
+        return 0  # no table yet, or already converted
+    with bind.begin() as conn:
+        rows = conn.execute(text("SELECT pokemon_id, variant, url FROM sprite")).all()
+        conn.execute(text("DROP TABLE sprite"))
+        tables = [SpriteVariant.__table__, UrlPrefix.__table__, Sprite.__table__]  # type: ignore [attr-defined]
+        SQLModel.metadata.create_all(conn, tables=tables)  # type: ignore [arg-type]
+        variants = {name: n for n, name in enumerate(sorted({r.variant for r in rows}), 1)}
+        prefixes = {prefix: n for n, prefix in enumerate(sorted({split_url(r.url)[0] for r in rows}), 1)}
+        if rows:
+            conn.execute(insert(SpriteVariant), [{"id": n, "name": name} for name, n in variants.items()])
+            conn.execute(insert(UrlPrefix), [{"id": n, "prefix": prefix} for prefix, n in prefixes.items()])
+            conn.execute(insert(Sprite), [
+                {"pokemon_id": r.pokemon_id, "variant_id": variants[r.variant], "prefix_id": prefixes[prefix], "path": path}
+                for r in rows for prefix, path in [split_url(r.url)]
+            ])
+    return len(rows)
 
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+    migrate_sprites(engine)
+    SQLModel.metadata.create_all(engine)
+    # create_all skips existing tables, so add indexes introduced since
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    with Session(engine) as session:
+        session.merge(SchemaVersion(id=1, version=SCHEMA_VERSION))
+        session.commit()
+
+def schema_is_current(bind: Engine = engine) -> bool:
+    """One primary-key read instead of introspecting every table and index."""
+    return schema_version(bind) == SCHEMA_VERSION
\ No newline at end of file
@@ -0,0 +1,332 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import delete, literal, or_, tuple_
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from sqlmodel import Session, col, select
+from src.models import Pokemon, PokemonDocument, PokemonStat, PokemonType, Sprite, SpriteVariant, Type, UrlPrefix
+from src.serialization import Record, dumps
+
+# PokeAPI order; stats are stored keyed by name so the order must be restored.
+STAT_ORDER = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+EXPECTED_SPRITES = ["front_default", "front_shiny", "back_default", "front_female"]
+
+
+def pokemon_query(identifier: str):
+    """Select one Pokemon by id or name with all relations eager-loaded.
+
+    Types (with their ``Type`` row) and stats are joined into the main
+    statement; they are at most 2 x 6 rows. Sprites can run to dozens of rows
+    so they come from a second ``IN`` select rather than multiplying the join.
+    """
+    query = select(Pokemon).options(
+        joinedload(Pokemon.types).joinedload(PokemonType.type),  # type: ignore [arg-type]
+        joinedload(Pokemon.stats),  # type: ignore [arg-type]
+        selectinload(Pokemon.sprites),  # type: ignore [arg-type]
+    )
+    try:
+        return query.where(Pokemon.id == int(identifier))
+    except ValueError:
+        return query.where(Pokemon.name == identifier.lower())
+
+
+def sprite_query(*conditions):
+    """``(pokemon_id, variant, url)`` rows, with the variant and URL prefix
+    dictionaries joined back in; ``conditions`` filter on those columns."""
+    url = (col(UrlPrefix.prefix) + col(Sprite.path)).label("url")
+    return (
+        select(Sprite.pokemon_id, SpriteVariant.name, url)
+        .join(SpriteVariant, col(SpriteVariant.id) == Sprite.variant_id)
+        .join(UrlPrefix, col(UrlPrefix.id) == Sprite.prefix_id)
+        .where(*conditions)
+    )
+
+
+def get_pokemon(db: Session, identifier: str) -> Optional[Pokemon]:
+    """Load a Pokemon and its types, stats and sprites in two statements."""
+    return db.exec(pokemon_query(identifier)).unique().first()
+
+
+def split_identifiers(identifiers: Sequence[str]) -> Tuple[Set[int], Set[str]]:
+    """Partition raw identifiers into numeric ids and lowercase names."""
+    ids: Set[int] = set()
+    names: Set[str] = set()
+    for identifier in identifiers:
+        try:
+            ids.add(int(identifier))
+        except ValueError:
+            names.add(identifier.strip().lower())
+    return ids, names
+
+
+def get_many(db: Session, identifiers: Sequence[str]) -> List[Optional[Pokemon]]:
+    """Resolve mixed ids/names set-wise, returning matches in request order.
+
+    One ``IN`` select for the Pokemon rows, then one ``IN`` select each for
+    types (joined with ``Type``), stats and sprites, however many are asked
+    for. Unknown identifiers map to ``None``.
+    """
+    ids, names = split_identifiers(identifiers)
+    conditions = []
+    if ids:
+        conditions.append(col(Pokemon.id).in_(ids))
+    if names:
+        conditions.append(col(Pokemon.name).in_(names))
+    if not conditions:
+        return [None] * len(identifiers)
+    query = select(Pokemon).where(or_(*conditions)).options(
+        selectinload(Pokemon.types).joinedload(PokemonType.type),  # type: ignore [arg-type]
+        selectinload(Pokemon.stats),  # type: ignore [arg-type]
+        selectinload(Pokemon.sprites),  # type: ignore [arg-type]
+    )
+    by_id: Dict[int, Pokemon] = {}
+    by_name: Dict[str, Pokemon] = {}
+    for pokemon in db.exec(query).all():
+        by_id[pokemon.id] = pokemon
+        by_name[pokemon.name] = pokemon
+    found: List[Optional[Pokemon]] = []
+    for identifier in identifiers:
+        try:
+            found.append(by_id.get(int(identifier)))
+        except ValueError:
+            found.append(by_name.get(identifier.strip().lower()))
+    return found
+
+
+STAT_OPERATORS = {
+    ">=": lambda col, v: col >= v,
+    "<=": lambda col, v: col <= v,
+    ">": lambda col, v: col > v,
+    "<": lambda col, v: col < v,
+    "=": lambda col, v: col == v,
+}
+SORT_COLUMNS = ["id", "name", "height", "weight"] + STAT_ORDER
+
+
+@dataclass
+class ListQuery:
+    """Filters, sort and keyset position for :func:`list_pokemon`.
+
+    Heights are decimeters and weights hectograms, as stored. ``after`` is
+    the ``(sort value, id)`` of the last row of the previous page.
+    """
+
+    types: List[str] = field(default_factory=list)
+    stat_filters: List[Tuple[str, str, int]] = field(default_factory=list)
+    min_height: Optional[int] = None
+    max_height: Optional[int] = None
+    min_weight: Optional[int] = None
+    max_weight: Optional[int] = None
+    sort: str = "id"
+    descending: bool = False
+    limit: int = 20
+    after: Optional[Tuple[Any, int]] = None
+
+
+def list_pokemon(db: Session, q: ListQuery) -> Tuple[List[Pokemon], Optional[Tuple[Any, int]]]:
+    """One page of Pokemon plus the keyset for the next page (or ``None``).
+
+    Pages are addressed by the last ``(sort value, id)`` seen rather than an
+    OFFSET, so every page is an index range scan no matter how deep. Type and
+    stat filters are ``IN`` subqueries served by the composite indexes on
+    ``pokemontype(type_id, pokemon_id)`` and
+    ``pokemonstat(stat_name, base_stat, pokemon_id)``.
+    """
+    if q.sort not in SORT_COLUMNS:
+        raise ValueError(f"Unknown sort field: {q.sort}")
+    if q.sort in STAT_ORDER:
+        sort_stat = aliased(PokemonStat)
+        sort_col, id_col = col(sort_stat.base_stat), col(sort_stat.pokemon_id)
+        query = select(Pokemon, sort_col).join(
+            sort_stat, (id_col == Pokemon.id) & (col(sort_stat.stat_name) == q.sort)
+        )
+    else:
+        sort_col, id_col = col(getattr(Pokemon, q.sort)), col(Pokemon.id)
+        query = select(Pokemon, sort_col)
+
+    for type_name in q.types:
+        typed = select(PokemonType.pokemon_id).join(Type).where(Type.name == type_name.lower())
+        query = query.where(col(Pokemon.id).in_(typed))
+    for stat_name, op, value in q.stat_filters:
+        matching = select(PokemonStat.pokemon_id).where(
+            PokemonStat.stat_name == stat_name, STAT_OPERATORS[op](PokemonStat.base_stat, value)
+        )
+        query = query.where(col(Pokemon.id).in_(matching))
+    if q.min_height is not None:
+        query = query.where(Pokemon.height >= q.min_height)
+    if q.max_height is not None:
+        query = query.where(Pokemon.height <= q.max_height)
+    if q.min_weight is not None:
+        query = query.where(Pokemon.weight >= q.min_weight)
+    if q.max_weight is not None:
+        query = query.where(Pokemon.weight <= q.max_weight)
+
+    if q.after is not None:
+        key, after = tuple_(sort_col, id_col), tuple_(*(literal(v) for v in q.after))
+        query = query.where(key < after if q.descending else key > after)
+    if q.descending:
+        query = query.order_by(sort_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(sort_col, id_col)
+    query = query.limit(q.limit + 1)
+
+    rows = db.exec(query).all()
+    page = [pokemon for pokemon, _ in rows[: q.limit]]
+    next_key = None
+    if len(rows) > q.limit:
+        last, value = rows[q.limit - 1]
+        next_key = (value, last.id)
+    return page, next_key
+
+
+def to_summaries(db: Session, page: List[Pokemon]) -> List[Record]:
+    """``PokemonSummary`` records: types, stats and the default sprite, set-loaded."""
+    if not page:
+        return []
+    ids = [p.id for p in page]
+    types: Dict[int, List[Record]] = {i: [] for i in ids}
+    stats: Dict[int, List[PokemonStat]] = {i: [] for i in ids}
+    rows = db.exec(
+        select(PokemonType.pokemon_id, PokemonType.slot, Type.name)
+        .join(Type)
+        .where(col(PokemonType.pokemon_id).in_(ids))
+        .order_by(col(PokemonType.pokemon_id), col(PokemonType.slot))
+    ).all()
+    for pokemon_id, slot, name in rows:
+        types[pokemon_id].append({"name": name, "slot": slot})
+    for ps in db.exec(select(PokemonStat).where(col(PokemonStat.pokemon_id).in_(ids))).all():
+        stats[ps.pokemon_id].append(ps)
+    rows = db.exec(sprite_query(col(Sprite.pokemon_id).in_(ids), SpriteVariant.name == "front_default"))
+    sprites = {pokemon_id: url for pokemon_id, _, url in rows.all()}
+    return [
+        {
+            "id": p.id,
+            "name": p.name,
+            "height_m": p.height / 10.0,
+            "weight_kg": p.weight / 10.0,
+            "types": types[p.id],
+            "stats": [
+                {"name": ps.stat_name, "base_stat": ps.base_stat}
+                for ps in sorted(stats[p.id], key=lambda ps: stat_sort_key(ps.stat_name))
+            ],
+            "sprite": sprites.get(p.id),
+        }
+        for p in page
+    ]
+
+
+def stat_sort_key(stat_name: str) -> int:
+    try:
+        return STAT_ORDER.index(stat_name)
+    except ValueError:
+        return len(STAT_ORDER)
+
+
+def build_record(
+    id: int,
+    name: str,
+    height: int,
+    weight: int,
+    types: Iterable[Tuple[str, int]],
+    stats: Iterable[Tuple[str, int]],
+    sprites: Dict[str, str],
+) -> Record:
+    """The one place the ``PokemonResponse`` shape is decided, from stored units.
+
+    ``types`` are ``(name, slot)`` and ``stats`` ``(name, base_stat)`` pairs
+    in any order; sprites are padded with ``None`` for the expected variants.
+    """
+    padded: Dict[str, Optional[str]] = dict(sprites)
+    for variant in EXPECTED_SPRITES:
+        padded.setdefault(variant, None)
+    return {
+        "id": id,
+        "name": name,
+        "height_m": height / 10.0,
+        "weight_kg": weight / 10.0,
+        "types": [{"name": t, "slot": slot} for t, slot in sorted(types, key=lambda t: t[1])],
+        "stats": [{"name": n, "base_stat": b} for n, b in sorted(stats, key=lambda s: stat_sort_key(s[0]))],
+        "sprites": padded,
+    }
+
+
+def to_record(pokemon: Pokemon) -> Record:
+    """Build the API record from an eager-loaded Pokemon."""
+    return build_record(
+        pokemon.id,
+        pokemon.name,
+        pokemon.height,
+        pokemon.weight,
+        [(pt.type.name, pt.slot) for pt in pokemon.types],
+        [(ps.stat_name, ps.base_stat) for ps in pokemon.stats],
+        {s.variant: s.url for s in pokemon.sprites},
+    )
+
+
+def document_for(record: Record) -> PokemonDocument:
+    return PokemonDocument(id=record["id"], name=record["name"], body=dumps(record))
+
+
+def get_document(db: Session, identifier: str) -> Optional[PokemonDocument]:
+    """Serialized response for one Pokemon: a single primary/unique key lookup."""
+    query = select(PokemonDocument)
+    try:
+        query = query.where(PokemonDocument.id == int(identifier))
+    except ValueError:
+        query = query.where(PokemonDocument.name == identifier.lower())
+    return db.exec(query).first()
+
+
+def get_documents(db: Session, identifiers: Sequence[str]) -> List[Optional[bytes]]:
+    """Serialized responses for mixed ids/names in one ``IN`` select, in request order."""
+    ids, names = split_identifiers(identifiers)
+    conditions = []
+    if ids:
+        conditions.append(col(PokemonDocument.id).in_(ids))
+    if names:
+        conditions.append(col(PokemonDocument.name).in_(names))
+    if not conditions:
+        return [None] * len(identifiers)
+    by_id: Dict[int, bytes] = {}
+    by_name: Dict[str, bytes] = {}
+    rows = db.exec(select(PokemonDocument.id, PokemonDocument.name, PokemonDocument.body).where(or_(*conditions)))
+    for doc_id, name, body in rows.all():
+        by_id[doc_id] = body
+        by_name[name] = body
+    found: List[Optional[bytes]] = []
+    for identifier in identifiers:
+        try:
+            found.append(by_id.get(int(identifier)))
+        except ValueError:
+            found.append(by_name.get(identifier.strip().lower()))
+    return found
+
+
+def rebuild_documents(db: Session, chunk_size: int = 500) -> int:
+    """Regenerate every document from the normalized tables; returns the count.
+
+    Runs in the caller's transaction; Pokemon are eager-loaded a chunk at a
+    time so memory stays flat on large dexes.
+    """
+    db.execute(delete(PokemonDocument))
+    count = 0
+    last_id = 0
+    while True:
+        chunk = db.exec(
+            select(Pokemon)
+            .where(col(Pokemon.id) > last_id)
+            .order_by(col(Pokemon.id))
+            .limit(chunk_size)
+            .options(
+                selectinload(Pokemon.types).joinedload(PokemonType.type),  # type: ignore [arg-type]
+                selectinload(Pokemon.stats),  # type: ignore [arg-type]
+                selectinload(Pokemon.sprites),  # type: ignore [arg-type]
+            )
+        ).all()
+        if not chunk:
+            return count
+        for pokemon in chunk:
+            db.add(document_for(to_record(pokemon)))
+        count += len(chunk)
+        last_id = chunk[-1].id
+        db.flush()
+        db.expunge_all()
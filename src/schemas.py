@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Union
 
 class Stat(BaseModel):
     name: str
@@ -22,6 +22,110 @@ class PokemonResponse(BaseModel):
     stats: List[Stat]
     sprites: Dict[str, Optional[str]]
 
+class PokemonSummary(BaseModel):
+    id: int
+    name: str
+    height_m: float
+    weight_kg: float
+    types: List[TypeInfo]
+    stats: List[Stat]
+    sprite: Optional[str]  # front_default
+
+class PokemonListResponse(BaseModel):
+    items: List[PokemonSummary]
+    next_cursor: Optional[str]  # Pass back as ?cursor= for the next page
+
+class NameMatch(BaseModel):
+    id: int
+    name: str
+    match: str  # "prefix" or "fuzzy"
+    distance: int  # Edits between the query and the closest name prefix
+
+class NameSearchResponse(BaseModel):
+    query: str
+    results: List[NameMatch]
+
+class SimilarPokemon(BaseModel):
+    id: int
+    name: str
+    score: float  # Cosine similarity, or euclidean distance in standardized units
+
+class SimilarResponse(BaseModel):
+    id: int
+    name: str
+    metric: str
+    results: List[SimilarPokemon]  # Closest first
+
+class Histogram(BaseModel):
+    edges: List[float]  # len(counts) + 1 bin edges
+    counts: List[int]
+
+class Distribution(BaseModel):
+    mean: float
+    median: float
+    std: float
+    min: int
+    max: int
+    percentiles: Dict[str, float]  # p10, p25, p75, p90
+    histogram: Histogram
+
+class StatRank(BaseModel):
+    id: int
+    name: str
+    total: int  # Sum of the six base stats
+
+class TypeAggregate(BaseModel):
+    count: int
+    mean: Dict[str, float]  # Per stat, plus "total"
+    median: Dict[str, float]
+
+class StatsSummaryResponse(BaseModel):
+    count: int
+    stats: Dict[str, Distribution]  # Per stat, plus "total"
+    types: Dict[str, TypeAggregate]  # Dual-type pokemon count for both types
+    ranking: List[StatRank]  # Highest stat totals
+
+class TypeStatsResponse(BaseModel):
+    name: str
+    count: int
+    stats: Dict[str, Distribution]
+    ranking: List[StatRank]
+
+class TeamRequest(BaseModel):
+    ids: List[Union[int, str]]  # Up to six ids and/or names
+
+class TeamMember(BaseModel):
+    id: int
+    name: str
+    types: List[str]
+
+class TypeMatchup(BaseModel):
+    type: str  # Attacking type
+    weak: int  # Members it hits for more than 1x
+    resist: int  # Members it hits for less than 1x, immune ones included
+    immune: int
+    factors: List[float]  # Per member, in request order
+
+class TeamAnalysisResponse(BaseModel):
+    members: List[TeamMember]
+    defense: List[TypeMatchup]
+    weaknesses: List[str]  # More members weak than resistant, worst first
+    resistances: List[str]  # More members resistant than weak, best first
+    coverage: Dict[str, float]  # Best factor the team's own types deal to each type
+    uncovered: List[str]  # Types no member's type hits super effectively
+
+class BatchRequest(BaseModel):
+    ids: List[Union[int, str]]
+
+class BatchItem(BaseModel):
+    identifier: str
+    pokemon: Optional[PokemonResponse] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItem]  # Same order as the request
+    missing: List[str]
+
 class PokemonData(BaseModel):
     id: int
     name: str
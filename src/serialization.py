@@ -0,0 +1,12 @@
+from typing import Any, Dict
+import orjson
+
+# API records are plain dicts in the exact shape of the response schemas in
+# src/schemas.py. They are encoded once, straight to bytes, instead of being
+# built as Pydantic models and validated again on the way out.
+Record = Dict[str, Any]
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes; the encoding used for documents and API bodies."""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
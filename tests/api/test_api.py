@@ -1,16 +1,43 @@
+import base64
+import json
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
-from src.api.main import app
-from src.models import Pokemon, Type, PokemonType, PokemonStat, Sprite
-from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from src.api.cache import ResponseCache, response_cache
+from src.api.main import app, get_db
+from src.api.search import NameIndex, search_index
+from src.api.analytics import analytics_index, group_percentiles
+from src.api.similar import StatMatrix, similarity_index
+from src.api.teams import TypeChart, team_index
+from src.models import Pokemon, PokemonDocument, Type, PokemonType, PokemonStat, Sprite, bump_generation, split_url
+from src.repository import rebuild_documents
+from sqlmodel import SQLModel, create_engine, select, Session
 
 @pytest.fixture
 def test_client():
     return TestClient(app)
 
+def add_sprites(session, pokemon_id, sprites):
+    """Store ``{variant: url}`` through the ETL's variant and URL prefix dictionaries."""
+    from src.etl.writer import BulkWriter
+    writer = BulkWriter()
+    for variant, url in sprites.items():
+        prefix, path = split_url(url)
+        session.add(Sprite(
+            pokemon_id=pokemon_id,
+            variant_id=writer.resolve_variants(session, [variant])[variant],
+            prefix_id=writer.resolve_prefixes(session, [prefix])[prefix],
+            path=path,
+        ))
+
 @pytest.fixture
 def test_db():
-    engine_test = create_engine("sqlite:///:memory:")
+    # One shared in-memory connection, so the app's threadpool sees the data
+    engine_test = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
     SQLModel.metadata.create_all(engine_test)
     with Session(engine_test) as session:
         # Insert test data for Bulbasaur
@@ -41,18 +68,41 @@ def test_db():
         for stat in stats:
             session.add(stat)
         
-        sprites = [
-            Sprite(pokemon_id=1, variant="front_default", url="https://default.png"),
-            Sprite(pokemon_id=1, variant="front_shiny", url="https://shiny.png"),
-            # No front_female
-        ]
-        for sprite in sprites:
-            session.add(sprite)
+        # No front_female
+        add_sprites(session, 1, {"front_default": "https://default.png", "front_shiny": "https://shiny.png"})
         
+        # As the ETL would leave it: normalized rows plus read-model documents
+        rebuild_documents(session)
         session.commit()
+
+        def override_get_db():
+            with Session(engine_test) as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        response_cache.reset()
+        search_index.reset()
+        similarity_index.reset()
+        analytics_index.reset()
+        team_index.reset()
         yield session
+        app.dependency_overrides.clear()
     SQLModel.metadata.drop_all(engine_test)
 
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
 def test_get_pokemon(test_client, test_db):
     response = test_client.get("/pokemon/1")
     data = response.json()
@@ -109,4 +159,756 @@ def test_post_search(test_client, test_db):
     data = response.json()
     assert response.status_code == 200
     assert data["id"] == 1
-    assert len(data["types"]) == 2
\ No newline at end of file
+    assert len(data["types"]) == 2
+
+def test_get_pokemon_by_name_query_count(test_client, test_db):
+    with count_queries(test_db.get_bind()) as statements:
+        response = test_client.get("/pokemon/Bulbasaur")
+    assert response.status_code == 200
+    assert [t["name"] for t in response.json()["types"]] == ["grass", "poison"]
+    # Generation check, then one unique-key lookup of the precomputed document
+    assert len(statements) == 2
+
+
+def test_get_pokemon_without_documents_query_count(test_client, test_db):
+    test_db.exec(PokemonDocument.__table__.delete())
+    test_db.commit()
+    with count_queries(test_db.get_bind()) as statements:
+        response = test_client.get("/pokemon/bulbasaur")
+    assert response.status_code == 200
+    assert response.json()["stats"][0] == {"name": "hp", "base_stat": 45}
+    # Generation check, document miss, then Pokemon + types + stats joined and sprites via one IN select
+    assert len(statements) == 4
+
+
+def test_post_search_query_count(test_client, test_db):
+    with count_queries(test_db.get_bind()) as statements:
+        response = test_client.post("/pokemon", data={"identifier": "bulbasaur"})
+    assert response.status_code == 200
+    assert len(statements) == 2
+    assert response.json() == test_client.get("/pokemon/1").json()
+
+
+def test_cache_shares_id_and_name_entries(test_client, test_db):
+    test_client.get("/pokemon/1")
+    with count_queries(test_db.get_bind()) as statements:
+        by_name = test_client.get("/pokemon/BULBASAUR")
+        sprite = test_client.get("/pokemon/1/sprites/front_shiny")
+        sprite_again = test_client.get("/pokemon/1/sprites/front_shiny")
+    assert by_name.json()["id"] == 1
+    assert sprite.json() == sprite_again.json() == {"url": "https://shiny.png", "available": True}
+    assert len(statements) == 1  # only the sprite row
+    stats = test_client.get("/cache/stats").json()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["size"] == 2
+
+
+def test_cache_invalidated_by_generation_bump(test_client, test_db, monkeypatch):
+    monkeypatch.setattr(response_cache.tracker, "check_interval", 0)
+    assert test_client.get("/pokemon/1").json()["name"] == "bulbasaur"
+    pokemon = test_db.get(Pokemon, 1)
+    pokemon.name = "ivysaur-ish"
+    rebuild_documents(test_db)
+    bump_generation(test_db)
+    test_db.commit()
+    assert test_client.get("/pokemon/1").json()["name"] == "ivysaur-ish"
+    assert response_cache.stats()["invalidations"] == 1
+
+
+def test_response_cache_lru_and_ttl(monkeypatch):
+    cache = ResponseCache(maxsize=2, ttl=10)
+    cache.put(("pokemon", 1), b"1", aliases=[("pokemon", "bulbasaur")])
+    cache.put(("pokemon", 2), b"2")
+    assert cache.get(("pokemon", "bulbasaur")) == b"1"  # 1 is now most recent
+    cache.put(("pokemon", 3), b"3")
+    assert cache.get(("pokemon", 2)) is None
+    assert cache.stats()["evictions"] == 1
+    now = __import__("time").monotonic()
+    monkeypatch.setattr("src.api.cache.time.monotonic", lambda: now + 60)
+    assert cache.get(("pokemon", 1)) is None
+    assert cache.get(("pokemon", "bulbasaur")) is None
+
+
+def test_batch_lookup_preserves_order_and_reports_missing(test_client, test_db):
+    with count_queries(test_db.get_bind()) as statements:
+        response = test_client.get("/pokemon", params={"ids": "999,bulbasaur, 1,missingno"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["identifier"] for r in data["results"]] == ["999", "bulbasaur", "1", "missingno"]
+    assert data["results"][0]["pokemon"] is None
+    assert data["results"][0]["error"] == "Pokemon not found"
+    assert data["results"][1]["pokemon"] == data["results"][2]["pokemon"]
+    assert data["results"][1]["pokemon"]["stats"][0]["name"] == "hp"
+    assert data["missing"] == ["999", "missingno"]
+    # One IN select over documents, one over pokemon for the unresolved two
+    assert len(statements) == 2
+
+
+def test_post_batch(test_client, test_db):
+    response = test_client.post("/pokemon/batch", json={"ids": [1, "Bulbasaur"]})
+    assert response.status_code == 200
+    assert [r["pokemon"]["id"] for r in response.json()["results"]] == [1, 1]
+    too_many = test_client.post("/pokemon/batch", json={"ids": list(range(51))})
+    assert too_many.status_code == 400
+
+
+def seed_dex(session, count=30):
+    """Add synthetic pokemon 2..count+1 on top of the bulbasaur fixture."""
+    fire = Type(id=10, name="fire")
+    session.add(fire)
+    for i in range(2, count + 2):
+        session.add(Pokemon(id=i, name=f"mon-{i:03d}", height=i % 7 + 1, weight=i * 10))
+        session.add(PokemonType(pokemon_id=i, type_id=10 if i % 2 else 12, slot=1))
+        for n, stat_name in enumerate(["hp", "attack", "defense", "special-attack", "special-defense", "speed"]):
+            session.add(PokemonStat(pokemon_id=i, stat_name=stat_name, base_stat=(i * 7 + n * 13) % 150))
+        add_sprites(session, i, {"front_default": f"https://{i}.png"})
+    session.commit()
+
+
+def test_list_pokemon_keyset_pages(test_client, test_db):
+    seed_dex(test_db)
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        data = test_client.get("/pokemon/list", params=params).json()
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(range(1, 32))
+    first = test_client.get("/pokemon/list", params={"limit": 1}).json()["items"][0]
+    assert first["types"] == [{"name": "grass", "slot": 1}, {"name": "poison", "slot": 2}]
+    assert first["stats"][0] == {"name": "hp", "base_stat": 45}
+    assert first["sprite"] == "https://default.png"
+
+
+def test_list_pokemon_filters_and_stat_sort(test_client, test_db):
+    seed_dex(test_db)
+    params = {"type": "fire", "stat": ["speed>=60", "hp<140"], "min_weight": 5, "sort": "speed", "order": "desc", "limit": 4}
+    items = []
+    cursor = None
+    while True:
+        data = test_client.get("/pokemon/list", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        items.extend(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    expected = sorted(
+        (i for i in range(2, 32) if i % 2 and (i * 7 + 65) % 150 >= 60 and (i * 7) % 150 < 140 and i * 10 >= 50),
+        key=lambda i: ((i * 7 + 65) % 150, i),
+        reverse=True,
+    )
+    assert [item["id"] for item in items] == expected
+    assert all(item["types"][0]["name"] == "fire" for item in items)
+    speeds = [item["stats"][5]["base_stat"] for item in items]
+    assert speeds == sorted(speeds, reverse=True)
+
+
+def test_list_pokemon_rejects_bad_input(test_client, test_db):
+    assert test_client.get("/pokemon/list", params={"stat": "luck>=3"}).status_code == 400
+    assert test_client.get("/pokemon/list", params={"sort": "color"}).status_code == 400
+    assert test_client.get("/pokemon/list", params={"cursor": "!!"}).status_code == 400
+    cursor = test_client.get("/pokemon/list", params={"limit": 1}).json()["next_cursor"]
+    assert cursor is None  # only bulbasaur in the fixture
+
+
+def test_list_pokemon_fractional_bounds(test_client, test_db):
+    seed_dex(test_db)
+    height = {1: 7, **{i: i % 7 + 1 for i in range(2, 32)}}  # decimetres
+
+    def ids(**params):
+        items = test_client.get("/pokemon/list", params={"limit": 100, **params}).json()["items"]
+        return [item["id"] for item in items]
+
+    assert ids(min_height=0.65) == [i for i in height if height[i] >= 7]  # 0.6 m is below the bound
+    assert ids(max_height=0.65) == [i for i in height if height[i] <= 6]
+    assert ids(min_height=0.7, max_height=0.7) == [i for i in height if height[i] == 7]
+    assert ids(min_height=0.61, max_height=0.69) == []
+
+
+@pytest.mark.parametrize(
+    "sort,cursor",
+    [
+        ("id", "NQ"),  # decodes to the JSON number 5
+        ("id", "x"),  # not valid base64
+        ("id", ["id", False, [1], 1]),
+        ("id", ["id", False, {"a": 1}, 1]),
+        ("id", ["id", False, 1, "1"]),
+        ("id", ["id", False, True, 1]),
+        ("id", ["id", False, 1]),
+        ("name", ["name", False, 1, 1]),
+        ("speed", ["speed", False, "fast", 1]),
+    ],
+)
+def test_list_pokemon_rejects_malformed_cursor(test_client, test_db, sort, cursor):
+    if not isinstance(cursor, str):
+        cursor = base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode().rstrip("=")
+    response = test_client.get("/pokemon/list", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_name_index_prefix_and_fuzzy():
+    index = NameIndex([(1, "bulbasaur"), (2, "ivysaur"), (25, "pikachu"), (26, "raichu"), (172, "pichu")])
+    assert [r["name"] for r in index.search("pi")] == ["pichu", "pikachu"]
+    assert index.search("bulbsa") == [{"id": 1, "name": "bulbasaur", "match": "fuzzy", "distance": 1}]
+    assert [r["name"] for r in index.search("pikahcu")] == ["pikachu"]
+    assert index.search("zzz") == []
+    assert index.search("  ") == []
+
+
+def test_search_endpoint_refreshes_after_etl_write(test_client, test_db, monkeypatch):
+    monkeypatch.setattr(search_index.tracker, "check_interval", 0)
+    data = test_client.get("/pokemon/search", params={"q": "Bulb"}).json()
+    assert data["results"] == [{"id": 1, "name": "bulbasaur", "match": "prefix", "distance": 0}]
+    assert test_client.get("/pokemon/search", params={"q": "bulbsaur"}).json()["results"][0]["match"] == "fuzzy"
+    test_db.add(Pokemon(id=2, name="bulbasaur-clone", height=7, weight=69))
+    bump_generation(test_db)
+    test_db.commit()
+    names = [r["name"] for r in test_client.get("/pokemon/search", params={"q": "bulb"}).json()["results"]]
+    assert names == ["bulbasaur", "bulbasaur-clone"]
+
+
+def test_batch_falls_back_to_normalized_tables(test_client, test_db):
+    test_db.exec(PokemonDocument.__table__.delete())
+    test_db.commit()
+    with count_queries(test_db.get_bind()) as statements:
+        data = test_client.get("/pokemon", params={"ids": "1,bulbasaur"}).json()
+    assert data["missing"] == []
+    assert data["results"][0]["pokemon"] == data["results"][1]["pokemon"]
+    # documents, then pokemon, types (+type), stats, sprites: one IN select each
+    assert len(statements) == 5
+
+
+@pytest.fixture
+def async_mode(tmp_path):
+    """Serve a file database of pokemon 2-6 through AsyncSession, as POKEDEX_DB_ASYNC=1 does."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from src.api.db import AsyncDatabase, get_async_database, get_database
+    from src.database import async_url
+
+    url = f"sqlite:///{tmp_path / 'dex.db'}"
+    sync_engine = create_engine(url)
+    SQLModel.metadata.create_all(sync_engine)
+    with Session(sync_engine) as session:
+        session.add(Type(id=12, name="grass"))
+        seed_dex(session, count=5)
+        rebuild_documents(session)
+        session.commit()
+    sync_engine.dispose()
+    # TestClient may run each request on a fresh event loop: don't pool connections
+    async_engine = create_async_engine(async_url(url), poolclass=NullPool)
+
+    async def override_get_database():
+        async with AsyncSession(async_engine) as session:
+            yield AsyncDatabase(session)
+
+    indexes = (response_cache, search_index, similarity_index, analytics_index, team_index)
+    app.dependency_overrides[get_database] = override_get_database
+    app.dependency_overrides[get_async_database] = override_get_database
+    for index in indexes:
+        index.reset()
+    yield async_engine
+    app.dependency_overrides.clear()
+    for index in indexes:
+        index.reset()
+
+
+def test_async_database_mode(test_client, async_mode):
+    assert test_client.get("/pokemon/3").json()["name"] == "mon-003"
+    assert test_client.post("/pokemon", data={"identifier": "mon-004"}).json()["id"] == 4
+    assert test_client.get("/pokemon/99").status_code == 404
+    assert test_client.get("/pokemon", params={"ids": "2,99"}).json()["missing"] == ["99"]
+    assert [i["id"] for i in test_client.get("/pokemon/list", params={"limit": 2}).json()["items"]] == [2, 3]
+    assert test_client.get("/pokemon/search", params={"q": "mon-00"}).json()["results"][0]["name"] == "mon-002"
+    assert test_client.get("/pokemon/2/sprites/front_default").json()["url"] == "https://2.png"
+
+
+def test_async_mode_concurrent_index_syncs(async_mode):
+    """Cold in-memory indexes built by concurrent requests on one event loop.
+
+    Index syncs run on the loop in async mode and yield at every query, so
+    holding a thread lock across the build would block the loop for good.
+    """
+    import asyncio
+    import threading
+    import httpx
+
+    requests = [
+        ("GET", "/pokemon/search", {"params": {"q": "mon"}}),
+        ("GET", "/pokemon/2/similar", {}),
+        ("GET", "/stats/summary", {}),
+        ("GET", "/types/fire/stats", {}),
+        ("POST", "/teams/analyze", {"json": {"ids": [2]}}),
+    ]
+    statuses = []
+
+    async def run():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            responses = await asyncio.gather(
+                *(client.request(method, url, **kwargs) for _ in range(4) for method, url, kwargs in requests)
+            )
+        statuses.extend(r.status_code for r in responses)
+
+    # On its own thread: a blocked event loop could not even time itself out
+    worker = threading.Thread(target=asyncio.run, args=(run(),), daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+    assert not worker.is_alive(), "event loop stalled"
+    assert statuses == [200, 200, 200, 200, 503] * 4  # no type chart loaded
+
+
+def test_async_url_and_pool_options():
+    from sqlalchemy.pool import QueuePool
+    from src.database import POOL_SIZE, async_url, pool_options
+
+    assert async_url("sqlite:///pokedex.db") == "sqlite+aiosqlite:///pokedex.db"
+    assert async_url("postgresql://u:p@db/dex") == "postgresql+asyncpg://u:p@db/dex"
+    assert async_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    assert pool_options("sqlite://") == {}
+    options = pool_options("sqlite:///pokedex.db")
+    assert options["poolclass"] is QueuePool and options["pool_size"] == POOL_SIZE
+
+
+def test_engine_factory_pragmas_and_readonly(tmp_path):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from src.database import make_engine, sqlite_open_url
+
+    url = f"sqlite:///{tmp_path / 'dex.db'}"
+    assert sqlite_open_url(url, readonly=True) == f"sqlite:///file:{tmp_path / 'dex.db'}?mode=ro&uri=true"
+    writer = make_engine(url)
+    SQLModel.metadata.create_all(writer)
+    with writer.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+    reader = make_engine(url, readonly=True)
+    with Session(reader) as api, Session(writer) as etl:
+        # An API read transaction is open while the ETL commits: WAL lets both proceed
+        assert api.exec(select(Pokemon)).all() == []
+        etl.add(Pokemon(id=25, name="pikachu", height=4, weight=60))
+        etl.commit()
+        api.rollback()
+        assert api.get(Pokemon, 25).name == "pikachu"
+        api.add(Pokemon(id=26, name="raichu", height=8, weight=300))
+        with pytest.raises(OperationalError, match="readonly"):
+            api.commit()
+    writer.dispose()
+    reader.dispose()
+
+
+def test_etag_revalidation_skips_database(test_client, test_db):
+    first = test_client.get("/pokemon/1")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"].startswith("public, max-age=")
+    assert test_client.post("/pokemon", data={"identifier": "1"}).headers["etag"] == etag
+    with count_queries(test_db.get_bind()) as statements:
+        revalidated = test_client.get("/pokemon/1", headers={"If-None-Match": f'W/{etag}, "other"'})
+        sprite = test_client.get("/pokemon/1/sprites/front_shiny")
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert len(statements) == 1  # only the sprite miss
+    sprite_etag = sprite.headers["etag"]
+    assert sprite_etag != etag
+    assert test_client.get("/pokemon/1/sprites/front_shiny", headers={"If-None-Match": sprite_etag}).status_code == 304
+    # Names and ids are different resources; a stale tag gets the full body
+    assert test_client.get("/pokemon/bulbasaur", headers={"If-None-Match": etag}).status_code == 200
+    assert test_client.get("/pokemon/404", headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_etag_changes_after_etl_write(test_client, test_db, monkeypatch):
+    monkeypatch.setattr(response_cache.tracker, "check_interval", 0)
+    etag = test_client.get("/pokemon/1").headers["etag"]
+    assert test_client.get("/pokemon/1", headers={"If-None-Match": etag}).status_code == 304
+    bump_generation(test_db)
+    test_db.commit()
+    fresh = test_client.get("/pokemon/1", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    # Generation re-read on every request here, nothing cached: a revalidation
+    # costs that one read and never the document query
+    response_cache.reset()
+    with count_queries(test_db.get_bind()) as statements:
+        assert test_client.get("/pokemon/1", headers={"If-None-Match": fresh.headers["etag"]}).status_code == 304
+    assert len(statements) == 1 and "dataversion" in statements[0]
+
+
+def test_metrics_count_queries_per_route(test_client, test_db, monkeypatch):
+    from src.api import metrics as metrics_module
+    metrics_module.metrics.reset()
+    response_cache.reset()
+    with count_queries(test_db.get_bind()) as statements:
+        response = test_client.get("/pokemon/1")
+    timing = response.headers["server-timing"]
+    assert f'desc="{len(statements)} queries"' in timing and "app;dur=" in timing
+    # Threaded handlers see the request's stats through the copied context
+    route = metrics_module.metrics.routes[("GET", "/pokemon/{identifier}")]
+    assert route.statements.sum == len(statements) > 0
+    assert route.size.sum == len(response.content)
+    test_client.get("/nope")
+    body = test_client.get("/metrics").text
+    assert 'pokedex_http_requests_total{method="GET",route="/pokemon/{identifier}",status="200"} 1' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'pokedex_http_request_duration_seconds_bucket{method="GET",route="/pokemon/{identifier}",le="+Inf"} 1' in body
+    assert "# TYPE pokedex_db_statements_per_request histogram" in body
+
+
+def test_metrics_logs_requests_over_query_threshold(test_db, monkeypatch, caplog):
+    from src.api.metrics import Metrics, MetricsMiddleware
+    monkeypatch.setattr(response_cache, "maxsize", 0)
+    registry = Metrics()
+    client = TestClient(MetricsMiddleware(app, registry=registry, query_log_threshold=1))
+    with caplog.at_level("WARNING", logger="pokedex.metrics"):
+        client.get("/pokemon/1/sprites/front_shiny")
+    assert "GET /pokemon/1/sprites/front_shiny ran" in caplog.text
+    assert "SELECT" in caplog.text
+    assert sum(m.latency.count for m in registry.routes.values()) == 1
+
+
+def test_stat_matrix_top_k():
+    import numpy as np
+    # hp, attack, defense, sp. attack, sp. defense, speed, height, weight
+    raw = np.array([
+        [100, 100, 100, 10, 10, 10, 10, 100],
+        [90, 95, 110, 12, 9, 11, 11, 110],  # same build as 1, a bit off
+        [10, 10, 10, 100, 100, 100, 10, 100],  # the opposite build
+        [200, 200, 200, 20, 20, 20, 10, 100],  # 1 scaled up
+    ])
+    matrix = StatMatrix([1, 2, 3, 4], ["a", "b", "c", "d"], raw)
+    assert matrix.matrix.flags["C_CONTIGUOUS"] and matrix.matrix.dtype == np.float32
+    cosine = matrix.similar(matrix.row("1"), k=3)
+    assert [r[0] for r in cosine] == [4, 2, 3]  # never itself; the opposite build last
+    assert cosine[0][2] > cosine[1][2] > cosine[2][2]
+    euclidean = matrix.similar(matrix.row("A"), k=3, metric="euclidean")
+    assert euclidean[-1][0] == 3 and euclidean[0][2] < euclidean[1][2] < euclidean[2][2]
+    assert [r[0] for r in matrix.similar(matrix.row("a"), k=1)] == [4]
+    assert len(matrix.similar(0, k=10)) == 3
+    assert matrix.row("zzz") is None and matrix.row("99") is None
+
+
+def test_similar_endpoint(test_client, test_db):
+    seed_dex(test_db)
+    response = test_client.get("/pokemon/bulbasaur/similar", params={"k": 5})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == 1 and data["metric"] == "cosine"
+    assert len(data["results"]) == 5 and all(r["id"] != 1 for r in data["results"])
+    scores = [r["score"] for r in data["results"]]
+    assert scores == sorted(scores, reverse=True)
+    distances = [r["score"] for r in test_client.get("/pokemon/2/similar?metric=euclidean").json()["results"]]
+    assert distances == sorted(distances) and len(distances) == 10
+    assert test_client.get("/pokemon/1/similar?metric=manhattan").status_code == 400
+    assert test_client.get("/pokemon/1/similar?k=0").status_code == 422
+    assert test_client.get("/pokemon/missingno/similar").status_code == 404
+
+
+def test_group_percentiles_match_numpy():
+    import numpy as np
+    rng = np.random.default_rng(0)
+    groups = rng.integers(0, 5, 500)
+    groups[groups == 3] = 4  # group 3 stays empty
+    values = rng.integers(1, 255, 500)
+    result = group_percentiles(groups, values, 5, (10, 50, 90))
+    for g in (0, 1, 2, 4):
+        assert np.allclose(result[g], np.percentile(values[groups == g], (10, 50, 90)))
+    assert np.isnan(result[3]).all()
+
+
+def test_stats_summary_and_type_stats(test_client, test_db, monkeypatch):
+    monkeypatch.setattr(analytics_index.tracker, "check_interval", 0)
+    seed_dex(test_db, count=9)
+    summary = test_client.get("/stats/summary").json()
+    assert summary["count"] == 10
+    hp = [45] + [(i * 7) % 150 for i in range(2, 11)]
+    assert summary["stats"]["hp"]["mean"] == round(sum(hp) / len(hp), 2)
+    assert summary["stats"]["hp"]["max"] == max(hp)
+    assert sum(summary["stats"]["total"]["histogram"]["counts"]) == 10
+    assert summary["types"]["grass"]["count"] == 6  # bulbasaur and the even ids
+    assert summary["types"]["poison"]["count"] == 1
+    assert summary["types"]["poison"]["median"]["total"] == 318
+    totals = [r["total"] for r in summary["ranking"]]
+    assert totals == sorted(totals, reverse=True)
+
+    fire = test_client.get("/types/Fire/stats").json()
+    assert fire["count"] == 4 and {r["id"] for r in fire["ranking"]} == {3, 5, 7, 9}
+    speeds = sorted((i * 7 + 65) % 150 for i in (3, 5, 7, 9))
+    assert fire["stats"]["speed"]["median"] == (speeds[1] + speeds[2]) / 2
+    assert test_client.get("/types/shadow/stats").status_code == 404
+
+    # Cached until the next ETL write
+    test_db.add(Pokemon(id=99, name="newcomer", height=1, weight=1))
+    test_db.commit()
+    assert test_client.get("/stats/summary").json()["count"] == 10
+    bump_generation(test_db)
+    test_db.commit()
+    assert test_client.get("/stats/summary").json()["count"] == 11
+
+
+def test_export_formats_stream_whole_dex(test_client, test_db):
+    import csv
+    import gzip
+    import io
+    import json
+    seed_dex(test_db, count=11)
+    response = test_client.get("/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["id"] for r in records] == list(range(1, 13))
+    assert records[0] == test_client.get("/pokemon/1").json()
+    assert records[5] == test_client.get("/pokemon/6").json()
+
+    compressed = test_client.get("/export?format=csv&gzip=true")
+    assert compressed.headers["content-disposition"] == 'attachment; filename="pokedex.csv.gz"'
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(compressed.content).decode())))
+    assert len(rows) == 12
+    assert rows[0]["type_1"] == "grass" and rows[0]["type_2"] == "poison" and rows[0]["speed"] == "45"
+    assert rows[0]["sprite_front_shiny"] == "https://shiny.png" and rows[0]["sprite_back_default"] == ""
+
+    assert test_client.get("/export?format=parquet").status_code == 400
+
+
+def test_export_reads_in_chunks(test_db):
+    import json
+    from src.export import export
+    seed_dex(test_db, count=11)
+    with count_queries(test_db.get_bind()) as statements:
+        batches = [json.loads(line) for line in b"".join(export(test_db, "columnar", chunk_size=5)).splitlines()]
+    assert [b["rows"] for b in batches] == [5, 5, 2]
+    assert len(statements) == 4 * 3 + 1  # four queries per chunk, then the empty page
+    assert batches[0]["columns"]["hp"][0] == 45 and batches[2]["columns"]["id"] == [11, 12]
+    assert batches[0]["columns"]["type_2"][1] is None
+
+
+def test_sprite_image_served_from_local_store(test_client, test_db, tmp_path, monkeypatch):
+    from src.api import main as api_main
+    from src.etl.sprites import SpriteStore
+    store = SpriteStore(tmp_path)
+    image = b"\x89PNG\r\n\x1a\n" + bytes(range(200))
+    store.store("https://shiny.png", image, "image/png")
+    monkeypatch.setattr(api_main, "sprite_store", store)
+
+    response = test_client.get("/pokemon/1/sprites/front_shiny/image")
+    assert response.status_code == 200 and response.content == image
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["cache-control"].endswith("immutable")
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+    assert test_client.get("/pokemon/1/sprites/front_shiny/image", headers={"If-None-Match": etag}).status_code == 304
+
+    partial = test_client.get("/pokemon/1/sprites/front_shiny/image", headers={"Range": "bytes=2-5"})
+    assert partial.status_code == 206 and partial.content == image[2:6]
+    assert partial.headers["content-range"] == f"bytes 2-5/{len(image)}"
+    tail = test_client.get("/pokemon/1/sprites/front_shiny/image", headers={"Range": "bytes=-10"})
+    assert tail.content == image[-10:]
+    stale = test_client.get("/pokemon/1/sprites/front_shiny/image", headers={"Range": "bytes=2-5", "If-Range": '"old"'})
+    assert stale.status_code == 200 and stale.content == image
+    backwards = test_client.get("/pokemon/1/sprites/front_shiny/image", headers={"Range": "bytes=5-2"})
+    assert backwards.status_code == 200 and backwards.content == image
+    unsatisfiable = test_client.get("/pokemon/1/sprites/front_shiny/image", headers={"Range": "bytes=999-"})
+    assert unsatisfiable.status_code == 416 and unsatisfiable.headers["content-range"] == f"bytes */{len(image)}"
+
+    # Not downloaded: send the browser upstream
+    upstream = test_client.get("/pokemon/1/sprites/front_default/image", follow_redirects=False)
+    assert upstream.status_code == 307 and upstream.headers["location"] == "https://default.png"
+    assert test_client.get("/pokemon/1/sprites/front_female/image").status_code == 404
+
+
+def test_parse_range():
+    from src.api.files import RangeNotSatisfiable, parse_range
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-", 100) == (0, 99)
+    assert parse_range("bytes=90-200", 100) == (90, 99)
+    assert parse_range("bytes=-500", 100) == (0, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None  # multiple ranges: full body
+    assert parse_range("items=0-1", 100) is None
+    assert parse_range("bytes=5-4", 100) is None  # invalid: ignored, not 416
+    for header in ("bytes=100-", "bytes=150-160", "bytes=-0"):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range(header, 100)
+
+
+def test_negotiate_content_coding():
+    from src.api.compression import negotiate
+    assert negotiate(None) is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip, deflate", ("br", "gzip")) == "gzip"
+    assert negotiate("gzip, br", ("br", "gzip")) == "br"
+    assert negotiate("br;q=0.5, gzip;q=0.8", ("br", "gzip")) == "gzip"
+    assert negotiate("*;q=0.1, gzip;q=0", ("br", "gzip")) == "br"
+    assert negotiate("gzip;q=0", ("gzip",)) is None
+
+
+def test_compression_sends_held_start_before_zerocopysend(tmp_path):
+    import asyncio
+    from src.api.compression import CompressionMiddleware
+    from src.api.files import RangeFileResponse
+    path = tmp_path / "dex.json"
+    path.write_bytes(b"[]" * 2000)
+    middleware = CompressionMiddleware(RangeFileResponse(path, "application/json"))
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "headers": [(b"accept-encoding", b"gzip")],
+        "extensions": {"http.response.zerocopysend": {}},
+    }
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, None, send))
+    assert [m["type"] for m in sent] == ["http.response.start", "http.response.zerocopysend"]
+    assert (b"content-length", b"4000") in sent[0]["headers"]
+    assert not any(name == b"content-encoding" for name, _ in sent[0]["headers"])
+
+
+def test_large_responses_compressed_and_schema_shaped(test_client, test_db):
+    import gzip
+    import zlib
+    from src.schemas import PokemonListResponse
+    seed_dex(test_db)
+    headers = {"Accept-Encoding": "gzip"}
+
+    page = test_client.get("/pokemon/list", params={"limit": 30}, headers=headers)
+    assert page.headers["content-encoding"] == "gzip" and page.headers["vary"] == "Accept-Encoding"
+    # Built as dicts and not re-validated, but still exactly the documented shape
+    assert PokemonListResponse.model_validate(page.json()).model_dump(mode="json") == page.json()
+
+    small = test_client.get("/pokemon/1", headers=headers)
+    assert "content-encoding" not in small.headers and not small.headers["etag"].startswith("W/")
+    batch = test_client.get("/pokemon", params={"ids": ",".join(map(str, range(1, 21)))}, headers=headers)
+    assert batch.headers["content-encoding"] == "gzip" and len(batch.json()["results"]) == 20
+    plain = test_client.get("/pokemon/list", params={"limit": 30}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.headers["vary"] == "Accept-Encoding"
+    assert plain.json() == page.json()
+
+    with test_client.stream("GET", "/export", headers=headers) as stream:
+        assert stream.headers["content-encoding"] == "gzip"
+        body = b"".join(stream.iter_raw())
+    assert gzip.decompress(body).count(b"\n") == 31
+    # Already gzipped by request: passed through untouched
+    exported = test_client.get("/export?gzip=true", headers=headers)
+    assert "content-encoding" not in exported.headers
+    assert zlib.decompress(exported.content, 31) == gzip.decompress(body)
+
+
+def test_schema_version_check(tmp_path, monkeypatch):
+    from src import models
+    from src.database import make_engine
+    engine = make_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    assert models.schema_version(engine) is None and not models.schema_is_current(engine)
+    monkeypatch.setattr(models, "engine", engine)
+    models.create_db_and_tables()
+    assert models.schema_is_current(engine)
+    monkeypatch.setattr(models, "SCHEMA_VERSION", "models-changed")
+    assert not models.schema_is_current(engine)
+    engine.dispose()
+
+
+def test_readonly_api_refuses_outdated_schema(monkeypatch):
+    from src.api import main as api_main
+    monkeypatch.setattr(api_main, "READONLY", True)
+    monkeypatch.setattr(api_main, "_prepared", False)
+    monkeypatch.setattr(api_main, "schema_is_current", lambda bind: False)
+    with pytest.raises(api_main.SchemaError, match="POKEDEX_DB_READONLY"):
+        api_main.prepare()
+
+
+def test_serve_backs_off_and_gives_up_on_crashing_workers(monkeypatch):
+    import os
+    import signal
+    import typer
+    from src.api import serve
+
+    def failing_worker(config, sock):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(serve, "run_worker", failing_worker)
+    _, status = os.waitpid(serve.fork_worker(None, None), 0)
+    assert os.waitstatus_to_exitcode(status) == 1
+    monkeypatch.setattr(serve, "run_worker", lambda config, sock: False)  # app failed to start
+    _, status = os.waitpid(serve.fork_worker(None, None), 0)
+    assert os.waitstatus_to_exitcode(status) == 3
+
+    assert [serve.restart_delay(n) for n in range(4)] == [0.0, 0.5, 1.0, 2.0]
+    assert serve.restart_delay(20) == serve.MAX_RESTART_DELAY
+
+    forks = []
+
+    def crashing_fork(config, sock):
+        pid = os.fork()
+        if pid == 0:
+            os._exit(1)
+        forks.append(pid)
+        return pid
+
+    monkeypatch.setattr(serve, "prepare", lambda: None)
+    monkeypatch.setattr(serve, "fork_worker", crashing_fork)
+    monkeypatch.setattr(serve, "RESTART_DELAY", 0.01)
+    handlers = signal.getsignal(signal.SIGINT), signal.getsignal(signal.SIGTERM)
+    try:
+        with pytest.raises(typer.Exit) as exited:
+            serve.serve("127.0.0.1", 0, workers=2)
+    finally:
+        signal.signal(signal.SIGINT, handlers[0])
+        signal.signal(signal.SIGTERM, handlers[1])
+    assert exited.value.exit_code == 1
+    # Each worker is forked once plus once per crash but the last
+    assert 2 * serve.MAX_CRASHES - 1 <= len(forks) <= 2 * serve.MAX_CRASHES
+
+
+def test_warm_up_preloads_hot_data(test_client, test_db):
+    from src.api.warmup import warm_up
+    timings = warm_up(test_db)
+    assert set(timings) == {"similarity", "analytics", "search", "teams", "documents"}
+    assert len(similarity_index.current) == 1 and analytics_index.current.names == ["bulbasaur"]
+    assert response_cache.get(("pokemon", "bulbasaur")) is not None
+    with count_queries(test_db.get_bind()) as statements:
+        assert test_client.get("/pokemon/bulbasaur").json()["id"] == 1
+        assert test_client.get("/pokemon/search", params={"q": "bulb"}).json()["results"][0]["id"] == 1
+    assert all("dataversion" in s for s in statements)  # at most generation checks
+
+
+def test_type_chart_analyze():
+    from src.etl.type_chart import TYPE_NAMES, load_bundled
+    chart_rows = load_bundled()
+    attack = [[chart_rows[a].get(d, 1.0) for d in TYPE_NAMES] for a in TYPE_NAMES]
+    bit = {name: 1 << n for n, name in enumerate(TYPE_NAMES)}
+    team = {6: ("charizard", ["fire", "flying"]), 9: ("blastoise", ["water"]), 3: ("venusaur", ["grass", "poison"])}
+    chart = TypeChart(
+        TYPE_NAMES, attack, list(team), [t[0] for t in team.values()], [sum(bit[t] for t in ts) for _, ts in team.values()]
+    )
+    result = chart.analyze([chart.row("charizard"), chart.row("9"), chart.row("Venusaur")])
+    assert [m["types"] for m in result["members"]] == [["flying", "fire"], ["water"], ["poison", "grass"]]
+    defense = {d["type"]: d for d in result["defense"]}
+    assert defense["rock"]["factors"] == [4.0, 1.0, 1.0]
+    assert defense["ground"] == {"type": "ground", "weak": 0, "resist": 1, "immune": 1, "factors": [0.0, 1.0, 1.0]}
+    assert defense["electric"]["weak"] == 2 and defense["electric"]["resist"] == 1
+    assert result["weaknesses"] == ["electric", "flying", "rock", "psychic"]  # most exposed first
+    assert result["resistances"][:3] == ["fighting", "steel", "fairy"]  # two resist, none weak
+    assert result["coverage"]["grass"] == 2.0 and result["coverage"]["dragon"] == 1.0
+    assert result["uncovered"] == ["normal", "flying", "poison", "ghost", "electric", "psychic", "dragon", "dark"]
+
+
+def test_team_analyze_endpoint(test_client, test_db):
+    from src.etl.type_chart import load_bundled, write_chart
+    assert test_client.post("/teams/analyze", json={"ids": [1]}).status_code == 503
+    write_chart(test_db, load_bundled())
+    test_db.commit()
+    team_index.tracker.reset()
+    response = test_client.post("/teams/analyze", json={"ids": ["bulbasaur"]})
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["members"] == [{"id": 1, "name": "bulbasaur", "types": ["poison", "grass"]}]
+    assert set(data["weaknesses"]) == {"flying", "fire", "psychic", "ice"}
+    assert set(data["resistances"]) == {"fighting", "water", "grass", "electric", "fairy"}
+    assert len(data["defense"]) == 18 and data["coverage"]["water"] == 2.0
+    assert test_client.post("/teams/analyze", json={"ids": [1, "missingno"]}).status_code == 404
+    assert test_client.post("/teams/analyze", json={"ids": [1] * 7}).status_code == 400
+    assert test_client.post("/teams/analyze", json={"ids": []}).status_code == 400
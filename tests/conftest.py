@@ -0,0 +1,18 @@
+"""Point the app at a scratch database before ``src.database`` reads
+``POKEDEX_DATABASE_URL``, so test runs never write to the tracked ``pokedex.db``."""
+import os
+import shutil
+import tempfile
+
+SCRATCH = tempfile.mkdtemp(prefix="pokedex-tests-")
+os.environ["POKEDEX_DATABASE_URL"] = f"sqlite:///{os.path.join(SCRATCH, 'pokedex.db')}"
+
+
+def pytest_sessionstart(session):
+    from src.models import create_db_and_tables
+
+    create_db_and_tables()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SCRATCH, ignore_errors=True)
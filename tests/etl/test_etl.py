@@ -1,8 +1,9 @@
 import pytest
 from src.etl.main import normalize_data, insert_idempotent, SAMPLE_BULBASAUR
 from src.schemas import PokemonData
-from src.models import Pokemon, PokemonType, PokemonStat, Sprite
+from src.models import Pokemon, PokemonType, PokemonStat, Sprite, current_generation
 from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 from sqlmodel import SQLModel, Session, select
 
 @pytest.fixture
@@ -12,6 +13,14 @@ def test_engine():
     yield engine
     SQLModel.metadata.drop_all(engine)
 
+@pytest.fixture
+def loader_engine():
+    # One shared in-memory connection, so load_many's writer thread sees the tables
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
 @pytest.fixture
 def test_session(test_engine):
     with Session(test_engine) as session:
@@ -65,4 +74,357 @@ def test_etl_timing_and_idempotency(test_session):
     assert end2 - start2 < 1.0  # Faster on skip
     # No new rows
     pokemon_count = test_session.exec(select(Pokemon).where(Pokemon.id == 1)).count()
-    assert pokemon_count == 1
\ No newline at end of file
+    assert pokemon_count == 1
+
+def test_parse_ids():
+    from src.etl.main import parse_ids
+    assert parse_ids("1-3") == [1, 2, 3]
+    assert parse_ids("7,1,4,3-4") == [1, 3, 4, 7]
+    with pytest.raises(ValueError):
+        parse_ids("5-1")
+    with pytest.raises(ValueError):
+        parse_ids("0")
+
+
+def test_load_many_batches_and_reports_failures(loader_engine):
+    import asyncio
+    import copy
+    import httpx
+    from src.etl.main import load_many
+
+    def handler(request):
+        identifier = int(request.url.path.rstrip("/").split("/")[-1])
+        if identifier == 3:
+            return httpx.Response(404)
+        payload = copy.deepcopy(SAMPLE_BULBASAUR)
+        payload["id"] = identifier
+        payload["name"] = f"mon-{identifier}"
+        return httpx.Response(200, json=payload)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await load_many(
+                [1, 2, 3, 4, 5],
+                concurrency=2,
+                batch_size=2,
+                client=client,
+                session_factory=lambda: Session(loader_engine),
+            )
+
+    stats = asyncio.run(run())
+    assert stats.requested == 5
+    assert stats.loaded == 4
+    assert stats.failed == 1
+    assert stats.rate > 0
+    with Session(loader_engine) as session:
+        assert len(session.exec(select(Pokemon)).all()) == 4
+        assert len(session.exec(select(PokemonType)).all()) == 8
+
+
+def test_load_many_from_fixtures(loader_engine):
+    import asyncio
+    from src.etl.main import load_many
+    from src.etl.sources import FixtureSource
+
+    source = FixtureSource("docs")
+    stats = asyncio.run(
+        load_many([1, 10, 11], source=source, session_factory=lambda: Session(loader_engine))
+    )
+    assert (stats.loaded, stats.failed) == (2, 1)
+    with Session(loader_engine) as session:
+        names = {p.name for p in session.exec(select(Pokemon)).all()}
+        assert current_generation(session) == 1  # one bump per committed batch
+    assert names == {"bulbasaur", "caterpie"}
+
+
+def test_insert_writes_document_matching_rebuild(test_session):
+    import json
+    from src.models import PokemonDocument
+    from src.repository import rebuild_documents
+
+    insert_idempotent(test_session, normalize_data(SAMPLE_BULBASAUR))
+    written = json.loads(test_session.get(PokemonDocument, 1).body)
+    assert written["height_m"] == 0.7
+    assert [s["name"] for s in written["stats"]][0] == "hp"
+    assert written["sprites"]["front_female"] is None
+    assert rebuild_documents(test_session) == 1
+    test_session.commit()
+    assert json.loads(test_session.get(PokemonDocument, 1).body) == written
+
+
+def test_bulk_writer_is_set_based_and_idempotent(test_engine):
+    import copy
+    from sqlalchemy import event
+    from src.etl.writer import BulkWriter
+    from src.models import PokemonDocument, Type
+
+    def record(identifier, types=("grass", "poison")):
+        payload = copy.deepcopy(SAMPLE_BULBASAUR)
+        payload.update(id=identifier, name=f"mon-{identifier}")
+        payload["types"] = [{"slot": n + 1, "type": {"name": t}} for n, t in enumerate(types)]
+        return normalize_data(payload)
+
+    statements = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    writer = BulkWriter()
+    with Session(test_engine) as session:
+        result = writer.write(session, [record(i) for i in range(1, 21)])
+        inserted, skipped = result.inserted, result.skipped
+        session.commit()
+    assert (len(inserted), len(skipped)) == (20, 0)
+    # existing ids, lookup/insert/re-read for types, sprite variants and URL prefixes,
+    # 5 tables, generation update + first insert
+    assert len(statements) == 17
+
+    statements.clear()
+    with Session(test_engine) as session:
+        # Known types come from the cache; existing ids are skipped, not updated
+        result = writer.write(session, [record(5), record(21), record(21, ("fire",))])
+        inserted, skipped = result.inserted, result.skipped
+        session.commit()
+    assert [n.id for n in inserted] == [21] and [n.id for n in skipped] == [5, 21]
+    assert not any(f"FROM {table}" in s for s in statements for table in ("type", "spritevariant", "urlprefix"))
+
+    with Session(test_engine) as session:
+        assert len(session.exec(select(Pokemon)).all()) == 21
+        assert len(session.exec(select(Type)).all()) == 2
+        assert len(session.exec(select(PokemonStat)).all()) == 21 * 6
+        assert len(session.exec(select(PokemonDocument)).all()) == 21
+        assert current_generation(session) == 2
+
+
+def test_refresh_rewrites_only_changed_pokemon(test_engine):
+    import copy
+    import json
+    from src.etl.writer import BulkWriter
+    from src.models import PokemonDocument
+
+    def record(identifier, attack=49, shiny=True):
+        payload = copy.deepcopy(SAMPLE_BULBASAUR)
+        payload.update(id=identifier, name=f"mon-{identifier}")
+        payload["stats"][1]["base_stat"] = attack
+        if not shiny:
+            del payload["sprites"]["front_shiny"]
+        return normalize_data(payload)
+
+    writer = BulkWriter()
+    with Session(test_engine) as session:
+        writer.write(session, [record(1), record(2), record(3)])
+        session.commit()
+        result = writer.write(session, [record(1), record(2, attack=60), record(3, shiny=False)], refresh=True)
+        session.commit()
+        assert [n.id for n in result.updated] == [2, 3]
+        assert [n.id for n in result.skipped] == [1]
+        assert session.get(PokemonStat, (2, "attack")).base_stat == 60
+        assert "front_shiny" not in {s.variant for s in session.exec(select(Sprite).where(Sprite.pokemon_id == 3))}
+        assert json.loads(session.get(PokemonDocument, 2).body)["stats"][1]["base_stat"] == 60
+        assert len(session.exec(select(PokemonStat)).all()) == 18
+        assert current_generation(session) == 2
+
+
+def test_load_many_retries_and_resumes_from_journal(loader_engine, tmp_path, monkeypatch):
+    import asyncio
+    import copy
+    import httpx
+    from src.etl import retry as retry_module
+    from src.etl.journal import FAILED, LOADED, Journal
+    from src.etl.main import load_many
+    from src.etl.retry import RetryPolicy
+
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", fake_sleep)
+    calls = {}
+    down = {4}
+
+    def handler(request):
+        identifier = int(request.url.path.rstrip("/").split("/")[-1])
+        calls[identifier] = calls.get(identifier, 0) + 1
+        if identifier == 2 and calls[2] == 1:
+            return httpx.Response(429, headers={"Retry-After": "7"})
+        if identifier == 3 and calls[3] < 3:
+            return httpx.Response(503)
+        if identifier in down:
+            return httpx.Response(500)
+        payload = copy.deepcopy(SAMPLE_BULBASAUR)
+        payload.update(id=identifier, name=f"mon-{identifier}")
+        return httpx.Response(200, json=payload)
+
+    def run(journal):
+        async def go():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await load_many(
+                    [1, 2, 3, 4],
+                    client=client,
+                    session_factory=lambda: Session(loader_engine),
+                    journal=journal,
+                    retry=RetryPolicy(max_attempts=3, base_delay=0.01),
+                )
+        return asyncio.run(go())
+
+    journal_path = tmp_path / "journal.jsonl"
+    stats = run(Journal(journal_path))
+    assert (stats.loaded, stats.failed, stats.retries) == (3, 1, 5)
+    assert 7.0 in sleeps  # Retry-After wins over the computed backoff
+    journal = Journal(journal_path)  # replayed from disk
+    assert [journal.state(i) for i in (1, 2, 3, 4)] == [LOADED, LOADED, LOADED, FAILED]
+    assert journal.entries[4].attempts == 3 and "500" in journal.entries[4].last_error
+
+    # Second pass only touches what is not loaded yet
+    down.clear()
+    calls.clear()
+    stats = run(journal)
+    assert set(calls) == {4}
+    assert (stats.loaded, stats.resumed, stats.failed) == (1, 3, 0)
+    assert Journal(journal_path).summary() == {LOADED: 4}
+
+
+def test_fetch_pokemon_raises_instead_of_substituting_sample():
+    import asyncio
+    import httpx
+    from src.etl.main import fetch_pokemon
+
+    async def go():
+        transport = httpx.MockTransport(lambda request: httpx.Response(404))
+        async with httpx.AsyncClient(transport=transport) as client:
+            await fetch_pokemon(99999, client=client)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(go())
+
+
+def test_load_many_normalizes_in_process_pool(loader_engine, tmp_path):
+    import asyncio
+    import shutil
+    from src.etl.main import load_many
+    from src.etl.sources import FixtureSource
+
+    shutil.copy("docs/1.json", tmp_path / "1.json")
+    shutil.copy("docs/10.json", tmp_path / "10.json")
+    (tmp_path / "2.json").write_text('{"id": 2, "name": "ivysaur"}')  # no stats
+    stats = asyncio.run(
+        load_many(
+            [1, 2, 10],
+            source=FixtureSource(tmp_path),
+            session_factory=lambda: Session(loader_engine),
+            workers=2,
+            queue_depth=1,
+        )
+    )
+    assert (stats.loaded, stats.failed) == (2, 1)
+    with Session(loader_engine) as session:
+        caterpie = session.get(Pokemon, 10)
+        assert caterpie.name == "caterpie"
+        assert len(session.exec(select(Sprite).where(Sprite.pokemon_id == 10)).all()) > 10
+
+
+def test_fixture_loads_default_to_streaming_extraction(monkeypatch):
+    from src.etl.main import default_workers
+    from src.etl.sources import FixtureSource
+
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    assert default_workers(None, None) == 8
+    assert default_workers(None, FixtureSource("docs")) == 0
+    assert default_workers(3, FixtureSource("docs")) == 3
+    monkeypatch.setattr("os.cpu_count", lambda: 1)
+    assert default_workers(None, None) == 0
+
+
+def test_export_command_writes_gzip(tmp_path, monkeypatch):
+    import gzip
+    import json
+    from typer.testing import CliRunner
+    from src.etl import main as etl_main
+    engine = create_engine(f"sqlite:///{tmp_path / 'dex.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        insert_idempotent(session, normalize_data(SAMPLE_BULBASAUR))
+    monkeypatch.setattr(etl_main, "create_db_and_tables", lambda: None)
+    monkeypatch.setattr(etl_main, "get_session", lambda: Session(engine))
+    output = tmp_path / "dex.ndjson.gz"
+    result = CliRunner().invoke(etl_main.app, ["export", "--output", str(output)])
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in gzip.decompress(output.read_bytes()).splitlines()]
+    assert [r["name"] for r in records] == ["bulbasaur"]
+    assert records[0]["types"] == [{"name": "grass", "slot": 1}, {"name": "poison", "slot": 2}]
+    result = CliRunner().invoke(etl_main.app, ["export", "--format", "xml"])
+    assert result.exit_code != 0
+
+
+def test_type_chart_command_loads_bundled_chart(tmp_path, monkeypatch):
+    import httpx
+    from typer.testing import CliRunner
+    from src.etl import main as etl_main
+    from src.etl.type_chart import TYPE_NAMES
+    from src.models import Type, TypeEffectiveness
+    engine = create_engine(f"sqlite:///{tmp_path / 'dex.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        insert_idempotent(session, normalize_data(SAMPLE_BULBASAUR))
+    monkeypatch.setattr(etl_main, "create_db_and_tables", lambda: None)
+    monkeypatch.setattr(etl_main, "get_session", lambda: Session(engine))
+    # Offline: PokeAPI fails, so the bundled chart is used
+    monkeypatch.setattr(etl_main, "make_client", lambda *a, **kw: httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(404))
+    ))
+    for _ in range(2):  # reloading replaces the chart
+        result = CliRunner().invoke(etl_main.app, ["type-chart", "--retries", "1"])
+        assert result.exit_code == 0, result.output
+        assert "from bundled (120 non-neutral matchups)" in result.output
+    with Session(engine) as session:
+        types = {t.name: t.id for t in session.exec(select(Type))}
+        assert set(types) == set(TYPE_NAMES)
+        factors = {(r.attacking_type_id, r.defending_type_id): r.factor for r in session.exec(select(TypeEffectiveness))}
+    assert len(factors) == 120
+    assert factors[(types["fire"], types["grass"])] == 2.0
+    assert factors[(types["ground"], types["flying"])] == 0.0
+    assert (types["fire"], types["normal"]) not in factors  # neutral pairs are not stored
+
+
+def test_sprites_stored_interned_and_filtered(test_engine):
+    import copy
+    from src.etl.sprites import sprite_urls, variant_matcher
+    from src.models import SpriteVariant, UrlPrefix
+    from src.repository import get_pokemon, sprite_query
+
+    payload = copy.deepcopy(SAMPLE_BULBASAUR)
+    base = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/"
+    payload["sprites"]["versions"] = {"generation-i": {"red-blue": {"front_default": f"{base}versions/generation-i/red-blue/1.png"}}}
+    assert "versions_generation-i_red-blue_front_default" in normalize_data(payload).sprites
+    kept = normalize_data(payload, variants="front_*, back_default")
+    assert set(kept.sprites) == {"front_default", "front_shiny", "back_default"}
+    assert normalize_data(payload, variants="").sprites == {}
+    assert variant_matcher("front_*")("front_shiny") and not variant_matcher("front_*")("back_shiny")
+
+    norm = normalize_data(payload)
+    with Session(test_engine) as session:
+        insert_idempotent(session, norm)
+        # Variant names and URL directories are stored once; rows keep the file name
+        assert {p for p in session.exec(select(UrlPrefix.prefix))} == {base, f"{base}shiny/", f"{base}back/", f"{base}back/shiny/", f"{base}versions/generation-i/red-blue/"}
+        assert len(session.exec(select(SpriteVariant)).all()) == len(norm.sprites)
+        assert {s.path for s in session.exec(select(Sprite))} == {"1.png"}
+        # ...and come back as the original URLs
+        assert {variant: url for _, variant, url in session.exec(sprite_query(Sprite.pokemon_id == 1))} == norm.sprites
+        assert {s.variant: s.url for s in get_pokemon(session, "1").sprites} == norm.sprites
+        assert sprite_urls(session) == sorted(norm.sprites.values())
+
+
+def test_migrate_legacy_sprite_table(tmp_path):
+    from sqlalchemy import text
+    from src.models import migrate_sprites
+    from src.repository import sprite_query
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sprite (pokemon_id INTEGER, variant VARCHAR, url VARCHAR, PRIMARY KEY (pokemon_id, variant))"))
+        conn.execute(text("INSERT INTO sprite VALUES (1, 'front_default', 'https://x/1.png'), (1, 'back_default', 'https://x/back/1.png'), (2, 'front_default', 'https://x/2.png')"))
+    assert migrate_sprites(engine) == 3
+    assert migrate_sprites(engine) == 0  # already converted
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        rows = set(session.exec(sprite_query()))
+    assert rows == {(1, "front_default", "https://x/1.png"), (1, "back_default", "https://x/back/1.png"), (2, "front_default", "https://x/2.png")}
+    engine.dispose()
@@ -0,0 +1,190 @@
+import io
+import json
+import tarfile
+import zipfile
+import pytest
+from pathlib import Path
+from src.etl.main import normalize_data
+from src.etl.sources import CORE_FIELDS, FixtureSource, SourceError, extract_fields
+
+DOCS = Path(__file__).resolve().parents[2] / "docs"
+
+
+def test_extract_fields_matches_full_parse():
+    full = json.loads((DOCS / "1.json").read_text())
+    with open(DOCS / "1.json") as fh:
+        fields = extract_fields(fh, chunk_size=4096)
+    assert set(fields) == CORE_FIELDS
+    for key in CORE_FIELDS:
+        assert fields[key] == full[key]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_extract_fields_chunk_boundaries(chunk_size):
+    doc = {
+        "moves": [{"s": 'a "quoted" \\ value ]}', "n": [1, 2.5e3, None, True]}],
+        "name": "mr-mime",
+        "id": 122,
+        "weight": -1,
+        "sprites": {"front_default": "x\\u00e9"},
+    }
+    text = json.dumps(doc, indent=1)
+    fields = extract_fields(
+        io.StringIO(text), frozenset({"id", "name", "weight", "sprites"}), chunk_size
+    )
+    assert fields == {k: doc[k] for k in ("id", "name", "weight", "sprites")}
+
+
+def test_extract_fields_rejects_truncated():
+    with pytest.raises(SourceError):
+        extract_fields(io.StringIO('{"moves": [1, 2'))
+
+
+def _write_archives(tmp_path):
+    payload = (DOCS / "10.json").read_bytes()
+    zpath = tmp_path / "dump.zip"
+    with zipfile.ZipFile(zpath, "w") as zf:
+        zf.writestr("dump/10.json", payload)
+        zf.writestr("dump/readme.txt", b"ignored")
+    tpath = tmp_path / "dump.tar.gz"
+    with tarfile.open(tpath, "w:gz") as tf:
+        tf.add(DOCS / "10.json", arcname="10.json")
+    return zpath, tpath
+
+
+def test_fixture_source_directory_and_archives(tmp_path):
+    directory = FixtureSource(DOCS)
+    assert directory.ids() == [1, 10, 100, 1000]
+    expected = directory.read(10)
+    assert expected["name"] == "caterpie"
+
+    for archive in _write_archives(tmp_path):
+        source = FixtureSource(archive)
+        assert source.ids() == [10]
+        assert source.read(10) == expected
+        with pytest.raises(SourceError):
+            source.read(1)
+
+    norm = normalize_data(directory.read(1))
+    assert norm.name == "bulbasaur"
+    assert "front_default" in norm.sprites
+
+
+@pytest.mark.parametrize("mode", ["w:", "w:gz", "w:bz2", "w:xz"])
+def test_fixture_source_tar_indexed_once(tmp_path, mode, monkeypatch):
+    import asyncio
+    path = tmp_path / "dump.tar"
+    with tarfile.open(path, mode) as tf:
+        for name in ("1.json", "10.json", "100.json"):
+            tf.add(DOCS / name, arcname=f"dump/{name}")
+    source = FixtureSource(path)
+    # Records come from the indexed offsets, never from reopening the archive
+    monkeypatch.setattr(tarfile, "open", None)
+
+    async def read_all():
+        return await asyncio.gather(*(source.fetch_raw(i) for i in [100, 1, 10, 1, 100]))
+
+    bodies = asyncio.run(read_all())
+    assert [json.loads(b)["name"] for b in bodies] == ["voltorb", "bulbasaur", "caterpie", "bulbasaur", "voltorb"]
+    assert source.read(10) == FixtureSource(DOCS).read(10)
+    source.close()
+
+
+def test_fixture_source_rejects_plain_file(tmp_path):
+    bogus = tmp_path / "notes.txt"
+    bogus.write_text("nope")
+    with pytest.raises(SourceError):
+        FixtureSource(bogus)
+
+
+def test_caching_http_source_revalidates_with_etag(tmp_path):
+    import asyncio
+    import httpx
+    from src.etl.http_cache import HttpCache
+    from src.etl.sources import CachingHttpSource
+
+    body = (DOCS / "1.json").read_bytes()
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=body, headers={"ETag": '"v1"'})
+
+    async def fetch_twice():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            source = CachingHttpSource(client, HttpCache(tmp_path))
+            first = await source.fetch(1)
+            second = await source.fetch(1)
+            return source, first, second
+
+    source, first, second = asyncio.run(fetch_twice())
+    assert seen_headers == [None, '"v1"']
+    assert (source.downloads, source.hits) == (1, 1)
+    assert first == second == json.loads(body)
+    # Content-addressed and compressed on disk
+    objects = list((tmp_path / "objects").rglob("*.gz"))
+    assert len(objects) == 1 and objects[0].stat().st_size < len(body) / 5
+
+
+def test_http_cache_shares_identical_bodies(tmp_path):
+    from src.etl.http_cache import HttpCache
+
+    cache = HttpCache(tmp_path)
+    a = cache.store("https://x/a", b'{"same": true}', etag='"1"')
+    b = cache.store("https://x/b", b'{"same": true}', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    assert a.digest == b.digest
+    assert len(list((tmp_path / "objects").rglob("*.gz"))) == 1
+    assert cache.lookup("https://x/b").conditional_headers() == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert cache.body(cache.lookup("https://x/a")) == b'{"same": true}'
+    assert cache.lookup("https://x/missing") is None
+
+
+def test_content_store_requires_object_path(tmp_path):
+    from src.etl.content_store import ContentEntry, ContentStore
+
+    class Incomplete(ContentStore[ContentEntry]):
+        entry_type = ContentEntry
+
+    with pytest.raises(TypeError):
+        Incomplete(tmp_path)
+
+
+def test_fetch_sprites_deduplicates_identical_images(tmp_path):
+    import asyncio
+    import httpx
+    from src.etl.retry import RetryPolicy
+    from src.etl.sprites import SpriteStore, fetch_sprites
+
+    images = {
+        "/1.png": b"\x89PNG one",
+        "/versions/red/1.png": b"\x89PNG one",  # same image, another URL
+        "/2.png": b"\x89PNG two",
+    }
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        body = images.get(request.url.path)
+        if body is None:
+            return httpx.Response(404)
+        return httpx.Response(200, content=body, headers={"content-type": "image/png"})
+
+    urls = [f"https://sprites.test{path}" for path in [*images, "/missing.png"]]
+    store = SpriteStore(tmp_path)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_sprites(urls, store, client, retry=RetryPolicy(max_attempts=1))
+
+    stats = asyncio.run(run())
+    assert (stats.downloaded, stats.deduplicated, stats.failed) == (2, 1, 1)
+    assert len(list((tmp_path / "objects").rglob("*.png"))) == 2
+    entry = store.lookup(urls[1])
+    assert entry.digest == store.lookup(urls[0]).digest and entry.content_type == "image/png"
+    assert store.object_path(entry).read_bytes() == b"\x89PNG one"
+
+    requests.clear()
+    stats = asyncio.run(run())
+    assert stats.present == 3 and requests == ["/missing.png"]